@@ -1,8 +1,24 @@
+import io
+import sys
+from pathlib import Path
+
 import streamlit as st
 import joblib
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+# `streamlit run app/streamlit_app.py` only puts app/ on the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.compiled_model import compile_pipeline  # noqa: E402
+from src.data_loader import compact_dtypes  # noqa: E402
+from src.predict import portfolio_trend, score_portfolio  # noqa: E402
+from src.rolling_features import asof_join  # noqa: E402
+
+MODEL_PATH = "models/credit_model.pkl"
+TRANSACTION_COLUMNS = {"CustomerId", "TransactionId", "TransactionStartTime", "Amount"}
+
 # Initialize state for predicted probability
 if "prob" not in st.session_state:
     st.session_state.prob = None
@@ -103,7 +119,103 @@ label {
 # ---------------------------------------------------
 # Load Trained Model
 # ---------------------------------------------------
-model = joblib.load("models/credit_model.pkl")
+@st.cache_resource(show_spinner="Loading model...")
+def load_model(path: str):
+    """Unpickle once per server process; every session and rerun shares it."""
+    model = joblib.load(path)
+    try:
+        # Compiled NumPy scorer when the pipeline supports it
+        return compile_pipeline(model)
+    except ValueError:
+        return model
+
+
+def model_features(model) -> list:
+    features = getattr(model, "feature_names_in_", None)
+    if features is None:
+        features = getattr(model, "features", [])
+    return list(features)
+
+
+@st.cache_data(show_spinner="Reading upload...", max_entries=2)
+def read_upload(name: str, data: bytes) -> pd.DataFrame:
+    buffer = io.BytesIO(data)
+    df = pd.read_parquet(buffer) if name.endswith(".parquet") else pd.read_csv(buffer)
+    if "TransactionStartTime" in df.columns:
+        df["TransactionStartTime"] = pd.to_datetime(df["TransactionStartTime"])
+    return compact_dtypes(df)
+
+
+def render_portfolio(model):
+    """Bulk-score an uploaded feature or transaction file."""
+    st.subheader("📂 Portfolio Scoring")
+    upload = st.file_uploader("Feature or transaction file", type=["csv", "parquet"])
+    if upload is None:
+        st.info("Upload a CSV or Parquet file to score a portfolio.")
+        return
+
+    key = (upload.name, upload.size)
+    scored = st.session_state.get("portfolio")
+    if scored is None or scored["key"] != key:
+        df = read_upload(upload.name, upload.getvalue())
+        required = model_features(model)
+        missing = [c for c in required if c not in df.columns]
+        if missing and TRANSACTION_COLUMNS <= set(df.columns):
+            # Raw transactions: point-in-time customer features per row
+            with st.spinner("Building customer features..."):
+                df = asof_join(df, df)
+            missing = [c for c in required if c not in df.columns]
+        if missing:
+            st.error(f"Upload is missing model features: {missing}")
+            return
+
+        bar = st.progress(0.0, text="Scoring...")
+        prob = score_portfolio(
+            model, df[required],
+            on_progress=lambda done, total: bar.progress(
+                done / total, text=f"Scored {done:,} / {total:,} rows"
+            ),
+        )
+        bar.empty()
+        trend = None
+        if "TransactionStartTime" in df.columns:
+            trend = portfolio_trend(df["TransactionStartTime"], prob)
+        scored = {"key": key, "prob": prob, "trend": trend,
+                  "top": df.assign(risk_probability=prob).nlargest(100, "risk_probability")}
+        st.session_state.portfolio = scored
+        st.session_state.portfolio_trend = trend
+
+    prob = scored["prob"]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Rows Scored", f"{len(prob):,}")
+    m2.metric("Average PD", f"{prob.mean():.2%}")
+    m3.metric("High Risk (PD ≥ 70%)", f"{(prob >= 0.7).mean():.2%}")
+
+    st.markdown("### PD Distribution")
+    counts, edges = np.histogram(prob, bins=20, range=(0, 1))
+    st.bar_chart(pd.Series(counts, index=[f"{e:.2f}" for e in edges[:-1]], name="Rows"))
+
+    if scored["trend"] is not None:
+        st.markdown("### 📉 Historical Portfolio Risk Trend")
+        plot_trend(scored["trend"])
+    else:
+        st.info("Add a TransactionStartTime column to see the portfolio risk trend.")
+
+    st.markdown("### Highest-Risk Rows")
+    st.dataframe(scored["top"])
+
+
+def plot_trend(trend: pd.DataFrame):
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.plot(trend["Month"], trend["Average_PD"], marker='o')
+    ax.set_ylim(0, 1)
+    ax.set_ylabel("Average Probability of Default")
+    ax.set_title(f"{len(trend)}-Month Portfolio Risk Trend")
+    ax.grid(alpha=0.3)
+    st.pyplot(fig)
+
+
+model = load_model(MODEL_PATH)
 
 # ---------------------------------------------------
 # Header Section
@@ -113,6 +225,11 @@ st.markdown('<div class="subtitle">AI-Powered Probability of Default & Fraud Mon
 
 st.markdown("---")
 
+mode = st.sidebar.radio("Mode", ["Single Applicant", "Portfolio"])
+if mode == "Portfolio":
+    render_portfolio(model)
+    st.stop()
+
 # ---------------------------------------------------
 # Input & Output Layout
 # ---------------------------------------------------
@@ -245,22 +362,12 @@ if st.button("🚀 Run Risk Assessment"):
         # ---------------------------------------------------
         st.markdown("### 📉 Historical Portfolio Risk Trend")
 
-        dates = pd.date_range(end=pd.Timestamp.today(), periods=12, freq='ME')
-        historical_probs = [max(0, min(1, st.session_state.prob + (i - 6) * 0.01)) for i in range(12)]
-
-        historical_df = pd.DataFrame({
-            "Month": dates,
-            "Average_PD": historical_probs
-        })
-
-        fig2, ax2 = plt.subplots(figsize=(8, 4))
-        ax2.plot(historical_df["Month"], historical_df["Average_PD"], marker='o')
-        ax2.set_ylim(0, 1)
-        ax2.set_ylabel("Average Probability of Default")
-        ax2.set_title("12-Month Portfolio Risk Trend")
-        ax2.grid(alpha=0.3)
-
-        st.pyplot(fig2)
+        # Real monthly average PDs from the last portfolio scored this session
+        trend = st.session_state.get("portfolio_trend")
+        if trend is None:
+            st.info("Score a dated portfolio in Portfolio mode to see the risk trend.")
+        else:
+            plot_trend(trend)
 
 else:
     st.info("ℹ️ Run a risk assessment to view historical trends.")
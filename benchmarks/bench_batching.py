@@ -0,0 +1,98 @@
+"""Concurrent /predict throughput: one executor call per request vs micro-batching.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batching --requests 4000 --concurrency 1 8 32 128
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_scoring import CATEGORICAL, NUMERIC, make_training_data
+from src.api.batcher import MicroBatcher
+from src.compiled_model import compile_pipeline
+from src.preprocessing import build_preprocessor
+
+
+async def drive(score, records, concurrency: int):
+    """Run ``concurrency`` clients that each send requests back to back."""
+    latencies = []
+    it = iter(records)
+
+    async def client():
+        for record in it:
+            start = time.perf_counter()
+            await score(record)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(records) / elapsed, np.array(latencies) * 1e3
+
+
+async def run(compiled, records, concurrency, max_batch, max_wait_ms, workers):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def unbatched(record):
+        return await loop.run_in_executor(executor, compiled.predict_proba_one, record)
+
+    def score_batch(rows):
+        if len(rows) == 1:
+            return [compiled.predict_proba_one(rows[0])[1]]
+        return list(compiled.predict_proba(pd.DataFrame.from_records(rows))[:, 1])
+
+    batcher = MicroBatcher(score_batch, max_batch_size=max_batch, max_wait_ms=max_wait_ms,
+                           max_concurrent_batches=workers)
+    await batcher.start()
+    try:
+        direct = await drive(unbatched, records, concurrency)
+        batched = await drive(batcher.submit, records, concurrency)
+    finally:
+        await batcher.stop()
+        executor.shutdown()
+    return direct, batched, batcher.stats()["mean_batch_size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=4_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    X, y = make_training_data(args.rows)
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(NUMERIC, CATEGORICAL)),
+        ("classifier", RandomForestClassifier(n_estimators=args.trees, max_depth=12,
+                                              random_state=42)),
+    ]).fit(X, y)
+    compiled = compile_pipeline(pipeline)
+    records = X.sample(args.requests, replace=True, random_state=0).to_dict("records")
+
+    print(f"{args.trees} trees, {args.requests:,} requests, "
+          f"max batch {args.max_batch}, max wait {args.max_wait_ms}ms")
+    print(f"{'clients':>8}{'mode':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'batch':>8}")
+    for concurrency in args.concurrency:
+        direct, batched, mean_batch = asyncio.run(run(
+            compiled, records, concurrency, args.max_batch, args.max_wait_ms, args.workers
+        ))
+        for mode, (rps, lat), size in [("direct", direct, 1.0), ("batched", batched, mean_batch)]:
+            print(f"{concurrency:8d}{mode:>10}{rps:10.0f}{np.percentile(lat, 50):10.2f}"
+                  f"{np.percentile(lat, 99):10.2f}{size:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Backtest metrics: exact sklearn metrics on materialized arrays vs mergeable histograms.
+
+The baseline sorts all scores (roc_auc_score, average_precision_score,
+roc_curve for KS). The histogram engine makes one bincount pass per
+chunk; its memory does not grow with the row count.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_evaluate --rows 20000000 --chunk 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.metrics import average_precision_score, roc_auc_score, roc_curve
+
+from src.evaluate import accumulate, bootstrap_ci
+
+
+def make_scores(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.1
+    return y, np.clip(rng.normal(0.3 + 0.2 * y, 0.15), 0, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--chunk", type=int, default=1_000_000)
+    parser.add_argument("--boot", type=int, default=1_000)
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    y, scores = make_scores(args.rows)
+
+    start = time.perf_counter()
+    fpr, tpr, _ = roc_curve(y, scores)
+    exact = (roc_auc_score(y, scores), (tpr - fpr).max(), average_precision_score(y, scores))
+    t_exact = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hist = accumulate(
+        (y[i:i + args.chunk], scores[i:i + args.chunk]) for i in range(0, args.rows, args.chunk)
+    )
+    approx = (hist.auc(), hist.ks(), hist.pr_auc())
+    t_hist = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ci = bootstrap_ci(hist, n_boot=args.boot, n_jobs=args.jobs)
+    t_boot = time.perf_counter() - start
+
+    print(f"{args.rows:,} rows")
+    print(f"{'':12}{'AUC':>10}{'KS':>10}{'PR-AUC':>10}{'seconds':>10}")
+    print(f"{'sklearn':12}" + "".join(f"{v:10.5f}" for v in exact) + f"{t_exact:10.2f}")
+    print(f"{'histogram':12}" + "".join(f"{v:10.5f}" for v in approx) + f"{t_hist:10.2f}")
+    print(f"{args.boot} bootstrap replicates in {t_boot:.2f}s")
+    print(ci.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
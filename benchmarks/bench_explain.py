@@ -0,0 +1,80 @@
+"""Per-decision reason-code latency: rebuilding the explainer per call vs ExplanationService.
+
+The baseline mirrors ``compute_shap``: every request runs the sklearn
+preprocessor and builds a fresh explainer. The service builds its
+explainer once, transforms with the compiled path and caches by feature
+hash. ``--model rf`` needs ``shap``; ``lr`` does not.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_explain --model lr --requests 1000 --budget-ms 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_scoring import CATEGORICAL, NUMERIC, latencies, make_training_data
+from src.compiled_model import compile_pipeline
+from src.explain import ExplanationService
+from src.preprocessing import build_preprocessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", choices=["lr", "rf"], default="lr")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument("--portfolio", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--budget-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    X, y = make_training_data(args.rows)
+    classifier = (LogisticRegression(max_iter=1000) if args.model == "lr"
+                  else RandomForestClassifier(n_estimators=50, max_depth=8, random_state=42))
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(NUMERIC, CATEGORICAL)),
+        ("classifier", classifier),
+    ]).fit(X, y)
+    background = X.sample(1_000, random_state=1)
+    records = X.sample(args.requests, random_state=0).to_dict("records")
+
+    def rebuild_per_call(record):
+        pipeline.named_steps["preprocessor"].transform(pd.DataFrame([record]))
+        service = ExplanationService(compile_pipeline(pipeline), background=background)
+        return service.reasons(record)
+
+    start = time.perf_counter()
+    service = ExplanationService(compile_pipeline(pipeline), background=background,
+                                 n_jobs=args.jobs)
+    build = time.perf_counter() - start
+
+    cold = latencies(rebuild_per_call, records[:200])
+    warm = latencies(service.reasons, records)
+    cached = latencies(service.reasons, records)
+
+    portfolio = make_training_data(args.portfolio, seed=7)[0]
+    start = time.perf_counter()
+    service.explain_frame(portfolio)
+    batch = time.perf_counter() - start
+
+    print(f"{args.model}: explainer built once in {build * 1e3:.1f} ms")
+    print(f"{'single-row reason codes (us)':32}{'p50':>10}{'p99':>10}")
+    for name, lat in [("rebuild per call", cold), ("service", warm), ("service, cached", cached)]:
+        print(f"{name:32}{np.percentile(lat, 50):10.0f}{np.percentile(lat, 99):10.0f}")
+    print(f"portfolio of {args.portfolio:,} rows: {batch:.2f}s "
+          f"({batch / args.portfolio * 1e6:.1f} us/row)")
+
+    p99_ms = np.percentile(warm, 99) / 1e3
+    verdict = "within" if p99_ms <= args.budget_ms else "OVER"
+    print(f"uncached p99 {p99_ms:.2f} ms is {verdict} the {args.budget_ms:g} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the vectorized RFM engine against the per-group lambda version.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rfm --customers 1000000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_transactions
+from src.rfm import build_rfm, build_rfm_chunked
+
+
+def legacy_build_rfm(df: pd.DataFrame, snapshot_date=None) -> pd.DataFrame:
+    """The original implementation, kept here as the baseline."""
+    if snapshot_date is None:
+        snapshot_date = df["TransactionStartTime"].max()
+
+    return (
+        df.groupby("CustomerId")
+        .agg(
+            Recency=("TransactionStartTime",
+                     lambda x: (snapshot_date - x.max()).days),
+            Frequency=("TransactionId", "count"),
+            Monetary=("Value", "sum")
+        )
+        .reset_index()
+    )
+
+
+def by_customer(rfm: pd.DataFrame) -> pd.DataFrame:
+    """Rows in CustomerId order with plain string IDs, for comparing engines."""
+    rfm = rfm.assign(CustomerId=rfm["CustomerId"].astype(str))
+    return rfm.sort_values("CustomerId", ignore_index=True)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--txns-per-customer", type=int, default=3)
+    parser.add_argument("--chunks", type=int, default=8)
+    args = parser.parse_args()
+
+    df = make_transactions(args.customers * args.txns_per_customer, args.customers)
+    print(f"{len(df):,} transactions, {df['CustomerId'].nunique():,} customers")
+
+    new, t_new = timed(build_rfm, df)
+    chunk_size = -(-len(df) // args.chunks)
+    chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+    chunked, t_chunked = timed(build_rfm_chunked, chunks)
+    old, t_old = timed(legacy_build_rfm, df)
+
+    old = by_customer(old)
+    pd.testing.assert_frame_equal(by_customer(new), old, check_dtype=False)
+    pd.testing.assert_frame_equal(by_customer(chunked), old, check_dtype=False)
+
+    print(f"legacy (lambda)   {t_old:8.3f}s")
+    print(f"vectorized        {t_new:8.3f}s  ({t_old / t_new:5.1f}x)")
+    print(f"vectorized, {args.chunks:>2} chunks {t_chunked:6.3f}s  ({t_old / t_chunked:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
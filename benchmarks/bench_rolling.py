@@ -0,0 +1,36 @@
+"""Rolling 7/30/90-day feature engine: wall time as transaction count grows.
+
+Times both the per-customer snapshot features and the per-transaction
+(point-in-time) features over doubling row counts; roughly constant
+time per million rows means linear scaling.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rolling --rows 1000000 --steps 3
+"""
+
+import argparse
+
+from benchmarks.bench_rfm import timed
+from benchmarks.synthetic import make_transactions
+from src.rolling_features import rolling_features, transaction_rolling_features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--txns-per-customer", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'snapshot':>10} {'per-txn':>10} {'per-txn s/M rows':>18}")
+    for step in range(args.steps):
+        n = args.rows * 2 ** step
+        df = make_transactions(n, n // args.txns_per_customer)
+        _, t_snapshot = timed(rolling_features, df)
+        _, t_txn = timed(transaction_rolling_features, df)
+        print(f"{len(df):>12,} {t_snapshot:>9.2f}s {t_txn:>9.2f}s {t_txn / len(df) * 1e6:>17.2f}s")
+
+
+if __name__ == "__main__":
+    main()
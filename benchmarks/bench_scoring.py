@@ -0,0 +1,77 @@
+"""Single-row scoring latency: sklearn pipeline vs the compiled NumPy path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scoring --requests 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from src.compiled_model import compile_pipeline
+from src.preprocessing import build_preprocessor
+
+NUMERIC = ["total_amount", "avg_amount", "txn_count", "amount_std"]
+CATEGORICAL = ["ProductCategory", "ChannelId"]
+
+
+def make_training_data(n_rows: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "total_amount": rng.lognormal(10, 1, n_rows),
+        "avg_amount": rng.lognormal(7, 1, n_rows),
+        "txn_count": rng.integers(1, 500, n_rows).astype(float),
+        "amount_std": rng.lognormal(6, 1, n_rows),
+        "ProductCategory": rng.choice(["airtime", "financial_services", "utility_bill",
+                                       "data_bundles", "tv"], n_rows),
+        "ChannelId": rng.choice(["ChannelId_1", "ChannelId_2", "ChannelId_3"], n_rows),
+    })
+    y = (np.log(X["txn_count"]) + rng.normal(0, 1, n_rows) < 3).astype(int)
+    return X, y
+
+
+def latencies(fn, records) -> np.ndarray:
+    out = np.empty(len(records))
+    for i, record in enumerate(records):
+        start = time.perf_counter()
+        fn(record)
+        out[i] = time.perf_counter() - start
+    return out * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    X, y = make_training_data(args.rows)
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(NUMERIC, CATEGORICAL)),
+        ("classifier", RandomForestClassifier(n_estimators=args.trees, max_depth=12,
+                                              random_state=42)),
+    ]).fit(X, y)
+    compiled = compile_pipeline(pipeline)
+
+    records = X.sample(args.requests, random_state=0).to_dict("records")
+    for record in records[:50]:
+        expected = pipeline.predict_proba(pd.DataFrame([record]))[0]
+        assert np.array_equal(compiled.predict_proba_one(record), expected)
+
+    baseline = latencies(lambda r: pipeline.predict_proba(pd.DataFrame([r]))[0, 1], records)
+    fast = latencies(lambda r: compiled.predict_proba_one(r)[1], records)
+
+    print(f"{args.trees} trees, {args.requests:,} single-row requests (microseconds)")
+    print(f"{'':18}{'p50':>10}{'p99':>10}")
+    for name, lat in [("sklearn pipeline", baseline), ("compiled", fast)]:
+        print(f"{name:18}{np.percentile(lat, 50):10.0f}{np.percentile(lat, 99):10.0f}")
+
+
+if __name__ == "__main__":
+    main()
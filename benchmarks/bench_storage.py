@@ -0,0 +1,98 @@
+"""Benchmark CSV against month-partitioned Parquet for processed tables.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_storage --rows 1000000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_transactions
+from src.io import load_parquet, save_processed
+
+READ_COLUMNS = ["CustomerId", "Amount", "TransactionStartTime"]
+
+
+def make_processed_table(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic raw transactions plus the engineered columns of the processed table."""
+    df = make_transactions(n_rows, seed=seed).drop(
+        columns=["BatchId", "AccountId", "SubscriptionId", "CurrencyCode", "CountryCode",
+                 "ProviderId", "ProductId"]
+    )
+    rng = np.random.default_rng(seed)
+    ts = df["TransactionStartTime"].dt
+
+    return df.assign(
+        txn_hour=ts.hour,
+        txn_day=ts.day,
+        txn_month=ts.month,
+        total_amount=rng.normal(1e5, 1e4, n_rows),
+        avg_amount=rng.normal(1e3, 1e2, n_rows),
+        txn_count=rng.integers(1, 500, n_rows),
+        amount_std=rng.normal(500, 50, n_rows),
+    )
+
+
+def disk_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = make_processed_table(args.rows)
+    window = ("2019-01-01", "2019-02-01")
+    workdir = Path(tempfile.mkdtemp())
+
+    try:
+        csv_path = workdir / "processed.csv"
+        pq_path = workdir / "processed.parquet"
+
+        _, csv_write = timed(save_processed, df, csv_path)
+        _, pq_write = timed(save_processed, df, pq_path)
+
+        _, csv_read = timed(pd.read_csv, csv_path, parse_dates=["TransactionStartTime"])
+        _, pq_read = timed(load_parquet, pq_path)
+
+        def csv_projected():
+            out = pd.read_csv(csv_path, usecols=READ_COLUMNS, parse_dates=["TransactionStartTime"])
+            ts = out["TransactionStartTime"]
+            return out[(ts >= window[0]) & (ts < window[1])]
+
+        csv_sub, csv_filtered = timed(csv_projected)
+        pq_sub, pq_filtered = timed(load_parquet, pq_path, columns=READ_COLUMNS,
+                                    start=window[0], end=window[1])
+        assert len(csv_sub) == len(pq_sub)
+
+        mb = args.rows * df.shape[1] / 1e6
+        print(f"{args.rows:,} rows x {df.shape[1]} columns")
+        print(f"{'':24}{'CSV':>12}{'Parquet':>12}")
+        print(f"{'size on disk (MB)':24}{disk_size(csv_path) / 1e6:12.1f}"
+              f"{disk_size(pq_path) / 1e6:12.1f}")
+        print(f"{'write (s)':24}{csv_write:12.3f}{pq_write:12.3f}")
+        print(f"{'full read (s)':24}{csv_read:12.3f}{pq_read:12.3f}")
+        print(f"{'full read (Mcells/s)':24}{mb / csv_read:12.1f}{mb / pq_read:12.1f}")
+        print(f"{'3 cols, 1 month (s)':24}{csv_filtered:12.3f}{pq_filtered:12.3f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
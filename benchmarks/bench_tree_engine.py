@@ -0,0 +1,64 @@
+"""Flat array tree engine vs sklearn predict_proba across batch sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tree_engine --trees 100
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+from src.tree_engine import FlatTreeEnsemble
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000]
+
+
+def per_call(fn, X, budget: int = 20_000) -> float:
+    reps = max(1, budget // len(X))
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn(X)
+    return (time.perf_counter() - start) / reps * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    X, y = make_classification(args.rows, args.features, random_state=0)
+    X_score, _ = make_classification(max(BATCH_SIZES), args.features, random_state=1)
+
+    models = [
+        RandomForestClassifier(n_estimators=args.trees, random_state=0),
+        GradientBoostingClassifier(n_estimators=args.trees, random_state=0),
+    ]
+    for model in models:
+        model.fit(X, y)
+        engine = FlatTreeEnsemble.from_estimator(model)
+        assert np.array_equal(engine.predict_proba(X_score), model.predict_proba(X_score))
+
+        def threaded(batch):
+            return engine.predict_proba(batch, n_jobs=args.threads)
+
+        print(f"\n{type(model).__name__}: pickled {len(pickle.dumps(model)) / 1e6:.2f} MB, "
+              f"flat arrays {engine.nbytes / 1e6:.2f} MB")
+        print(f"{'batch':>8}{'sklearn ms':>14}{'flat ms':>12}{f'flat x{args.threads} ms':>16}")
+        for size in BATCH_SIZES:
+            batch = X_score[:size]
+            print(f"{size:>8}"
+                  f"{per_call(model.predict_proba, batch):14.2f}"
+                  f"{per_call(engine.predict_proba, batch):12.2f}"
+                  f"{per_call(threaded, batch):16.2f}")
+
+
+if __name__ == "__main__":
+    main()
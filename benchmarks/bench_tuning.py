@@ -0,0 +1,68 @@
+"""Model search wall time: per-candidate GridSearchCV over pipelines vs src.tuning.
+
+The baseline mirrors fitting each candidate's pipeline for every grid point
+and fold (the ColumnTransformer is refitted every time, every configuration
+sees the full folds). The tuned search preprocesses each fold once and
+races configurations with successive halving.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tuning --rows 20000 --jobs 4
+"""
+
+import argparse
+import time
+
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_scoring import CATEGORICAL, NUMERIC, make_training_data
+from src.preprocessing import build_preprocessor
+from src.tuning import default_candidates, search_models
+
+
+def grid_search(X, y, candidates, cv, n_jobs):
+    best = (None, -1.0)
+    for candidate in candidates:
+        pipeline = Pipeline([
+            ("preprocessor", build_preprocessor(NUMERIC, CATEGORICAL)),
+            ("classifier", candidate.estimator),
+        ])
+        grid = {f"classifier__{k}": v for k, v in candidate.param_grid.items()}
+        search = GridSearchCV(
+            pipeline, grid, scoring="roc_auc", n_jobs=n_jobs,
+            cv=StratifiedKFold(cv, shuffle=True, random_state=42),
+        ).fit(X, y)
+        if search.best_score_ > best[1]:
+            best = (candidate.name, search.best_score_)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    X, y = make_training_data(args.rows)
+    candidates = default_candidates()
+
+    start = time.perf_counter()
+    name, score = grid_search(X, y, candidates, args.cv, args.jobs)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = search_models(X, y, build_preprocessor(NUMERIC, CATEGORICAL),
+                           candidates=candidates, cv=args.cv, n_jobs=args.jobs)
+    tuned = time.perf_counter() - start
+
+    n_fits = sum(len(t.fold_scores) for t in result.trials)
+    print(f"{args.rows:,} rows, {args.cv}-fold CV, {len(result.trials)} trials ({n_fits} fits)")
+    print(f"{'grid search':14}{baseline:8.1f}s  best {name} AUC {score:.4f}")
+    print(f"{'tuning':14}{tuned:8.1f}s  best {result.best.candidate} "
+          f"AUC {result.best.score:.4f} (includes refit)")
+
+
+if __name__ == "__main__":
+    main()
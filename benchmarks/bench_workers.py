@@ -0,0 +1,108 @@
+"""Per-worker memory: each worker unpickling the model vs mapping one shared export.
+
+Every worker process loads the model the way a serving worker does, scores a
+batch so the model's pages are actually touched, and then idles while its
+memory is read. RSS counts shared pages in every process; USS is memory
+private to the worker; PSS splits shared pages between the processes that
+map them, so summing PSS gives the real footprint of the worker pool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_workers --workers 1 2 4
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+import psutil
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_scoring import CATEGORICAL, NUMERIC, make_training_data
+from src.compiled_model import compile_pipeline, save_compiled
+from src.preprocessing import build_preprocessor
+
+# Runs in a fresh interpreter so a worker only imports what its loading
+# path needs, as a serving worker would.
+WORKER = """
+import sys
+import pandas as pd
+
+mode, path, batch = sys.argv[1:]
+if mode == "joblib":
+    import joblib
+    from src.compiled_model import compile_pipeline
+    scorer = compile_pipeline(joblib.load(path))
+else:
+    from src.compiled_model import load_compiled
+    scorer = load_compiled(path)
+
+scorer.predict_proba(pd.read_pickle(batch))
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+
+def measure(mode: str, path: Path, batch: Path, n_workers: int):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, mode, str(path), str(batch)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(n_workers)
+    ]
+    try:
+        for proc in procs:
+            if proc.stdout.readline().strip() != "ready":
+                raise RuntimeError(f"{mode} worker failed to start")
+        info = [psutil.Process(proc.pid).memory_full_info() for proc in procs]
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+
+    mb = 1024 ** 2
+    return {
+        "rss": sum(i.rss for i in info) / n_workers / mb,
+        "uss": sum(i.uss for i in info) / n_workers / mb,
+        "pss_total": sum(i.pss for i in info) / mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    X, y = make_training_data(args.rows)
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(NUMERIC, CATEGORICAL)),
+        ("classifier", RandomForestClassifier(n_estimators=args.trees, random_state=42)),
+    ]).fit(X, y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickled = Path(tmp) / "model.pkl"
+        joblib.dump(pipeline, pickled)
+        batch = Path(tmp) / "batch.pkl"
+        X.sample(2_000, random_state=1).to_pickle(batch)
+        exported = save_compiled(compile_pipeline(pipeline), Path(tmp) / "export")
+        export_mb = sum(f.stat().st_size for f in exported.iterdir()) / 1024 ** 2
+
+        print(f"{args.trees} trees: pickle {pickled.stat().st_size / 1024 ** 2:.1f} MB, "
+              f"export {export_mb:.1f} MB")
+        print(f"{'workers':>8}{'mode':>8}{'RSS/worker':>12}{'USS/worker':>12}{'PSS total':>11}")
+        for n in args.workers:
+            for mode, path in [("joblib", pickled), ("mmap", exported)]:
+                m = measure(mode, path, batch, n)
+                print(f"{n:8d}{mode:>8}{m['rss']:10.0f}MB{m['uss']:10.0f}MB"
+                      f"{m['pss_total']:9.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""End-to-end benchmark of the training and scoring pipeline on synthetic data.
+
+Every stage runs in pipeline order on ``benchmarks.synthetic``
+transactions: generate (and write CSV), load, ``create_aggregates``,
+``build_rfm``, ``label_high_risk``, preprocessing, ``train_model``, then
+single and batch scoring through the API.
+
+The in-memory stages hold the whole file as one frame (categories are
+unioned across chunks so IDs stay categorical): about 430 MB per million
+rows, plus ~250 MB per million while preprocessing, so ~0.7 GB per million
+rows at peak. Sizes above ``--chunked-above`` (5M rows by default)
+therefore run the streaming paths instead, re-reading the CSV once per
+stage: ``aggregate_chunks``, ``build_rfm_chunked``,
+``label_high_risk_streaming`` and a preprocessor fitted on the first
+chunk that transforms every chunk. Their peak is set by ``--chunk-size``
+(~300 MB at 500k rows) plus the per-customer tables, which grow with the
+number of customers rather than rows.
+
+Each stage records wall time, throughput and the peak memory it added
+(see ``measure``). Results are written as JSON; pass an earlier file as
+``--baseline`` to flag stages that got slower or used more memory by more
+than ``--tolerance`` (exit status 1 if any did). Training is capped at
+``--max-train-rows`` customers so the largest datasets finish.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --rows 10000 100000 --output benchmarks/baseline.json
+    python -m benchmarks.suite --rows 10000 100000 --repeat 3 --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+from pandas.api.types import union_categoricals
+
+from benchmarks.synthetic import write_transactions
+from src import rfm_target
+from src.aggregates import aggregate_chunks, finalize_aggregates
+from src.config import ModelConfig, ServingConfig
+from src.data_loader import load_data_chunks
+from src.data_processing import create_aggregates
+from src.model import train_model
+from src.preprocessing import build_preprocessor
+from src.rfm import build_rfm, build_rfm_chunked
+
+# The API's feature set, so the trained pipeline can be served as is
+FEATURES = ["total_amount", "avg_amount", "txn_count", "amount_std"]
+TXN_NUMERIC = ["Amount", "Value", "PricingStrategy"]
+TXN_CATEGORICAL = ["ProductCategory", "ChannelId", "ProviderId"]
+
+_STATUS = Path("/proc/self/status")
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _status_mb(field: str) -> float:
+    for line in _STATUS.read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1]) / 1024
+    raise OSError(f"{field} not in {_STATUS}")
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS counter (Linux); False where unsupported."""
+    try:
+        _CLEAR_REFS.write_text("5")
+        _status_mb("VmHWM")
+    except OSError:
+        return False
+    return True
+
+
+def measure(fn: Callable, *args):
+    """
+    ``(result, seconds, peak_mb)`` for one call.
+
+    ``peak_mb`` is the most resident memory the call added over the RSS it
+    started with, from the kernel's resettable high-water mark, so Arrow
+    and other native buffers count and there is no tracing overhead.
+    Elsewhere it falls back to ``tracemalloc``'s peak of Python and NumPy
+    allocations, which slows object-heavy stages down.
+    """
+    gc.collect()
+    rss = _reset_peak_rss()
+    if rss:
+        before = _status_mb("VmRSS")
+    else:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+        seconds = time.perf_counter() - start
+        if rss:
+            peak = max(_status_mb("VmHWM") - before, 0.0)
+        else:
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        if not rss:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def concat_chunks(chunks) -> pd.DataFrame:
+    """Concatenate chunks, unioning categories so categoricals stay categorical."""
+    chunks = list(chunks)
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([c[col] for c in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _preprocess_chunks(chunks) -> int:
+    """Fit the preprocessor on the first chunk and transform every chunk."""
+    preprocessor, n_rows = None, 0
+    for chunk in chunks:
+        if preprocessor is None:
+            preprocessor = build_preprocessor(TXN_NUMERIC, TXN_CATEGORICAL).fit(chunk)
+        preprocessor.transform(chunk)
+        n_rows += len(chunk)
+    return n_rows
+
+
+def _in_memory_stages(csv_path: Path, chunk_size: int, record):
+    df, seconds, peak = measure(
+        lambda: concat_chunks(load_data_chunks(str(csv_path), chunksize=chunk_size))
+    )
+    record("load", len(df), "rows", seconds, peak)
+
+    aggregates, seconds, peak = measure(create_aggregates, df)
+    record("create_aggregates", len(df), "rows", seconds, peak)
+
+    _, seconds, peak = measure(build_rfm, df)
+    record("build_rfm", len(df), "rows", seconds, peak)
+
+    labels, seconds, peak = measure(
+        lambda: rfm_target.label_high_risk(rfm_target.build_rfm(df))
+    )
+    record("label_high_risk", len(df), "rows", seconds, peak, customers=len(labels))
+
+    _, seconds, peak = measure(
+        lambda: build_preprocessor(TXN_NUMERIC, TXN_CATEGORICAL).fit_transform(df)
+    )
+    record("preprocessing", len(df), "rows", seconds, peak)
+    return aggregates, labels
+
+
+def _chunked_stages(csv_path: Path, chunk_size: int, n_rows: int, record):
+    def chunks():
+        return load_data_chunks(str(csv_path), chunksize=chunk_size)
+
+    state, seconds, peak = measure(lambda: aggregate_chunks(chunks()))
+    record("aggregate_chunks", n_rows, "rows", seconds, peak)
+    aggregates = finalize_aggregates(state)
+
+    rfm, seconds, peak = measure(lambda: build_rfm_chunked(chunks(), monetary_col="Amount"))
+    record("build_rfm_chunked", n_rows, "rows", seconds, peak)
+
+    rfm = rfm.rename(columns={"Recency": "recency", "Frequency": "frequency",
+                              "Monetary": "monetary"})
+    labels, seconds, peak = measure(lambda: rfm_target.label_high_risk_streaming(rfm)[0])
+    record("label_high_risk_streaming", len(rfm), "customers", seconds, peak)
+
+    rows, seconds, peak = measure(_preprocess_chunks, chunks())
+    record("preprocessing_chunked", rows, "rows", seconds, peak)
+    return aggregates, labels
+
+
+def _post_each(client, records: List[Dict]) -> np.ndarray:
+    latencies = np.empty(len(records))
+    for i, record in enumerate(records):
+        start = time.perf_counter()
+        client.post("/predict", json=record).raise_for_status()
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def _post_batches(client, records: List[Dict], batch_size: int) -> int:
+    for i in range(0, len(records), batch_size):
+        client.post("/predict/batch", json=records[i:i + batch_size]).raise_for_status()
+    return len(records)
+
+
+def run_suite(
+    n_rows: int,
+    workdir: Path,
+    seed: int = 42,
+    max_train_rows: int = 100_000,
+    api_requests: int = 500,
+    batch_records: int = 20_000,
+    batch_size: int = 500,
+    chunk_size: int = 500_000,
+    chunked_above: int = 5_000_000
+) -> Dict[str, Dict]:
+    """
+    Run every stage on ``n_rows`` transactions; per-stage stats by name.
+
+    Above ``chunked_above`` rows the load-to-preprocessing stages stream
+    ``chunk_size``-row chunks instead of loading the file into one frame.
+    """
+    results: Dict[str, Dict] = {}
+
+    def record(stage: str, items: int, unit: str, seconds: float, peak: float, **extra):
+        results[stage] = {
+            "items": int(items),
+            "unit": unit,
+            "seconds": seconds,
+            "items_per_second": items / seconds if seconds > 0 else float("inf"),
+            "peak_mb": peak,
+            **extra,
+        }
+        print(f"{n_rows:>12,} {stage:<26} {seconds:>9.3f}s "
+              f"{results[stage]['items_per_second']:>14,.0f} {unit}/s {peak:>10.1f} MB")
+
+    csv_path = workdir / "transactions.csv"
+    _, seconds, peak = measure(write_transactions, csv_path, n_rows, 1_000_000, None, seed)
+    record("generate", n_rows, "rows", seconds, peak)
+
+    if n_rows > chunked_above:
+        aggregates, labels = _chunked_stages(csv_path, chunk_size, n_rows, record)
+    else:
+        aggregates, labels = _in_memory_stages(csv_path, chunk_size, record)
+
+    table = aggregates.merge(labels, on="CustomerId")
+    if len(table) > max_train_rows:
+        table = table.sample(max_train_rows, random_state=seed)
+    config = ModelConfig(model_path=str(workdir / "model.pkl"))
+    (_, auc), seconds, peak = measure(
+        train_model, table[FEATURES], table["is_high_risk"], build_preprocessor(FEATURES, []),
+        config
+    )
+    record("train_model", len(table), "customers", seconds, peak, auc=auc)
+
+    from fastapi.testclient import TestClient
+    from src.api import main
+
+    records = table[FEATURES].to_dict("records")
+    previous, main.config = main.config, ServingConfig(
+        tracking_uri=None,
+        cache_dir=str(workdir / "cache"),
+        fallback_path=config.model_path,
+        feature_store_path=None,
+    )
+    try:
+        with TestClient(main.app) as client:
+            single = records[:api_requests]
+            latencies, seconds, peak = measure(_post_each, client, single)
+            record("api_single", len(single), "requests", seconds, peak,
+                   p50_ms=float(np.percentile(latencies, 50) * 1e3),
+                   p99_ms=float(np.percentile(latencies, 99) * 1e3))
+
+            batch = records[:batch_records]
+            _, seconds, peak = measure(_post_batches, client, batch, batch_size)
+            record("api_batch", len(batch), "records", seconds, peak, batch_size=batch_size)
+    finally:
+        main.config = previous
+    return results
+
+
+def fastest(runs: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """Per stage, the repeat with the lowest wall time."""
+    return {stage: min((run[stage] for run in runs), key=lambda stats: stats["seconds"])
+            for stage in runs[0]}
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(
+    current: Dict[str, Dict[str, Dict]],
+    baseline: Dict[str, Dict[str, Dict]],
+    tolerance: float = 0.25,
+    min_seconds: float = 0.05,
+    min_mb: float = 16.0
+) -> List[str]:
+    """
+    Stages slower (or with a higher memory peak) than the baseline by more
+    than ``tolerance``, as messages. Stages under ``min_seconds`` or
+    ``min_mb`` in both runs are too noisy to judge on that measure.
+    """
+    regressions = []
+    for rows, stages in current.items():
+        for stage, now in stages.items():
+            before = baseline.get(rows, {}).get(stage)
+            if before is None:
+                continue
+            ratio = now["seconds"] / before["seconds"] if before["seconds"] > 0 else 1.0
+            print(f"{int(rows):>12,} {stage:<26} {before['seconds']:>9.3f}s -> "
+                  f"{now['seconds']:>9.3f}s ({ratio - 1:+.0%})")
+            if ratio > 1 + tolerance and max(now["seconds"], before["seconds"]) >= min_seconds:
+                regressions.append(f"{stage} @ {rows} rows: {ratio - 1:+.0%} wall time")
+            if (now["peak_mb"] > before["peak_mb"] * (1 + tolerance)
+                    and max(now["peak_mb"], before["peak_mb"]) >= min_mb):
+                regressions.append(f"{stage} @ {rows} rows: peak memory "
+                                   f"{before['peak_mb']:.1f} -> {now['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="run each size this many times and keep each stage's fastest")
+    parser.add_argument("--max-train-rows", type=int, default=100_000)
+    parser.add_argument("--api-requests", type=int, default=500)
+    parser.add_argument("--batch-records", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=500_000)
+    parser.add_argument("--chunked-above", type=int, default=5_000_000,
+                        help="stream chunks instead of loading one frame above this many rows")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    for n_rows in args.rows:
+        runs = []
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as workdir:
+                runs.append(run_suite(
+                    n_rows, Path(workdir), args.seed, args.max_train_rows, args.api_requests,
+                    args.batch_records, args.batch_size, args.chunk_size, args.chunked_above,
+                ))
+        results[str(n_rows)] = fastest(runs)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(
+        {"environment": environment(), "results": results}, indent=2
+    ))
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Seeded synthetic transactions in the Xente schema.
+
+Columns cover ``REQUIRED_COLUMNS`` plus the IDs, ``ProductCategory``,
+``Value``, ``PricingStrategy`` and ``FraudResult`` of the raw file, with
+roughly realistic shapes: a few customers are much more active than the
+rest, amounts are lognormal with ~40% refunds/debits, and fraud is rare
+and concentrated in large transactions. ``iter_transactions`` yields the
+same rows in chunks so 100M-row datasets can be streamed to disk;
+``make_transactions`` is the in-memory shortcut. Output depends only on
+``seed``, the row and customer counts and the chunk size. String IDs are
+categoricals whose categories differ from chunk to chunk.
+
+Write a file from the repository root:
+
+    python -m benchmarks.synthetic --rows 10000000 --out data/raw/synthetic.csv
+"""
+
+import argparse
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+START = pd.Timestamp("2018-11-15", tz="UTC")
+SPAN_DAYS = 90
+
+PRODUCT_CATEGORIES = np.array([
+    "airtime", "financial_services", "utility_bill", "data_bundles", "tv",
+    "ticket", "movies", "transport", "other",
+])
+PRODUCT_CATEGORY_WEIGHTS = np.array([0.47, 0.47, 0.02, 0.02, 0.01, 0.004, 0.003, 0.002, 0.001])
+CHANNELS = np.array(["ChannelId_1", "ChannelId_2", "ChannelId_3", "ChannelId_5"])
+CHANNEL_WEIGHTS = np.array([0.04, 0.39, 0.56, 0.01])
+PROVIDERS = np.array([f"ProviderId_{i}" for i in range(1, 7)])
+PRODUCTS = np.array([f"ProductId_{i}" for i in range(1, 28)])
+
+
+def _labels(prefix: str, codes: np.ndarray) -> pd.Categorical:
+    """``prefix_<code>`` strings, formatted once per distinct code."""
+    inverse, uniques = pd.factorize(codes)
+    return pd.Categorical.from_codes(inverse, [f"{prefix}_{c}" for c in uniques])
+
+
+def _choice(rng: np.random.Generator, values: np.ndarray, n_rows: int, p=None) -> pd.Categorical:
+    return pd.Categorical.from_codes(rng.choice(len(values), n_rows, p=p), values)
+
+
+def _chunk(rng: np.random.Generator, first_id: int, n_rows: int, n_customers: int):
+    # Zipf-like activity: low customer numbers transact far more often
+    customer = np.minimum((n_customers * rng.random(n_rows) ** 2.5).astype(np.int64),
+                          n_customers - 1)
+    magnitude = rng.lognormal(7, 1.5, n_rows).round(0)
+    debit = rng.random(n_rows) < 0.4
+    amount = np.where(debit, -magnitude, magnitude)
+    fraud_rate = np.where(magnitude > 1e5, 0.05, 0.001)
+
+    return pd.DataFrame({
+        "TransactionId": [f"TransactionId_{i}" for i in range(first_id, first_id + n_rows)],
+        "BatchId": _labels("BatchId", rng.integers(0, max(n_rows // 2, 1), n_rows) + first_id),
+        "AccountId": _labels("AccountId", customer),
+        "SubscriptionId": _labels("SubscriptionId", customer),
+        "CustomerId": _labels("CustomerId", customer),
+        "CurrencyCode": pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), ["UGX"]),
+        "CountryCode": np.full(n_rows, 256, dtype=np.int16),
+        "ProviderId": _choice(rng, PROVIDERS, n_rows),
+        "ProductId": _choice(rng, PRODUCTS, n_rows),
+        "ProductCategory": _choice(rng, PRODUCT_CATEGORIES, n_rows, PRODUCT_CATEGORY_WEIGHTS),
+        "ChannelId": _choice(rng, CHANNELS, n_rows, CHANNEL_WEIGHTS),
+        "Amount": amount,
+        "Value": magnitude.astype(np.int64),
+        "TransactionStartTime": START + pd.to_timedelta(
+            rng.integers(0, SPAN_DAYS * 86400, n_rows), unit="s"
+        ),
+        "PricingStrategy": rng.choice(np.array([0, 1, 2, 4], dtype=np.int8), n_rows,
+                                      p=[0.02, 0.02, 0.83, 0.13]),
+        "FraudResult": (rng.random(n_rows) < fraud_rate).astype(np.int8),
+    })
+
+
+def iter_transactions(
+    n_rows: int,
+    chunk_size: int = 1_000_000,
+    n_customers: Optional[int] = None,
+    seed: int = 42
+) -> Iterator[pd.DataFrame]:
+    """Yield ``n_rows`` transactions in chunks; ~5 transactions per customer by default."""
+    n_customers = n_customers or max(n_rows // 5, 1)
+    n_chunks = -(-n_rows // chunk_size)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        first = i * chunk_size
+        yield _chunk(np.random.default_rng(child), first, min(chunk_size, n_rows - first),
+                     n_customers)
+
+
+def make_transactions(
+    n_rows: int,
+    n_customers: Optional[int] = None,
+    seed: int = 42
+) -> pd.DataFrame:
+    """All rows as one frame: ``iter_transactions`` with a single chunk."""
+    return next(iter_transactions(n_rows, max(n_rows, 1), n_customers, seed))
+
+
+def write_transactions(
+    path,
+    n_rows: int,
+    chunk_size: int = 1_000_000,
+    n_customers: Optional[int] = None,
+    seed: int = 42
+) -> Path:
+    """Stream transactions to a CSV file in the raw file's format."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for i, chunk in enumerate(iter_transactions(n_rows, chunk_size, n_customers, seed)):
+        chunk["TransactionStartTime"] = chunk["TransactionStartTime"].dt.strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data/raw/synthetic.csv")
+    args = parser.parse_args()
+
+    path = write_transactions(args.out, args.rows, args.chunk_size, args.customers, args.seed)
+    print(f"Wrote {args.rows:,} transactions to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from src.data_loader import load_data, split_features_target
-from src.preprocessing import build_preprocessor
+from src.preprocessing import build_preprocessor, split_by_cardinality
 from src.model import train_model
 from src.config import ModelConfig
 
@@ -15,9 +15,14 @@ if __name__ == "__main__":
     X, y = split_features_target(df, target=config.target_column)
 
     numeric_features = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
-    categorical_features = X.select_dtypes(include=["object"]).columns.tolist()
+    categorical_features = X.select_dtypes(exclude="number").columns.tolist()
 
-    preprocessor = build_preprocessor(numeric_features, categorical_features)
+    # ID-like columns (TransactionId, BatchId, AccountId, ...) get one
+    # frequency-encoded column each instead of one column per value
+    onehot_features, compact_features = split_by_cardinality(X, categorical_features)
+    print("Compact-encoded columns:", compact_features)
+
+    preprocessor = build_preprocessor(numeric_features, onehot_features, compact_features)
 
     model, auc = train_model(X, y, preprocessor, config)
 
@@ -0,0 +1,163 @@
+"""Async micro-batching for single-row scoring requests."""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BatcherStopped(RuntimeError):
+    """Raised for requests still queued when the batcher shuts down."""
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row requests into batches.
+
+    A batch is dispatched once it holds ``max_batch_size`` rows or
+    ``max_wait_ms`` has passed since its first row arrived. When no batch is
+    in flight there is nothing to wait behind, so whatever is queued is
+    dispatched at once; rows that arrive while the scorer is busy pile up
+    into the next batch. Batches are
+    scored by ``score_batch`` in an executor, off the event loop, and each
+    caller's future is resolved with its own row's result. If a batch
+    fails, its rows are retried one by one so a bad row only fails itself.
+    ``validate`` (if given) runs on every row before it joins a batch, so a
+    malformed row fails alone instead of being scored alongside others.
+    ``stop`` fails every row still waiting with ``BatcherStopped``.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Dict]], List[Dict]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        executor: Optional[Executor] = None,
+        max_concurrent_batches: int = 2,
+        validate: Optional[Callable[[Dict], None]] = None
+    ):
+        self.score_batch = score_batch
+        self.validate = validate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_concurrent_batches)
+        self._slots = asyncio.Semaphore(max_concurrent_batches)
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        self.batches = 0
+        self.rows = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(BatcherStopped("Scoring service is shutting down"))
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def submit(self, record: Dict) -> Dict:
+        if self.validate is not None:
+            self.validate(record)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                await self._fill(batch, loop.time() + self.max_wait)
+                await self._slots.acquire()
+                task = asyncio.create_task(self._dispatch(batch))
+                batch = []
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+        except asyncio.CancelledError:
+            # Rows taken off the queue but not yet dispatched would never resolve
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(BatcherStopped("Scoring service is shutting down"))
+            raise
+
+    async def _fill(self, batch, deadline: float) -> None:
+        """Top ``batch`` up from the queue until it is full or ``deadline`` passes."""
+        loop = asyncio.get_running_loop()
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0 or not self._inflight:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _score(self, records: List[Dict]) -> list:
+        loop = asyncio.get_running_loop()
+        results = list(await loop.run_in_executor(self.executor, self.score_batch, records))
+        if len(results) != len(records):
+            raise ValueError(
+                f"score_batch returned {len(results)} results for {len(records)} records"
+            )
+        return results
+
+    async def _dispatch(self, batch) -> None:
+        records = [record for record, _ in batch]
+        try:
+            try:
+                outcomes = [(result, None) for result in await self._score(records)]
+            except Exception:
+                logger.debug("Batch of %d failed, retrying rows individually", len(records))
+                outcomes = []
+                for record in records:
+                    try:
+                        outcomes.append(((await self._score([record]))[0], None))
+                    except Exception as e:
+                        outcomes.append((None, e))
+
+            self.batches += 1
+            self.rows += len(records)
+            for (_, future), (result, error) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+            # Never leave a request waiting on a row that got no outcome
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Batch ended without a result for this row"))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
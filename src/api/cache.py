@@ -0,0 +1,5 @@
+"""The prediction cache lives in ``src.cache``; re-exported for the API."""
+
+from src.cache import PredictionCache, feature_key
+
+__all__ = ["PredictionCache", "feature_key"]
@@ -1,88 +1,399 @@
-import mlflow
-import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.datasets import make_classification
-import mlflow
-mlflow.set_tracking_uri("http://localhost:5000")  # Adjust if your MLflow server runs on a different host or port
-# Start a new MLflow run
-with mlflow.start_run() as run:
-    # Log parameters and metrics
-    mlflow.log_param("param1", 5)
-    mlflow.log_metric("metric1", np.random.random())
-    
-    # Create and train a model
-    X, y = make_classification(n_samples=100, n_features=10)
-    model = LogisticRegression()
-    model.fit(X, y)
-    
-    # Log the model
-    mlflow.sklearn.log_model(model, "model")  # Ensure this matches your loading path
-    print("Logged run_id:", run.info.run_id)
-    
-    # Optionally register the model
-    mlflow.register_model(f"runs:/{run.info.run_id}/model", "CreditRiskModel")
-
-# Specify your experiment name
-experiment_name = "CreditRiskModel"
-# Check if the experiment exists, if not, create it
-experiment = mlflow.get_experiment_by_name(experiment_name)
-
-if experiment is None:
-    print(f"Experiment '{experiment_name}' does not exist. Creating a new one.")
-    experiment_id = mlflow.create_experiment(experiment_name)
-else:
-    experiment_id = experiment.experiment_id
-
-# Search for runs in that experiment
-runs = mlflow.search_runs(experiment_ids=[experiment_id])
-print(runs[['run_id', 'status']])
-
-# Load the registered model
-try:
-    model = mlflow.sklearn.load_model("models:/CreditRiskModel/latest")
-except mlflow.exceptions.MlflowException as e:
-    print(f"Failed to load model: {e}")
-
-# Get details about a specific run
-run_data = mlflow.get_run(run.info.run_id)
-print(run_data.data)
-
-from fastapi import FastAPI, HTTPException
-import mlflow.sklearn
+import json
+import logging
+import math
+import secrets
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
 import pandas as pd
 
-app = FastAPI()
+from src.api.batcher import BatcherStopped, MicroBatcher
+from src.cache import PredictionCache, feature_key
+from src.api.model_loader import load_model, load_sklearn_model
+from src.api.pydantic_models import CustomerFeatures, PredictionResponse
+from src.compiled_model import compile_pipeline
+from src.config import ServingConfig
+from src.explain import DEFAULT_TOP_K, ExplanationService, background_path, load_background
+from src.feature_store import FeatureStore
+from src.predict import BATCH_CHUNK_SIZE, probability_to_score, recommend_loan, score_records
 
-# Load the model from the registered model
-model = mlflow.sklearn.load_model("models:/CreditRiskModel/latest")
+logger = logging.getLogger(__name__)
 
-def probability_to_score(probability):
-    """Convert probability to a score out of 100."""
-    return int(probability * 100)
+_IMPORTED_AT = time.perf_counter()
 
-def recommend_loan(score):
-    """Provide loan recommendation based on the credit score."""
-    return "Recommended" if score > 50 else "Not Recommended"
+config = ServingConfig()
 
-@app.post("/predict")
-def predict(features: dict):
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the model once per worker; a failed load leaves the worker live but not ready."""
+    app.state.loaded = None
+    app.state.load_error = None
+    app.state.cache = PredictionCache(maxsize=config.cache_size, ttl=config.cache_ttl)
     try:
+        app.state.loaded = await run_in_threadpool(load_model, config)
+    except Exception as e:
+        logger.exception("Model load failed")
+        app.state.load_error = str(e)
+    app.state.batcher = None
+    if config.batch_max_size > 1:
+        app.state.batcher = MicroBatcher(
+            _score_rows,
+            max_batch_size=config.batch_max_size,
+            max_wait_ms=config.batch_max_wait_ms,
+            max_concurrent_batches=config.batch_workers,
+            validate=_check_features,
+        )
+        await app.state.batcher.start()
+    app.state.explainer = None
+    app.state.feature_store = None
+    if config.feature_store_path:
+        app.state.feature_store = FeatureStore(config.feature_store_path)
+    app.state.startup_seconds = time.perf_counter() - _IMPORTED_AT
+    yield
+    if app.state.batcher is not None:
+        await app.state.batcher.stop()
+    if app.state.feature_store is not None:
+        app.state.feature_store.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def current_loaded():
+    loaded = getattr(app.state, "loaded", None)
+    if loaded is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return loaded
+
+
+def current_model():
+    """The compiled scorer when available, else the sklearn pipeline."""
+    loaded = current_loaded()
+    return loaded.scorer if loaded.scorer is not None else loaded.model
+
+
+@app.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+def readiness():
+    loaded = getattr(app.state, "loaded", None)
+    if loaded is None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not ready", "error": getattr(app.state, "load_error", None)},
+        )
+    return {
+        "status": "ready",
+        "model_version": loaded.version,
+        "model_source": loaded.source,
+        "compiled": loaded.scorer is not None,
+        "load_seconds": loaded.load_seconds,
+        "startup_seconds": app.state.startup_seconds,
+    }
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not config.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (no ADMIN_TOKEN)")
+    if token is None or not secrets.compare_digest(token, config.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.post("/admin/reload")
+async def reload_model(
+    refresh: bool = False,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Reload the model (``refresh`` bypasses the local cache) and drop cached predictions.
+
+    Requires the ``X-Admin-Token`` header to match ``ADMIN_TOKEN``. Only the
+    worker process that receives the call reloads; with several workers,
+    restart the service to roll a new model out to all of them.
+    """
+    _require_admin(x_admin_token)
+    try:
+        loaded = await run_in_threadpool(load_model, config, refresh)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+    app.state.loaded = loaded
+    app.state.load_error = None
+    app.state.cache.clear()
+    return {"model_version": loaded.version, "model_source": loaded.source}
+
+
+@app.get("/metrics")
+def metrics():
+    stats = {"prediction_cache": app.state.cache.stats()}
+    if getattr(app.state, "batcher", None) is not None:
+        stats["micro_batcher"] = app.state.batcher.stats()
+    if getattr(app.state, "explainer", None) is not None:
+        stats["explanation_cache"] = app.state.explainer[1].cache.stats()
+    return stats
+
+
+def _score_one(loaded, features: dict) -> dict:
+    if loaded.scorer is not None:
+        # Compiled fast path: no DataFrame, no sklearn validation
+        prob = float(loaded.scorer.predict_proba_one(features)[1])
+    else:
         # Convert the input features to a DataFrame
         df = pd.DataFrame([features])
-        
+
         # Get the probability of default
-        prob = model.predict_proba(df)[0, 1]
-        
-        # Convert probability to credit score
-        score = probability_to_score(prob)
-        
-        # Get loan recommendation
-        loan = recommend_loan(score)
-
-        return {
-            "risk_probability": prob,
-            "credit_score": score,
-            "loan_offer": loan
-        }
+        prob = loaded.model.predict_proba(df)[0, 1]
+
+    # Convert probability to credit score
+    score = probability_to_score(prob)
+
+    # Get loan recommendation
+    loan = recommend_loan(score)
+
+    return {
+        "risk_probability": prob,
+        "credit_score": score,
+        "loan_offer": loan
+    }
+
+
+def _required_features(loaded) -> List[str]:
+    if loaded.scorer is not None:
+        return loaded.scorer.features
+    return list(getattr(loaded.model, "feature_names_in_", []))
+
+
+def _check_features(features: dict) -> None:
+    """
+    Reject a record missing any model feature, as the single-row path does.
+
+    Batch scoring builds a DataFrame, where a missing feature would
+    silently become NaN and be imputed.
+    """
+    missing = [f for f in _required_features(current_loaded()) if f not in features]
+    if missing:
+        raise ValueError(f"Missing features: {missing}")
+
+
+def _score_rows(rows: List[dict]) -> List[dict]:
+    """Score a micro-batch; a lone row takes the single-row fast path."""
+    loaded = current_loaded()
+    for row in rows:
+        _check_features(row)
+    if len(rows) == 1:
+        return [_score_one(loaded, rows[0])]
+    model = loaded.scorer if loaded.scorer is not None else loaded.model
+    return list(score_records(model, rows, len(rows)))
+
+
+async def _predict_features(features: dict) -> dict:
+    """Score validated features (``CustomerFeatures.model_dump()``), through the cache."""
+    loaded = current_loaded()
+    key = feature_key(features, loaded.version)
+    cached = app.state.cache.get(key)
+    if cached is not None:
+        return cached
+
+    batcher = getattr(app.state, "batcher", None)
+    try:
+        if batcher is not None:
+            result = await batcher.submit(features)
+        else:
+            result = await run_in_threadpool(_score_one, loaded, features)
+    except HTTPException:
+        raise
+    except BatcherStopped as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+    app.state.cache.put(key, result)
+    return result
+
+
+@app.post("/predict")
+async def predict(features: CustomerFeatures):
+    """Score one applicant; concurrent requests are coalesced by the micro-batcher."""
+    return await _predict_features(features.model_dump())
+
+
+def current_explainer() -> ExplanationService:
+    """The explanation service for the loaded model, built once per model version."""
+    loaded = current_loaded()
+    cached = getattr(app.state, "explainer", None)
+    if cached is not None and cached[0] is loaded:
+        return cached[1]
+    try:
+        if loaded.scorer is not None and loaded.source != "mmap":
+            compiled = loaded.scorer
+        else:
+            compiled = compile_pipeline(load_sklearn_model(config, loaded))
+        background = load_background(config.background_path
+                                     or background_path(config.fallback_path))
+        service = ExplanationService(compiled, background=background, version=loaded.version,
+                                     cache_size=config.cache_size, cache_ttl=config.cache_ttl)
+    except (ImportError, ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=501, detail=f"Explanations unavailable: {e}")
+    app.state.explainer = (loaded, service)
+    return service
+
+
+@app.post("/explain")
+async def explain(features: CustomerFeatures, top_k: int = Query(DEFAULT_TOP_K, ge=1)):
+    """Score one applicant and return the top-k reason codes raising its risk."""
+    features = features.model_dump()
+    service = await run_in_threadpool(current_explainer)
+    result = await _predict_features(features)
+    try:
+        explanation = (await run_in_threadpool(service.explain_records, [features]))[0]
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        **result,
+        "base_value": explanation.base_value,
+        "reasons": explanation.reasons(features, top_k),
+    }
+
+
+@app.get("/predict/by-customer/{customer_id}")
+async def predict_by_customer(customer_id: str):
+    """Score a known customer from the features held in the online feature store."""
+    store = getattr(app.state, "feature_store", None)
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store not configured")
+    stored = await run_in_threadpool(store.get, customer_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown customer: {customer_id}")
+    missing = [name for name in CustomerFeatures.model_fields
+               if stored[name] is None or math.isnan(stored[name])]
+    if missing:
+        # e.g. no transaction with an amount yet, so there is no average to score
+        raise HTTPException(status_code=422,
+                            detail=f"No stored value for {', '.join(missing)}: {customer_id}")
+
+    features = CustomerFeatures.model_validate(
+        {name: stored[name] for name in CustomerFeatures.model_fields}
+    ).model_dump()
+    result = await _predict_features(features)
+    return {"customer_id": customer_id, "features": features, **result}
+
+
+@app.post("/predict/batch", response_model=List[PredictionResponse])
+def predict_batch(records: List[CustomerFeatures]):
+    """Score many applicants with one predict_proba call per chunk; cached rows are reused."""
+    loaded = current_loaded()
+    model = current_model()
+    cache = app.state.cache
+
+    rows = [r.model_dump() for r in records]
+    keys = [feature_key(row, loaded.version) for row in rows]
+    results = [cache.get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+
+    try:
+        scored = score_records(model, (rows[i] for i in misses), BATCH_CHUNK_SIZE)
+        for i, result in zip(misses, scored):
+            results[i] = result
+            cache.put(keys[i], result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return results
+
+
+async def _ndjson_lines(request: Request):
+    pending = b""
+    async for data in request.stream():
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator may keep reading the request.
+
+    The stock class listens for client disconnects on ``receive`` while it
+    streams, which would race with the body iterator for request chunks, so
+    the body iterator checks for disconnects itself. A send that fails
+    because the client went away ends the response quietly.
+    """
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except (OSError, ClientDisconnect):
+            return
+        if self.background is not None:
+            await self.background()
+
+
+def _score_ndjson_chunk(model, chunk):
+    """
+    Score (line, record, error) tuples, keeping errors in line order.
+
+    If scoring the chunk fails, every valid line in it gets the failure as
+    its error, so the response stays well-formed and later chunks still run.
+    """
+    valid = [record for _, record, error in chunk if error is None]
+    try:
+        scored = list(score_records(model, valid, BATCH_CHUNK_SIZE))
+    except Exception as e:
+        logger.exception("Scoring an NDJSON chunk failed")
+        scored = [{"line": line_no, "error": str(e)}
+                  for line_no, _, error in chunk if error is None]
+    results = iter(scored)
+    return [
+        next(results) if error is None else {"line": line_no, "error": error}
+        for line_no, _, error in chunk
+    ]
+
+
+@app.post("/predict/batch/ndjson")
+async def predict_batch_ndjson(request: Request):
+    """
+    Stream NDJSON CustomerFeatures records in and NDJSON predictions out.
+
+    Records are scored in chunks as they arrive; a line that fails
+    validation yields an ``{"line": ..., "error": ...}`` object in its place.
+    Scoring stops as soon as the client disconnects.
+    """
+    model = current_model()
+
+    async def results():
+        chunk = []
+        line_no = 0
+        try:
+            async for line in _ndjson_lines(request):
+                line_no += 1
+                try:
+                    record = CustomerFeatures.model_validate_json(line).model_dump()
+                    chunk.append((line_no, record, None))
+                except ValidationError as e:
+                    chunk.append((line_no, None,
+                                  e.errors(include_url=False, include_input=False)))
+                if len(chunk) == BATCH_CHUNK_SIZE:
+                    for row in await run_in_threadpool(_score_ndjson_chunk, model, chunk):
+                        yield json.dumps(row, default=str) + "\n"
+                    chunk = []
+        except ClientDisconnect:
+            # Raised by request.stream() while the body is still being read
+            return
+        # Only poll once the body is consumed: is_disconnected() would
+        # otherwise swallow a pending request chunk.
+        if chunk and not await request.is_disconnected():
+            for row in await run_in_threadpool(_score_ndjson_chunk, model, chunk):
+                yield json.dumps(row, default=str) + "\n"
+
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
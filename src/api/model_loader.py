@@ -0,0 +1,239 @@
+"""Model loading for the scoring service.
+
+Resolution order: the local artifact cache, then the MLflow registry (only
+when ``MLFLOW_TRACKING_URI`` is set; a successful download is written to
+the cache), then the bundled ``models/credit_model.pkl``.
+
+With ``MODEL_MMAP_DIR`` set, the resolved model is compiled once and
+exported as memory-mappable arrays (``python -m src.api.model_loader``
+does this ahead of starting the workers). Every worker then maps the same
+read-only export instead of unpickling its own copy, so adding workers
+does not multiply the model's memory.
+
+A warm cache only saves the registry download. Loading the pickle still
+imports scikit-learn, which takes about a second on one core. Only the mmap
+export avoids that import.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import joblib
+
+from src.compiled_model import (
+    EXPORT_META,
+    CompiledPipeline,
+    compile_pipeline,
+    load_compiled,
+    save_compiled,
+)
+from src.config import ServingConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    model: object
+    version: str
+    source: str
+    load_seconds: float
+    scorer: Optional[CompiledPipeline] = None
+
+
+def _slug(config: ServingConfig) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", config.model_uri).strip("_")
+
+
+def cache_path(config: ServingConfig) -> Path:
+    return Path(config.cache_dir) / f"{_slug(config)}.joblib"
+
+
+def mmap_path(config: ServingConfig) -> Path:
+    return Path(config.mmap_dir) / _slug(config)
+
+
+def _version(path: Path) -> str:
+    """``name@digest`` of a model pickle; changes whenever its contents do."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"{path.name}@{digest.hexdigest()[:16]}"
+
+
+def _source_path(config: ServingConfig) -> Optional[Path]:
+    """The pickle ``_load_pickled`` would read, if known without asking the registry."""
+    cached = cache_path(config)
+    if cached.exists():
+        return cached
+    fallback = Path(config.fallback_path)
+    if config.tracking_uri or not fallback.exists():
+        return None
+    return fallback
+
+
+def _export_is_current(config: ServingConfig, exported: Path) -> bool:
+    """Whether the export exists and was built from the model that would be loaded now."""
+    if not (exported / EXPORT_META).exists():
+        return False
+    source = _source_path(config)
+    if source is None:
+        # Only the registry knows; /admin/reload?refresh=true re-exports
+        return True
+    built = json.loads((exported / EXPORT_META).read_text()).get("version")
+    current = _version(source)
+    if built != current:
+        logger.warning("Model export %s was built from %s but %s is now %s; re-exporting",
+                       exported, built, source, current)
+        return False
+    return True
+
+
+@contextmanager
+def _registry_limits(config: ServingConfig):
+    """
+    Apply the config's registry timeout and retries for one download.
+
+    MLflow's model loaders take no timeout argument and read these
+    variables on every request, so they are set only for the duration of
+    the call and restored afterwards rather than left in the environment.
+    """
+    limits = {
+        "MLFLOW_HTTP_REQUEST_TIMEOUT": str(config.registry_timeout),
+        "MLFLOW_HTTP_REQUEST_MAX_RETRIES": str(config.registry_max_retries),
+    }
+    previous = {name: os.environ.get(name) for name in limits}
+    os.environ.update(limits)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _load_from_registry(config: ServingConfig, target: Path):
+    import mlflow.sklearn
+
+    mlflow.set_tracking_uri(config.tracking_uri)
+    with _registry_limits(config):
+        model = mlflow.sklearn.load_model(config.model_uri)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, target)
+    return model
+
+
+def _load_pickled(config: ServingConfig, refresh: bool) -> LoadedModel:
+    start = time.perf_counter()
+    cached = cache_path(config)
+
+    if cached.exists() and not refresh:
+        model, source, path = joblib.load(cached), "cache", cached
+    else:
+        model = None
+        if config.tracking_uri:
+            try:
+                model = _load_from_registry(config, cached)
+                source, path = "registry", cached
+            except Exception as e:
+                logger.warning("Registry load of %s failed: %s", config.model_uri, e)
+
+        if model is None:
+            path = Path(config.fallback_path)
+            if not path.exists():
+                raise FileNotFoundError(f"No cached, registry or fallback model: {path}")
+            model, source = joblib.load(path), "file"
+
+    try:
+        scorer = compile_pipeline(model)
+    except ValueError as e:
+        logger.info("Serving without compiled scorer: %s", e)
+        scorer = None
+
+    elapsed = time.perf_counter() - start
+    logger.info("Loaded model from %s (%s) in %.3fs", source, path, elapsed)
+    return LoadedModel(model=model, version=_version(path), source=source,
+                       load_seconds=elapsed, scorer=scorer)
+
+
+def load_sklearn_model(config: ServingConfig, loaded: LoadedModel):
+    """
+    The fitted sklearn model behind ``loaded``.
+
+    A mapped export only holds arrays (tree models lose their sklearn
+    classifier), so its source pickle is loaded instead.
+    """
+    if loaded.source != "mmap":
+        return loaded.model
+    return _load_pickled(config, refresh=False).model
+
+
+def export_model(config: ServingConfig, refresh: bool = False) -> Optional[Path]:
+    """
+    Resolve and compile the model, then write its memory-mappable export.
+
+    Returns None (and writes nothing) when the model has no compiled
+    form; workers then serve the pickle.
+    """
+    loaded = _load_pickled(config, refresh)
+    if loaded.scorer is None:
+        logger.warning("Model has no compiled form; workers will serve the pickle instead")
+        return None
+    return save_compiled(loaded.scorer, mmap_path(config), version=loaded.version)
+
+
+def load_model(config: ServingConfig, refresh: bool = False) -> LoadedModel:
+    """
+    Load the scoring model, preferring the local cache.
+
+    ``refresh=True`` skips the cache and re-downloads from the registry
+    when one is configured. With ``config.mmap_dir`` set, the export is
+    mapped. It is written first if it is missing, if ``refresh`` is set,
+    or if it was built from a different pickle than the one that would be
+    loaded now. A model that cannot be compiled is served from its pickle
+    instead.
+    """
+    if not config.mmap_dir:
+        return _load_pickled(config, refresh)
+
+    start = time.perf_counter()
+    exported = mmap_path(config)
+    if refresh or not _export_is_current(config, exported):
+        loaded = _load_pickled(config, refresh)
+        if loaded.scorer is None:
+            return loaded
+        save_compiled(loaded.scorer, exported, version=loaded.version)
+
+    scorer = load_compiled(exported)
+    elapsed = time.perf_counter() - start
+    logger.info("Mapped model export %s in %.3fs", exported, elapsed)
+    return LoadedModel(model=scorer, version=scorer.version, source="mmap",
+                       load_seconds=elapsed, scorer=scorer)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the serving model for mmap loading.")
+    parser.add_argument("--refresh", action="store_true", help="bypass the local model cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = ServingConfig()
+    if not config.mmap_dir:
+        parser.error("MODEL_MMAP_DIR is not set")
+    exported = export_model(config, refresh=args.refresh)
+    if exported is not None:
+        print(exported)
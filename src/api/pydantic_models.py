@@ -10,4 +10,5 @@ class CustomerFeatures(BaseModel):
 
 class PredictionResponse(BaseModel):
     risk_probability: float
-    credit_score: float
\ No newline at end of file
+    credit_score: float
+    loan_offer: str
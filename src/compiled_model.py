@@ -0,0 +1,513 @@
+"""Compiled scoring path for fitted preprocessing + classifier pipelines.
+
+``compile_pipeline`` extracts the fitted imputation values, scaler
+statistics, one-hot category maps, compact-encoder lookup tables and WoE
+bins from a pipeline built with ``src.preprocessing.build_preprocessor``
+into plain NumPy arrays and dictionaries. Single rows are then written
+straight into a preallocated feature vector, skipping DataFrame
+construction and sklearn input validation, while producing the same
+probabilities as ``pipeline.predict_proba``.
+
+``save_compiled`` writes a compiled pipeline as ``.npy`` arrays plus a JSON
+manifest; ``load_compiled`` maps them back read-only. Serving workers that
+load an export share the model's pages instead of each unpickling a copy,
+and never import scikit-learn (it is only imported to compile a pipeline).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+
+from src.tree_engine import FlatTreeEnsemble
+
+# Batches up to this size go through the flat NumPy tree engine, where it
+# avoids sklearn's per-call overhead; larger ones use sklearn directly.
+FLAT_ENGINE_MAX_ROWS = 256
+
+EXPORT_META = "meta.json"
+
+
+def _is_nan_marker(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _plain(value):
+    """NumPy scalars as Python values, for the JSON manifest."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _steps(transformer) -> list:
+    from sklearn.pipeline import Pipeline
+
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps]
+    return [transformer]
+
+
+class _NumericBlock:
+    kind = "numeric"
+
+    def __init__(self, features: List[str], fill: np.ndarray, mean: np.ndarray,
+                 scale: np.ndarray, center: bool, rescale: bool):
+        self.features = features
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+        self.center = center
+        self.rescale = rescale
+        self.width = len(features)
+
+    @classmethod
+    def from_steps(cls, features: List[str], steps: list) -> "_NumericBlock":
+        from sklearn.impute import SimpleImputer
+        from sklearn.preprocessing import StandardScaler
+
+        n = len(features)
+        fill = np.full(n, np.nan)
+        mean = np.zeros(n)
+        scale = np.ones(n)
+        center = rescale = False
+
+        for step in steps:
+            if isinstance(step, SimpleImputer) and _is_nan_marker(step.missing_values):
+                fill = step.statistics_.astype(np.float64)
+            elif isinstance(step, StandardScaler):
+                if step.with_mean:
+                    center, mean = True, step.mean_
+                if step.with_std:
+                    rescale, scale = True, step.scale_
+            else:
+                raise ValueError(f"Unsupported numeric step: {type(step).__name__}")
+
+        return cls(features, fill, mean, scale, center, rescale)
+
+    def state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        arrays = {"fill": self.fill, "mean": self.mean, "scale": self.scale}
+        meta = {"features": self.features, "center": self.center, "rescale": self.rescale}
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "_NumericBlock":
+        return cls(meta["features"], arrays["fill"], arrays["mean"], arrays["scale"],
+                   meta["center"], meta["rescale"])
+
+    def write_one(self, features: Dict, out: np.ndarray) -> None:
+        for i, name in enumerate(self.features):
+            value = features[name]
+            out[i] = self.fill[i] if _is_nan_marker(value) else value
+        if self.center:
+            out -= self.mean
+        if self.rescale:
+            out /= self.scale
+
+    def write(self, df: pd.DataFrame, out: np.ndarray) -> None:
+        values = df[self.features].to_numpy(dtype=np.float64, copy=True)
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = np.broadcast_to(self.fill, values.shape)[missing]
+        if self.center:
+            values -= self.mean
+        if self.rescale:
+            values /= self.scale
+        out[:] = values
+
+
+class _OneHotBlock:
+    kind = "onehot"
+
+    def __init__(self, features: List[str], fill: List[Optional[object]], categories: list):
+        self.features = features
+        self.fill = fill
+        self.categories = [pd.Index(c) for c in categories]
+        self.offsets = np.cumsum([0] + [len(c) for c in self.categories])
+        self.index = [
+            {value: int(offset) + j for j, value in enumerate(cats)}
+            for offset, cats in zip(self.offsets, self.categories)
+        ]
+        self.width = int(self.offsets[-1])
+
+    @classmethod
+    def from_steps(cls, features: List[str], steps: list) -> "_OneHotBlock":
+        from sklearn.impute import SimpleImputer
+        from sklearn.preprocessing import OneHotEncoder
+
+        fill: List[Optional[object]] = [None] * len(features)
+        encoder = None
+
+        for step in steps:
+            if isinstance(step, SimpleImputer) and _is_nan_marker(step.missing_values):
+                fill = list(step.statistics_)
+            elif isinstance(step, OneHotEncoder):
+                encoder = step
+            else:
+                raise ValueError(f"Unsupported categorical step: {type(step).__name__}")
+
+        if encoder is None or encoder.drop_idx_ is not None:
+            raise ValueError("Categorical block must end in a OneHotEncoder without drop")
+        if encoder.handle_unknown != "ignore" or any(
+            c is not None for c in (getattr(encoder, "infrequent_categories_", None) or [])
+        ):
+            raise ValueError("Only OneHotEncoder(handle_unknown='ignore') is supported")
+
+        return cls(features, fill, encoder.categories_)
+
+    def state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        meta = {
+            "features": self.features,
+            "fill": [_plain(value) for value in self.fill],
+            "categories": [[_plain(value) for value in cats] for cats in self.categories],
+        }
+        return {}, meta
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "_OneHotBlock":
+        return cls(meta["features"], meta["fill"], meta["categories"])
+
+    def write_one(self, features: Dict, out: np.ndarray) -> None:
+        out[:] = 0.0
+        for i, name in enumerate(self.features):
+            value = features[name]
+            if _is_nan_marker(value):
+                value = self.fill[i]
+            position = self.index[i].get(value)
+            if position is not None:
+                out[position] = 1.0
+
+    def write(self, df: pd.DataFrame, out: np.ndarray) -> None:
+        out[:] = 0.0
+        rows = np.arange(len(df))
+        for i, name in enumerate(self.features):
+            column = df[name]
+            if self.fill[i] is not None:
+                column = column.where(column.notna(), self.fill[i])
+            codes = self.categories[i].get_indexer(column)
+            known = codes >= 0
+            out[rows[known], self.offsets[i] + codes[known]] = 1.0
+
+
+class _LookupBlock:
+    """One column per feature holding a fitted ``CompactEncoder`` value."""
+
+    kind = "lookup"
+
+    def __init__(self, features: List[str], categories: list, values: List[np.ndarray],
+                 defaults: List[float]):
+        self.features = features
+        self.categories = [pd.Index(c) for c in categories]
+        self.values = values
+        self.defaults = [float(d) for d in defaults]
+        self.index = [dict(zip(cats, vals.tolist()))
+                      for cats, vals in zip(self.categories, self.values)]
+        self.width = len(features)
+
+    @classmethod
+    def from_steps(cls, features: List[str], steps: list) -> "_LookupBlock":
+        if len(steps) != 1:
+            raise ValueError("A compact-encoded block must be a lone CompactEncoder")
+        stats = steps[0].stats_
+        return cls(features, [s[0] for s in stats], [s[1] for s in stats],
+                   [s[2] for s in stats])
+
+    def write_one(self, features: Dict, out: np.ndarray) -> None:
+        for i, name in enumerate(self.features):
+            value = features[name]
+            out[i] = self.defaults[i] if _is_nan_marker(value) else self.index[i].get(
+                value, self.defaults[i]
+            )
+
+    def write(self, df: pd.DataFrame, out: np.ndarray) -> None:
+        for i, name in enumerate(self.features):
+            table = np.append(self.values[i], self.defaults[i])
+            out[:, i] = table.take(self.categories[i].get_indexer(df[name]))
+
+    def state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        arrays = {f"values{i}": values for i, values in enumerate(self.values)}
+        meta = {
+            "features": self.features,
+            "categories": [[_plain(value) for value in cats] for cats in self.categories],
+            "defaults": self.defaults,
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "_LookupBlock":
+        values = [arrays[f"values{i}"] for i in range(len(meta["features"]))]
+        return cls(meta["features"], meta["categories"], values, meta["defaults"])
+
+
+class _WoEBlock:
+    """One column per feature holding its binned weight of evidence."""
+
+    kind = "woe"
+
+    def __init__(self, features: List[str], bins: list):
+        self.features = features
+        self.bins = bins
+        self.width = len(features)
+
+    @classmethod
+    def from_steps(cls, features: List[str], steps: list) -> "_WoEBlock":
+        if len(steps) != 1:
+            raise ValueError("A WoE block must be a lone WoEEncoder")
+        binning = steps[0].binning_
+        return cls(features, [binning.bins[f] for f in features])
+
+    def write_one(self, features: Dict, out: np.ndarray) -> None:
+        for i, (name, bins) in enumerate(zip(self.features, self.bins)):
+            out[i] = bins.transform_one(features[name])
+
+    def write(self, df: pd.DataFrame, out: np.ndarray) -> None:
+        for i, (name, bins) in enumerate(zip(self.features, self.bins)):
+            out[:, i] = bins.transform(df[name].to_numpy())
+
+    def state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        return {}, {"features": self.features, "bins": [b.to_dict() for b in self.bins]}
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "_WoEBlock":
+        from src.woe import FeatureBins
+
+        return cls(meta["features"], [FeatureBins(**spec) for spec in meta["bins"]])
+
+
+_BLOCK_TYPES = {
+    block.kind: block for block in (_NumericBlock, _OneHotBlock, _LookupBlock, _WoEBlock)
+}
+
+
+class CompiledPipeline:
+    """
+    NumPy re-implementation of a fitted preprocessor + classifier pipeline.
+
+    The classifier is either a ``FlatTreeEnsemble`` or the coefficients of
+    a binary logistic regression. ``classifier`` keeps the fitted sklearn
+    estimator when there is one, so large tree batches can go through its
+    Cython traversal; a pipeline mapped from an export has none and scores
+    every batch with the flat engine.
+    """
+
+    def __init__(
+        self,
+        blocks: list,
+        classes: np.ndarray,
+        engine: Optional[FlatTreeEnsemble] = None,
+        coef: Optional[np.ndarray] = None,
+        intercept: Optional[np.ndarray] = None,
+        classifier=None,
+        version: Optional[str] = None
+    ):
+        if engine is None and coef is None:
+            raise ValueError("Need a tree engine or linear coefficients")
+        self.blocks = blocks
+        bounds = np.cumsum([0] + [b.width for b in self.blocks])
+        self.slices = [slice(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.n_features = int(bounds[-1])
+        self.features = [f for b in self.blocks for f in b.features]
+        self.classes_ = classes
+        self.engine = engine
+        self.coef = coef
+        self.intercept = intercept
+        self.classifier = classifier
+        self.version = version
+        self._local = threading.local()
+
+    @property
+    def column_features(self) -> List[str]:
+        """Source feature of every transformed column; one-hot columns share theirs."""
+        names: List[str] = []
+        for block in self.blocks:
+            if block.kind == "onehot":
+                for feature, categories in zip(block.features, block.categories):
+                    names.extend([feature] * len(categories))
+            else:
+                names.extend(block.features)
+        return names
+
+    @property
+    def one_hot_features(self) -> List[str]:
+        """Features expanded into one-hot indicator columns."""
+        return [f for block in self.blocks if block.kind == "onehot" for f in block.features]
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        if self.engine is not None:
+            # sklearn's Cython traversal wins on large batches; both
+            # paths give identical probabilities.
+            if self.classifier is not None and X.shape[0] > FLAT_ENGINE_MAX_ROWS:
+                return self.classifier.predict_proba(X)
+            return self.engine.predict_proba(X)
+
+        prob = (X @ self.coef.T + self.intercept).ravel()
+        expit(prob, out=prob)
+        return np.vstack([1 - prob, prob]).T
+
+    def _buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.empty((1, self.n_features))
+        return buffer
+
+    def transform_one(self, features: Dict) -> np.ndarray:
+        """Write one record into this thread's preallocated feature vector."""
+        missing = [f for f in self.features if f not in features]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+
+        buffer = self._buffer()
+        for block, part in zip(self.blocks, self.slices):
+            block.write_one(features, buffer[0, part])
+        return buffer
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        out = np.empty((len(df), self.n_features))
+        for block, part in zip(self.blocks, self.slices):
+            block.write(df, out[:, part])
+        return out
+
+    def predict_proba_one(self, features: Dict) -> np.ndarray:
+        return self._predict(self.transform_one(features))[0]
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        return self._predict(self.transform(df))
+
+
+def _compile_classifier(classifier) -> Dict:
+    from sklearn.ensemble import (
+        ExtraTreesClassifier,
+        GradientBoostingClassifier,
+        RandomForestClassifier,
+    )
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    tree_ensembles = (
+        RandomForestClassifier,
+        ExtraTreesClassifier,
+        GradientBoostingClassifier,
+        DecisionTreeClassifier,
+    )
+    if isinstance(classifier, tree_ensembles):
+        return {"engine": FlatTreeEnsemble.from_estimator(classifier)}
+    if isinstance(classifier, LogisticRegression) and len(classifier.classes_) == 2:
+        return {"coef": classifier.coef_, "intercept": classifier.intercept_}
+    raise ValueError(f"Unsupported classifier: {type(classifier).__name__}")
+
+
+def compile_pipeline(pipeline) -> CompiledPipeline:
+    """Compile a fitted pipeline; raises ValueError for unsupported steps."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    from src.woe import WoEEncoder
+    from src.preprocessing import CompactEncoder
+
+    if not isinstance(pipeline, Pipeline) or not {"preprocessor", "classifier"} <= set(
+        pipeline.named_steps
+    ):
+        raise ValueError("Expected a Pipeline with 'preprocessor' and 'classifier' steps")
+
+    preprocessor = pipeline.named_steps["preprocessor"]
+    classifier = pipeline.named_steps["classifier"]
+
+    if not isinstance(preprocessor, ColumnTransformer) or preprocessor.remainder != "drop":
+        raise ValueError("Preprocessor must be a ColumnTransformer with remainder='drop'")
+
+    blocks = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or name == "remainder" or len(columns) == 0:
+            continue
+        columns = list(columns)
+        steps = _steps(transformer)
+        if any(isinstance(s, OneHotEncoder) for s in steps):
+            blocks.append(_OneHotBlock.from_steps(columns, steps))
+        elif any(isinstance(s, CompactEncoder) for s in steps):
+            blocks.append(_LookupBlock.from_steps(columns, steps))
+        elif any(isinstance(s, WoEEncoder) for s in steps):
+            blocks.append(_WoEBlock.from_steps(columns, steps))
+        else:
+            blocks.append(_NumericBlock.from_steps(columns, steps))
+
+    return CompiledPipeline(blocks, classifier.classes_, classifier=classifier,
+                            **_compile_classifier(classifier))
+
+
+def save_compiled(
+    compiled: CompiledPipeline,
+    directory: Union[str, Path],
+    version: Optional[str] = None
+) -> Path:
+    """
+    Write ``compiled`` as ``.npy`` arrays plus a JSON manifest.
+
+    The export is assembled in a sibling temporary directory and renamed
+    into place, so readers never see a partial export; if another process
+    publishes the same export first, its copy is kept.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+
+    try:
+        blocks = []
+        for i, block in enumerate(compiled.blocks):
+            arrays, meta = block.state()
+            for name, array in arrays.items():
+                np.save(staging / f"block{i}_{name}.npy", array)
+            blocks.append({"kind": block.kind, "arrays": sorted(arrays), **meta})
+
+        meta = {
+            "version": version or compiled.version,
+            "classes": [_plain(c) for c in compiled.classes_],
+            "blocks": blocks,
+        }
+        if compiled.engine is not None:
+            compiled.engine.save(staging)
+            meta["classifier"] = "trees"
+        else:
+            np.save(staging / "coef.npy", compiled.coef)
+            np.save(staging / "intercept.npy", compiled.intercept)
+            meta["classifier"] = "linear"
+        (staging / EXPORT_META).write_text(json.dumps(meta))
+
+        if directory.exists():
+            retired = Path(tempfile.mkdtemp(prefix=f".{directory.name}-old-",
+                                            dir=directory.parent))
+            os.replace(directory, retired / directory.name)
+            shutil.rmtree(retired, ignore_errors=True)
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            if not (directory / EXPORT_META).exists():
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+def load_compiled(directory: Union[str, Path], mmap_mode: Optional[str] = "r") -> CompiledPipeline:
+    """Map an export written by ``save_compiled``; arrays are read-only views of the files."""
+    directory = Path(directory)
+    meta = json.loads((directory / EXPORT_META).read_text())
+
+    def array(name):
+        return np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+
+    blocks = []
+    for i, spec in enumerate(meta["blocks"]):
+        arrays = {name: array(f"block{i}_{name}") for name in spec["arrays"]}
+        blocks.append(_BLOCK_TYPES[spec["kind"]].from_state(arrays, spec))
+
+    if meta["classifier"] == "trees":
+        parts = {"engine": FlatTreeEnsemble.load(directory, mmap_mode=mmap_mode)}
+    else:
+        parts = {"coef": array("coef"), "intercept": array("intercept")}
+    return CompiledPipeline(blocks, np.asarray(meta["classes"]), version=meta["version"],
+                            **parts)
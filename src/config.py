@@ -1,4 +1,14 @@
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+def _env(name: str, default: Optional[str] = None, cast=str):
+    def read():
+        value = os.getenv(name, default)
+        return None if value is None else cast(value)
+    return field(default_factory=read)
+
 
 @dataclass
 class ModelConfig:
@@ -8,3 +18,23 @@ class ModelConfig:
    model_path: str = "models/credit_model.pkl"
 
 
+@dataclass
+class ServingConfig:
+    """Where the scoring API gets its model from; read from the environment."""
+    model_uri: str = _env("MODEL_URI", "models:/CreditRiskModel/latest")
+    tracking_uri: Optional[str] = _env("MLFLOW_TRACKING_URI")
+    cache_dir: str = _env("MODEL_CACHE_DIR", "models/cache")
+    fallback_path: str = _env("MODEL_FALLBACK_PATH", "models/credit_model.pkl")
+    mmap_dir: Optional[str] = _env("MODEL_MMAP_DIR")
+    registry_timeout: int = _env("MODEL_REGISTRY_TIMEOUT", "10", cast=int)
+    registry_max_retries: int = _env("MODEL_REGISTRY_MAX_RETRIES", "0", cast=int)
+    cache_size: int = _env("PREDICTION_CACHE_SIZE", "10000", cast=int)
+    cache_ttl: float = _env("PREDICTION_CACHE_TTL", "300", cast=float)
+    batch_max_size: int = _env("PREDICT_BATCH_MAX_SIZE", "64", cast=int)
+    batch_max_wait_ms: float = _env("PREDICT_BATCH_MAX_WAIT_MS", "2", cast=float)
+    batch_workers: int = _env("PREDICT_BATCH_WORKERS", "2", cast=int)
+    feature_store_path: Optional[str] = _env("FEATURE_STORE_PATH")
+    # Defaults to the training background saved next to MODEL_FALLBACK_PATH
+    background_path: Optional[str] = _env("EXPLAIN_BACKGROUND_PATH")
+    # /admin/* endpoints are disabled unless this is set
+    admin_token: Optional[str] = _env("ADMIN_TOKEN")
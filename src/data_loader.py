@@ -1,4 +1,45 @@
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
 import pandas as pd
+from pandas.api import types as ptypes
+
+from src.data_validation import REQUIRED_COLUMNS, validate_schema
+
+logger = logging.getLogger(__name__)
+
+# Explicit dtypes for the Xente transaction schema. Provider, product,
+# channel and currency codes take a handful of values, so they are read
+# straight into categoricals. The account, subscription and customer IDs
+# repeat once per customer, not per row. On synthetic data shaped like the
+# raw file (95,662 rows, 3,742 customers), memory_report shows categories
+# save 80-83% of their memory, and still 45-51% at 2M rows with ~5
+# transactions per customer. TransactionId is unique per row and BatchId
+# nearly so (categories cost 16-37% more), so both stay plain strings.
+# Monetary columns stay 64-bit so downstream sums are exact.
+TRANSACTION_DTYPES: Dict[str, str] = {
+    "TransactionId": "str",
+    "BatchId": "str",
+    "AccountId": "category",
+    "SubscriptionId": "category",
+    "CustomerId": "category",
+    "CurrencyCode": "category",
+    "CountryCode": "int16",
+    "ProviderId": "category",
+    "ProductId": "category",
+    "ProductCategory": "category",
+    "ChannelId": "category",
+    "Amount": "float64",
+    "Value": "int64",
+    "PricingStrategy": "int8",
+    "FraudResult": "int8",
+}
+
+DATE_COLUMNS = ["TransactionStartTime"]
+
+# Summed into customer totals, so never narrowed (float32 sums drift)
+MONETARY_COLUMNS = ("Amount", "Value")
 
 
 def load_data(path: str):
@@ -9,6 +50,106 @@ def load_data(path: str):
     return df
 
 
+def transaction_dtypes(columns: List[str]) -> Dict[str, str]:
+    """
+    Build the read_csv dtype mapping for the columns present in a file.
+    """
+    missing = REQUIRED_COLUMNS - set(columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    return {col: TRANSACTION_DTYPES[col] for col in columns if col in TRANSACTION_DTYPES}
+
+
+def load_data_chunks(
+    path: str,
+    chunksize: int = 100_000,
+    usecols: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a transaction CSV as typed, validated chunks.
+
+    Peak memory is bounded by ``chunksize`` rather than file size.
+    Categories are inferred per chunk, so consumers that concatenate
+    chunks should union categories or aggregate chunk by chunk.
+    """
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer")
+
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    columns = header if usecols is None else [c for c in header if c in set(usecols)]
+    dtypes = transaction_dtypes(columns)
+    parse_dates = [c for c in DATE_COLUMNS if c in columns]
+
+    reader = pd.read_csv(
+        path,
+        usecols=columns,
+        dtype=dtypes,
+        parse_dates=parse_dates,
+        chunksize=chunksize,
+    )
+
+    with reader:
+        for chunk in reader:
+            validate_schema(chunk)
+            yield chunk
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    max_category_ratio: float = 0.5,
+    keep_wide: Iterable[str] = MONETARY_COLUMNS
+) -> pd.DataFrame:
+    """
+    Shrink a frame's dtypes without changing any value.
+
+    Integers go to the smallest type that holds their range, floats to
+    float32 only when every value round-trips exactly, and string columns
+    with at most ``max_category_ratio`` distinct values per row become
+    categoricals. Columns in ``keep_wide`` are left alone. Returns a
+    shallow copy, so untouched columns share memory with ``df``.
+    """
+    keep_wide = set(keep_wide)
+    out = df.copy(deep=False)
+    for col in out.columns:
+        s = out[col]
+        if col in keep_wide or isinstance(s.dtype, pd.CategoricalDtype):
+            continue
+        if ptypes.is_bool_dtype(s) or ptypes.is_datetime64_any_dtype(s):
+            continue
+        if ptypes.is_integer_dtype(s) and isinstance(s.dtype, np.dtype):
+            out[col] = pd.to_numeric(s, downcast="integer")
+        elif ptypes.is_float_dtype(s) and isinstance(s.dtype, np.dtype):
+            narrow = s.to_numpy().astype(np.float32)
+            if np.array_equal(narrow.astype(s.dtype), s.to_numpy(), equal_nan=True):
+                out[col] = pd.Series(narrow, index=s.index)
+        elif ptypes.is_object_dtype(s) or ptypes.is_string_dtype(s):
+            if s.nunique(dropna=True) <= max_category_ratio * len(s):
+                out[col] = s.astype("category")
+    return out
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and deep memory usage of two versions of a frame."""
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+        "bytes_before": before.memory_usage(deep=True, index=False),
+        "bytes_after": after.memory_usage(deep=True, index=False),
+    })
+    report.loc["TOTAL"] = ["", "", report["bytes_before"].sum(), report["bytes_after"].sum()]
+    report["saved"] = 1 - report["bytes_after"] / report["bytes_before"]
+    return report
+
+
+def compact_logged(df: pd.DataFrame) -> pd.DataFrame:
+    """``compact_dtypes`` with the per-column memory report logged at INFO."""
+    compacted = compact_dtypes(df)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Dtype compaction:\n%s", memory_report(df, compacted).to_string())
+    return compacted
+
+
 def split_features_target(df, target: str):
     """
     Split dataframe into features (X) and target (y).
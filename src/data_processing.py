@@ -17,21 +17,25 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 
+from src.data_loader import compact_logged  # noqa: E402
+from src.io import load_processed, save_processed  # noqa: E402
+from src.rolling_features import asof_join  # noqa: E402
+
 RAW_PATH = Path(r"c:\Users\hp\Pictures\Bati Bank\Credit-Risk-Probability-Model-for-Alternative-Data\data\raw\CreditRisk-data.csv")
 PROCESSED_PATH = Path(r"C:\Users\hp\Pictures\Bati Bank\Credit-Risk-Probability-Model-for-Alternative-Data\data\process\processed.csv")
 
 
 def load_data(path: Path) -> pd.DataFrame:
-    """Safely load raw transaction data."""
+    """Safely load raw transaction data (CSV, or Parquet written by ``src.io``)."""
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
 
-    df = pd.read_csv(path, parse_dates=["TransactionStartTime"])
+    df = load_processed(path)
 
     if df.empty:
         raise ValueError("Loaded dataset is empty")
 
-    return df
+    return compact_logged(df)
 
 
 def create_aggregates(df: pd.DataFrame) -> pd.DataFrame:
@@ -52,27 +56,31 @@ def create_aggregates(df: pd.DataFrame) -> pd.DataFrame:
 
 def extract_time_features(df: pd.DataFrame) -> pd.DataFrame:
     """Extract time-based behavioral features."""
-    df = df.copy()
+    # Shallow copy: new columns are added without copying existing ones
+    df = df.copy(deep=False)
     ts = df["TransactionStartTime"]
 
-    df["txn_hour"] = ts.dt.hour
-    df["txn_day"] = ts.dt.day
-    df["txn_month"] = ts.dt.month
-    df["txn_year"] = ts.dt.year
+    df["txn_hour"] = ts.dt.hour.astype("int8")
+    df["txn_day"] = ts.dt.day.astype("int8")
+    df["txn_month"] = ts.dt.month.astype("int8")
+    df["txn_year"] = ts.dt.year.astype("int16")
 
     return df
 
 
-def build_features() -> pd.DataFrame:
-    """End-to-end feature generation."""
+def build_features(out_path: Path = PROCESSED_PATH) -> pd.DataFrame:
+    """End-to-end feature generation.
+
+    ``out_path`` ending in ``.csv`` keeps the CSV output; any other path is
+    written as a month-partitioned Parquet dataset (see ``src.io``).
+    """
     df = load_data(RAW_PATH)
     df = extract_time_features(df)
 
-    agg = create_aggregates(df)
+    # Each row only sees its customer's earlier transactions (no leakage)
+    final_df = asof_join(df, df)
 
-    final_df = pd.merge(df, agg, on="CustomerId", how="left")
-
-    final_df.to_csv(PROCESSED_PATH, index=False)
+    save_processed(final_df, out_path)
     return final_df
 
 
@@ -98,40 +106,26 @@ OUT_PATH = Path(r"C:\Users\hp\Pictures\Bati Bank\Credit-Risk-Probability-Model-f
 def load_data(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Missing data file: {path}")
-    df = pd.read_csv(path, parse_dates=["TransactionStartTime"])
+    df = load_processed(path)
     if df.isnull().all().any():
         raise ValueError("One or more columns are fully null")
-    return df
+    return compact_logged(df)
 
 
 def add_time_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    df = df.copy(deep=False)
     ts = df["TransactionStartTime"]
-    df["txn_hour"] = ts.dt.hour
-    df["txn_day"] = ts.dt.day
-    df["txn_month"] = ts.dt.month
+    df["txn_hour"] = ts.dt.hour.astype("int8")
+    df["txn_day"] = ts.dt.day.astype("int8")
+    df["txn_month"] = ts.dt.month.astype("int8")
     return df
 
 
-def aggregate_customer(df: pd.DataFrame) -> pd.DataFrame:
-    agg = df.groupby("CustomerId").agg(
-        total_amount=("Amount", "sum"),
-        avg_amount=("Amount", "mean"),
-        txn_count=("TransactionId", "count"),
-        amount_std=("Amount", "std"),
-    ).reset_index()
-
-    agg["amount_std"] = agg["amount_std"].fillna(0)
-    return agg
-
-
-def build_training_table() -> pd.DataFrame:
+def build_training_table(out_path: Path = OUT_PATH) -> pd.DataFrame:
     df = load_data(RAW_PATH)
     df = add_time_features(df)
-    agg = aggregate_customer(df)
-
-    df = df.merge(agg, on="CustomerId", how="left")
-    df.to_csv(OUT_PATH, index=False)
+    df = asof_join(df, df)
+    save_processed(df, out_path)
     return df
 
 
@@ -9,6 +9,10 @@ from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.impute import SimpleImputer
 
+from src.data_loader import compact_logged
+from src.io import load_processed, save_processed
+from src.rolling_features import asof_join
+
 RAW_PATH = Path(r"C:\Users\hp\Pictures\Bati Bank\Credit-Risk-Probability-Model-for-Alternative-Data\data\raw\CreditRisk-data.csv")
 OUT_PATH = Path(r"C:\Users\hp\Pictures\Bati Bank\Credit-Risk-Probability-Model-for-Alternative-Data\data\process/training_data.csv")
 
@@ -16,42 +20,28 @@ OUT_PATH = Path(r"C:\Users\hp\Pictures\Bati Bank\Credit-Risk-Probability-Model-f
 def load_data(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Missing data file: {path}")
-    df = pd.read_csv(path, parse_dates=["TransactionStartTime"])
+    df = load_processed(path)
     if df.isnull().all().any():
         raise ValueError("One or more columns are fully null")
-    return df
+    return compact_logged(df)
 
 
 def add_time_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    df = df.copy(deep=False)
     ts = df["TransactionStartTime"]
-    df["txn_hour"] = ts.dt.hour
-    df["txn_day"] = ts.dt.day
-    df["txn_month"] = ts.dt.month
+    df["txn_hour"] = ts.dt.hour.astype("int8")
+    df["txn_day"] = ts.dt.day.astype("int8")
+    df["txn_month"] = ts.dt.month.astype("int8")
     return df
 
 
-def aggregate_customer(df: pd.DataFrame) -> pd.DataFrame:
-    agg = df.groupby("CustomerId").agg(
-        total_amount=("Amount", "sum"),
-        avg_amount=("Amount", "mean"),
-        txn_count=("TransactionId", "count"),
-        amount_std=("Amount", "std"),
-    ).reset_index()
-
-    agg["amount_std"] = agg["amount_std"].fillna(0)
-    return agg
-
-
-def build_training_table() -> pd.DataFrame:
+def build_training_table(out_path: Path = OUT_PATH) -> pd.DataFrame:
     df = load_data(RAW_PATH)
     df = add_time_features(df)
-    agg = aggregate_customer(df)
-
-    df = df.merge(agg, on="CustomerId", how="left")
-    df.to_csv(OUT_PATH, index=False)
+    df = asof_join(df, df)
+    save_processed(df, out_path)
     return df
 
 
 if __name__ == "__main__":
-    build_training_table()
\ No newline at end of file
+    build_training_table()
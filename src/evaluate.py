@@ -1,5 +1,219 @@
+"""Model evaluation, in memory or out of core.
+
+``ScoreHistogram`` accumulates positive and negative counts (and score
+sums) over fixed-width score bins, one ``np.bincount`` per chunk. Two
+histograms built with the same number of bins merge by addition, so
+workers can each score a shard and combine. AUC/Gini, KS, PR-AUC,
+calibration and confusion matrices at any bin-edge threshold then
+come from cumulative sums over the bins; with the default 10,000 bins
+they agree with the exact metrics to about 1e-4. Bootstrap intervals
+resample the bin counts (equivalent to resampling rows once scores are
+binned), so they cost O(bins) per replicate instead of O(rows).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.metrics import classification_report
 
+DEFAULT_BINS = 10_000
+
+
 def evaluate_model(model, X_test, y_test):
     y_pred = model.predict(X_test)
     return classification_report(y_test, y_pred)
+
+
+@dataclass
+class ScoreHistogram:
+    """Per-bin positive/negative counts and score sums over [0, 1]."""
+
+    pos: np.ndarray
+    neg: np.ndarray
+    score_sum: np.ndarray
+
+    @classmethod
+    def empty(cls, n_bins: int = DEFAULT_BINS) -> "ScoreHistogram":
+        return cls(np.zeros(n_bins), np.zeros(n_bins), np.zeros(n_bins))
+
+    @property
+    def n_bins(self) -> int:
+        return len(self.pos)
+
+    def update(self, y_true, scores) -> "ScoreHistogram":
+        """Add a chunk of labels and scores in place."""
+        y = np.asarray(y_true).astype(bool)
+        scores = np.clip(np.asarray(scores, dtype=np.float64), 0.0, 1.0)
+        bins = np.minimum((scores * self.n_bins).astype(np.intp), self.n_bins - 1)
+        self.pos += np.bincount(bins[y], minlength=self.n_bins)
+        self.neg += np.bincount(bins[~y], minlength=self.n_bins)
+        self.score_sum += np.bincount(bins, weights=scores, minlength=self.n_bins)
+        return self
+
+    def __add__(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        if self.n_bins != other.n_bins:
+            raise ValueError("Histograms with different bin counts cannot be merged")
+        return ScoreHistogram(self.pos + other.pos, self.neg + other.neg,
+                              self.score_sum + other.score_sum)
+
+    def _above(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Positives and negatives scoring at or above each bin's lower edge."""
+        return np.cumsum(self.pos[::-1])[::-1], np.cumsum(self.neg[::-1])[::-1]
+
+    def auc(self) -> float:
+        """ROC AUC; scores sharing a bin count as ties."""
+        n_pos, n_neg = self.pos.sum(), self.neg.sum()
+        if n_pos == 0 or n_neg == 0:
+            return float("nan")
+        pos_above = np.cumsum(self.pos[::-1])[::-1] - self.pos
+        return float((self.neg * (pos_above + 0.5 * self.pos)).sum() / (n_pos * n_neg))
+
+    def gini(self) -> float:
+        return 2 * self.auc() - 1
+
+    def ks(self) -> float:
+        """Kolmogorov-Smirnov: largest gap between the class score CDFs."""
+        n_pos, n_neg = self.pos.sum(), self.neg.sum()
+        if n_pos == 0 or n_neg == 0:
+            return float("nan")
+        return float(np.abs(np.cumsum(self.pos) / n_pos - np.cumsum(self.neg) / n_neg).max())
+
+    def pr_auc(self) -> float:
+        """Average precision, with one threshold per non-empty bin (as sklearn)."""
+        tp, fp = self._above()
+        n_pos = tp[0] if len(tp) else 0.0
+        if n_pos == 0:
+            return float("nan")
+        # Walk thresholds from the highest score down
+        tp, fp, pos = tp[::-1], fp[::-1], self.pos[::-1]
+        predicted = tp + fp
+        with np.errstate(invalid="ignore", divide="ignore"):
+            precision = np.where(predicted > 0, tp / predicted, 1.0)
+        return float((pos / n_pos * precision).sum())
+
+    def calibration(self, n_bins: int = 10) -> pd.DataFrame:
+        """Mean predicted vs observed default rate over ``n_bins`` equal-width bins."""
+        if self.n_bins % n_bins:
+            raise ValueError(f"n_bins must divide {self.n_bins}")
+        width = self.n_bins // n_bins
+        pos = self.pos.reshape(n_bins, width).sum(axis=1)
+        count = pos + self.neg.reshape(n_bins, width).sum(axis=1)
+        score_sum = self.score_sum.reshape(n_bins, width).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "bin_lower": np.arange(n_bins) / n_bins,
+                "bin_upper": np.arange(1, n_bins + 1) / n_bins,
+                "count": count,
+                "mean_predicted": score_sum / count,
+                "observed_rate": pos / count,
+            })
+
+    def confusion(self, thresholds: Sequence[float] = np.linspace(0.05, 0.95, 19)) -> pd.DataFrame:
+        """
+        Confusion counts for ``score >= threshold`` at many thresholds.
+
+        Thresholds are rounded down to the nearest bin edge, which makes
+        the counts exact for edges and within one bin otherwise.
+        """
+        tp_above, fp_above = self._above()
+        tp_above = np.append(tp_above, 0.0)
+        fp_above = np.append(fp_above, 0.0)
+        edge = np.clip(np.floor(np.asarray(thresholds) * self.n_bins + 1e-9).astype(np.intp),
+                       0, self.n_bins)
+        tp, fp = tp_above[edge], fp_above[edge]
+        fn, tn = self.pos.sum() - tp, self.neg.sum() - fp
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "threshold": edge / self.n_bins,
+                "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+                "precision": tp / (tp + fp),
+                "recall": tp / (tp + fn),
+                "fpr": fp / (fp + tn),
+            })
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "n": float(self.pos.sum() + self.neg.sum()),
+            "positive_rate": float(self.pos.sum() / max(self.pos.sum() + self.neg.sum(), 1)),
+            "auc": self.auc(),
+            "gini": self.gini(),
+            "ks": self.ks(),
+            "pr_auc": self.pr_auc(),
+        }
+
+
+def accumulate(
+    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+    n_bins: int = DEFAULT_BINS
+) -> ScoreHistogram:
+    """Fold ``(y_true, scores)`` chunks into one histogram."""
+    hist = ScoreHistogram.empty(n_bins)
+    for y_true, scores in chunks:
+        hist.update(y_true, scores)
+    return hist
+
+
+def score_histogram(
+    model,
+    X: pd.DataFrame,
+    y,
+    chunk_size: int = 100_000,
+    n_bins: int = DEFAULT_BINS
+) -> ScoreHistogram:
+    """Score ``X`` chunk by chunk and accumulate the positive-class histogram."""
+    y = np.asarray(y)
+    return accumulate(
+        ((y[i:i + chunk_size], model.predict_proba(X.iloc[i:i + chunk_size])[:, 1])
+         for i in range(0, len(X), chunk_size)),
+        n_bins,
+    )
+
+
+def _bootstrap_block(hist: ScoreHistogram, metrics: Sequence[str], n_boot: int, seed):
+    rng = np.random.default_rng(seed)
+    counts = np.concatenate([hist.pos, hist.neg])
+    n = int(counts.sum())
+    mean_score = np.divide(hist.score_sum, hist.pos + hist.neg,
+                           out=np.zeros(hist.n_bins), where=(hist.pos + hist.neg) > 0)
+    out = np.empty((n_boot, len(metrics)))
+    for b in range(n_boot):
+        draw = rng.multinomial(n, counts / n).astype(np.float64)
+        pos, neg = draw[:hist.n_bins], draw[hist.n_bins:]
+        sample = ScoreHistogram(pos, neg, mean_score * (pos + neg))
+        out[b] = [getattr(sample, metric)() for metric in metrics]
+    return out
+
+
+def bootstrap_ci(
+    hist: ScoreHistogram,
+    metrics: Sequence[str] = ("auc", "gini", "ks", "pr_auc"),
+    n_boot: int = 1_000,
+    alpha: float = 0.05,
+    n_jobs: Optional[int] = None,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Percentile bootstrap intervals for histogram metrics.
+
+    Each replicate redraws every row's bin and class from the observed
+    counts, which is a row bootstrap of the binned scores. Replicates are
+    split into blocks with independent seeds and run on ``n_jobs`` cores;
+    results do not depend on ``n_jobs``.
+    """
+    n_blocks = 8
+    seeds = np.random.SeedSequence(random_state).spawn(n_blocks)
+    sizes = [len(block) for block in np.array_split(np.arange(n_boot), n_blocks)]
+    blocks = Parallel(n_jobs=n_jobs)(
+        delayed(_bootstrap_block)(hist, metrics, size, seed)
+        for size, seed in zip(sizes, seeds) if size
+    )
+    samples = np.vstack(blocks)
+    return pd.DataFrame({
+        "metric": list(metrics),
+        "estimate": [getattr(hist, metric)() for metric in metrics],
+        "lower": np.nanquantile(samples, alpha / 2, axis=0),
+        "upper": np.nanquantile(samples, 1 - alpha / 2, axis=0),
+    })
@@ -1,12 +1,206 @@
-import shap
-import matplotlib.pyplot as plt
+"""SHAP explanations and per-decision reason codes.
+
+``ExplanationService`` builds its explainer once per model version on top
+of a ``CompiledPipeline``, so rows are transformed by the compiled NumPy
+path instead of the sklearn preprocessor. Rows are explained in
+vectorized batches (optionally split across a process pool), one-hot
+output columns are summed back into the feature they came from, and
+results are cached by feature hash like predictions. ``shap`` is only
+needed for tree models; logistic regressions are explained exactly from
+their coefficients, against a sample of training rows that ``train_model``
+saves next to the model (``background_path``).
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import joblib
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+
+from src.cache import PredictionCache, feature_key
+from src.compiled_model import CompiledPipeline
+
+DEFAULT_TOP_K = 4
+BACKGROUND_SIZE = 200
+
+
+def background_path(model_path: Union[str, Path]) -> Path:
+    """Where the training background of the model at ``model_path`` is kept."""
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.background.joblib")
+
+
+def save_background(
+    X: pd.DataFrame,
+    path: Union[str, Path],
+    size: int = BACKGROUND_SIZE,
+    random_state: int = 42
+) -> Path:
+    """Persist a random sample of training rows as the explanation reference."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(X.sample(min(size, len(X)), random_state=random_state), path)
+    return path
+
+
+def load_background(path: Union[str, Path]) -> Optional[pd.DataFrame]:
+    path = Path(path)
+    return joblib.load(path) if path.exists() else None
+
 
 def compute_shap(model, X_sample: pd.DataFrame):
+    import shap
+
     explainer = shap.TreeExplainer(model.named_steps["classifier"])
     X_transformed = model.named_steps["preprocessor"].transform(X_sample)
     shap_values = explainer.shap_values(X_transformed)
     return explainer, shap_values
 
+
 def plot_global_shap(explainer, shap_values, X_transformed):
+    import shap
+
     shap.summary_plot(shap_values, X_transformed)
+
+
+class _LinearExplainer:
+    """Exact SHAP values of a logistic regression's log-odds (independent features)."""
+
+    def __init__(self, coef: np.ndarray, reference: np.ndarray, intercept: float):
+        self.coef = coef.ravel()
+        self.reference = reference
+        self.expected_value = float(intercept + self.reference @ self.coef)
+
+    def shap_values(self, X: np.ndarray) -> np.ndarray:
+        return (X - self.reference) * self.coef
+
+
+class _TreeExplainer:
+    """``shap.TreeExplainer`` reduced to the positive class."""
+
+    def __init__(self, classifier):
+        import shap
+
+        self.explainer = shap.TreeExplainer(classifier)
+        expected = np.ravel(self.explainer.expected_value)
+        self.expected_value = float(expected[-1])
+
+    def shap_values(self, X: np.ndarray) -> np.ndarray:
+        values = self.explainer.shap_values(X, check_additivity=False)
+        if isinstance(values, list):
+            return values[-1]
+        return values[..., -1] if values.ndim == 3 else values
+
+
+def _shap_values(explainer, X: np.ndarray) -> np.ndarray:
+    return explainer.shap_values(X)
+
+
+@dataclass
+class Explanation:
+    base_value: float
+    contributions: Dict[str, float]
+
+    def reasons(self, features: Dict, top_k: int = DEFAULT_TOP_K) -> List[Dict]:
+        """The ``top_k`` features pushing risk up the most, largest first."""
+        ranked = sorted(self.contributions.items(), key=lambda item: -item[1])
+        return [
+            {"feature": name, "value": features.get(name), "contribution": value}
+            for name, value in ranked[:top_k]
+            if value > 0
+        ]
+
+
+class ExplanationService:
+    """
+    Batched, cached SHAP explanations for one compiled model version.
+
+    Contributions are in the classifier's output units (log-odds for
+    logistic regression, probability for forests) and are summed per
+    original feature. Logistic regressions are explained against the mean
+    transformed ``background`` row. Without one, the reference is the
+    all-zero row (numeric features at their training mean), which is only
+    a real applicant when there are no one-hot features, so a background
+    is then required. Tree models need the fitted sklearn classifier, so a
+    pipeline mapped from an export cannot explain them.
+    """
+
+    def __init__(
+        self,
+        compiled: CompiledPipeline,
+        background: Optional[pd.DataFrame] = None,
+        version: Optional[str] = None,
+        n_jobs: int = 1,
+        chunk_size: int = 5_000,
+        cache_size: int = 10_000,
+        cache_ttl: float = 300.0
+    ):
+        self.compiled = compiled
+        self.version = version or compiled.version or "unversioned"
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.cache = PredictionCache(maxsize=cache_size, ttl=cache_ttl)
+
+        self.features = list(dict.fromkeys(compiled.column_features))
+        owner = [self.features.index(name) for name in compiled.column_features]
+        self.grouping = np.zeros((compiled.n_features, len(self.features)))
+        self.grouping[np.arange(compiled.n_features), owner] = 1.0
+
+        if compiled.coef is not None:
+            reference = np.zeros(compiled.n_features)
+            if background is not None:
+                reference = compiled.transform(background).mean(axis=0)
+            elif compiled.one_hot_features:
+                raise ValueError("Categorical features need a training background to explain")
+            self.explainer = _LinearExplainer(
+                compiled.coef, reference, float(np.ravel(compiled.intercept)[0])
+            )
+        elif compiled.classifier is not None:
+            self.explainer = _TreeExplainer(compiled.classifier)
+        else:
+            raise ValueError("Tree models need the fitted sklearn classifier to explain")
+
+    def contributions(self, df: pd.DataFrame) -> np.ndarray:
+        """Per-feature contributions, shape ``(len(df), len(self.features))``."""
+        return self._contributions(self.compiled.transform(df))
+
+    def _contributions(self, X: np.ndarray) -> np.ndarray:
+        if self.n_jobs == 1 or len(X) <= self.chunk_size:
+            values = _shap_values(self.explainer, X)
+        else:
+            parts = Parallel(n_jobs=self.n_jobs)(
+                delayed(_shap_values)(self.explainer, X[i:i + self.chunk_size])
+                for i in range(0, len(X), self.chunk_size)
+            )
+            values = np.vstack(parts)
+        return values @ self.grouping
+
+    def explain_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Contributions for a whole portfolio, one column per feature."""
+        return pd.DataFrame(self.contributions(df), columns=self.features, index=df.index)
+
+    def explain_records(self, records: List[Dict]) -> List[Explanation]:
+        """Explain records, computing only cache misses in a single batch."""
+        keys = [feature_key(record, self.version) for record in records]
+        results = [self.cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            if len(misses) == 1:
+                # Single-row fast path: no DataFrame construction
+                X = self.compiled.transform_one(records[misses[0]]).copy()
+            else:
+                X = self.compiled.transform(pd.DataFrame([records[i] for i in misses]))
+            values = self._contributions(X)
+            for i, row in zip(misses, values):
+                results[i] = Explanation(
+                    base_value=self.explainer.expected_value,
+                    contributions=dict(zip(self.features, row.tolist())),
+                )
+                self.cache.put(keys[i], results[i])
+        return results
+
+    def reasons(self, features: Dict, top_k: int = DEFAULT_TOP_K) -> List[Dict]:
+        return self.explain_records([features])[0].reasons(features, top_k)
@@ -0,0 +1,228 @@
+"""SQLite-backed online store of per-customer serving features.
+
+Each row holds a customer's mergeable aggregate state from
+``src.aggregates`` (counts, sums, Welford moments, last transaction time)
+plus the RFM monetary total, keyed by ``CustomerId`` in a clustered
+primary-key table, so a lookup is a single index probe. New transactions
+are folded in with ``merge_aggregates``; the stored features therefore
+always equal ``create_aggregates`` over the full history without
+recomputing it. WAL journaling lets API workers keep reading while a
+loader writes.
+"""
+
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import STATE_COLUMNS, merge_aggregates, partial_aggregates, utc_naive
+
+STORE_COLUMNS = STATE_COLUMNS + ["monetary"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customer_features (
+    customer_id TEXT PRIMARY KEY,
+    txn_count INTEGER NOT NULL,
+    n_amount INTEGER NOT NULL,
+    amount_sum REAL NOT NULL,
+    amount_mean REAL NOT NULL,
+    amount_m2 REAL NOT NULL,
+    last_ts INTEGER,
+    monetary REAL
+) WITHOUT ROWID
+"""
+
+_UPSERT = (
+    f"INSERT OR REPLACE INTO customer_features (customer_id, {', '.join(STORE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(STORE_COLUMNS) + 1))})"
+)
+
+# SQLite's default limit on bound parameters per statement is 999
+_READ_CHUNK = 500
+
+
+def state_from_aggregates(agg: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rebuild an aggregate state from a ``create_aggregates`` table.
+
+    Every transaction is assumed to carry an amount, which is what
+    ``create_aggregates`` reports for data without missing amounts.
+    """
+    n = agg["txn_count"].to_numpy(dtype="int64")
+    std = agg["amount_std"].fillna(0).to_numpy(dtype="float64")
+    state = pd.DataFrame({
+        "txn_count": n,
+        "n_amount": n,
+        "amount_sum": agg["total_amount"].to_numpy(dtype="float64"),
+        "amount_mean": agg["avg_amount"].fillna(0).to_numpy(dtype="float64"),
+        "amount_m2": std ** 2 * np.maximum(n - 1, 0),
+        "last_ts": pd.NaT,
+    }, index=pd.Index(agg["CustomerId"].to_numpy(), name="CustomerId"))
+    state["last_ts"] = state["last_ts"].astype("datetime64[ns]")
+    return state
+
+
+def features_from_row(row: Dict) -> Dict:
+    """``create_aggregates``-style features (plus recency inputs) for one stored row."""
+    n = row["n_amount"]
+    return {
+        "CustomerId": row["customer_id"],
+        "total_amount": row["amount_sum"],
+        "avg_amount": row["amount_sum"] / n if n > 0 else float("nan"),
+        "txn_count": row["txn_count"],
+        "amount_std": math.sqrt(row["amount_m2"] / (n - 1)) if n > 1 else 0.0,
+        "monetary": row["monetary"],
+        "last_transaction": (
+            None if row["last_ts"] is None else pd.Timestamp(row["last_ts"], tz="UTC")
+        ),
+    }
+
+
+class FeatureStore:
+    """
+    Customer feature table in a single SQLite file.
+
+    Connections are per thread, so one instance can be shared by the
+    API's threadpool. Writers take an immediate transaction, which makes
+    read-merge-write upserts safe across processes.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM customer_features").fetchone()[0]
+
+    def get(self, customer_id) -> Optional[Dict]:
+        """Features for one customer, or None if the customer is unknown."""
+        row = self._connection().execute(
+            "SELECT * FROM customer_features WHERE customer_id = ?", (str(customer_id),)
+        ).fetchone()
+        return None if row is None else features_from_row(dict(row))
+
+    def _read_state(self, conn: sqlite3.Connection, customer_ids: Iterable[str]) -> pd.DataFrame:
+        ids = list(customer_ids)
+        rows: List[sqlite3.Row] = []
+        for i in range(0, len(ids), _READ_CHUNK):
+            chunk = ids[i:i + _READ_CHUNK]
+            rows.extend(conn.execute(
+                f"SELECT * FROM customer_features WHERE customer_id IN "
+                f"({', '.join('?' * len(chunk))})", chunk
+            ).fetchall())
+
+        state = pd.DataFrame([dict(r) for r in rows], columns=["customer_id"] + STORE_COLUMNS)
+        state = state.set_index(pd.Index(state.pop("customer_id").to_numpy(), name="CustomerId"))
+        state["last_ts"] = pd.to_datetime(state["last_ts"].astype("Int64"), unit="ns")
+        return state
+
+    def _write_state(self, conn: sqlite3.Connection, state: pd.DataFrame) -> None:
+        last_ts = utc_naive(state["last_ts"])
+        columns = [
+            state.index.astype(str).tolist(),
+            state["txn_count"].astype("int64").tolist(),
+            state["n_amount"].astype("int64").tolist(),
+            state["amount_sum"].astype("float64").tolist(),
+            state["amount_mean"].astype("float64").tolist(),
+            state["amount_m2"].astype("float64").tolist(),
+            [None if pd.isna(t) else int(t.value) for t in last_ts],
+            [None if pd.isna(m) else float(m) for m in state["monetary"]],
+        ]
+        conn.executemany(_UPSERT, zip(*columns))
+
+    def bulk_load(
+        self,
+        aggregates: pd.DataFrame,
+        rfm: Optional[pd.DataFrame] = None,
+        snapshot_date=None
+    ) -> int:
+        """
+        Replace the stored rows for every customer in ``aggregates``.
+
+        ``aggregates`` is a ``create_aggregates``/``finalize_aggregates``
+        table or an aggregate state from ``src.aggregates``. An optional
+        ``build_rfm`` table supplies ``Monetary`` and, given the
+        ``snapshot_date`` it was built with, the last transaction day
+        (``snapshot - Recency``). Returns the number of rows written.
+        """
+        if set(STATE_COLUMNS) <= set(aggregates.columns):
+            state = aggregates[STATE_COLUMNS].copy()
+        else:
+            state = state_from_aggregates(aggregates)
+        state.index = state.index.astype(str)
+        state["last_ts"] = utc_naive(state["last_ts"])
+        state["monetary"] = np.nan
+
+        if rfm is not None:
+            rfm = rfm.set_index(rfm["CustomerId"].astype(str))
+            state["monetary"] = rfm["Monetary"].reindex(state.index).astype("float64")
+            if snapshot_date is not None:
+                snapshot = utc_naive(pd.Series([snapshot_date]))[0]
+                recency = pd.to_timedelta(rfm["Recency"].reindex(state.index), unit="D")
+                state["last_ts"] = state["last_ts"].fillna(snapshot - recency)
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_state(conn, state)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(state)
+
+    def upsert_transactions(self, df: pd.DataFrame, monetary_col: str = "Value") -> int:
+        """
+        Fold a batch of new transactions into the stored features.
+
+        Unknown customers are inserted. ``monetary_col`` (when present)
+        is added to the RFM monetary total. A stored customer whose total
+        is unknown (bulk-loaded without RFM data) keeps it unknown rather
+        than restarting from this batch. Returns the number of customers
+        touched.
+        """
+        batch = partial_aggregates(df)
+        batch.index = batch.index.astype(str)
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = self._read_state(conn, batch.index)
+            merged = merge_aggregates(current[STATE_COLUMNS], batch)
+            merged["monetary"] = current["monetary"].reindex(merged.index)
+            if monetary_col in df.columns:
+                added = df.groupby(df["CustomerId"].astype(str))[monetary_col].sum()
+                # New customers' history is this batch; NaN stays NaN for stored ones
+                is_new = ~merged.index.isin(current.index)
+                merged["monetary"] = (
+                    merged["monetary"].mask(is_new, 0.0) + added.reindex(merged.index)
+                )
+            self._write_state(conn, merged)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(merged)
@@ -1,5 +1,140 @@
+import shutil
+import uuid
 from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+TIME_COLUMN = "TransactionStartTime"
+PARTITION_COLUMN = "txn_period"
+
 
 def save_processed(df, path="data/processed/clean_data.csv"):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False)
+    if str(path).endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        save_parquet(df, path)
+
+
+def save_parquet(df: pd.DataFrame, path, compression: str = "zstd") -> None:
+    """
+    Write a table as a Parquet dataset, partitioned by transaction month
+    when the frame has a TransactionStartTime column.
+
+    Whatever was at ``path`` is replaced: the table is written next to it
+    and swapped in, so months left by an earlier, wider run never survive
+    to be read back as current data.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+
+    try:
+        if TIME_COLUMN not in df.columns:
+            df.to_parquet(staging, engine="pyarrow", compression=compression, index=False)
+        else:
+            df = df.assign(**{PARTITION_COLUMN: df[TIME_COLUMN].dt.strftime("%Y-%m")})
+            df.to_parquet(
+                staging,
+                engine="pyarrow",
+                compression=compression,
+                index=False,
+                partition_cols=[PARTITION_COLUMN],
+            )
+        _remove(path)
+        staging.rename(path)
+    finally:
+        _remove(staging)
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def _as_column_tz(value, field_type) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    tz = getattr(field_type, "tz", None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_convert(None)
+    return ts
+
+
+def load_parquet(
+    path,
+    columns: Optional[List[str]] = None,
+    start=None,
+    end=None
+) -> pd.DataFrame:
+    """
+    Read a Parquet table written by save_parquet.
+
+    Only ``columns`` are decoded, and ``start`` (inclusive) / ``end``
+    (exclusive) are pushed down to prune month partitions and row groups
+    before any data is materialized.
+    """
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    names = dataset.schema.names
+
+    expr = None
+    if start is not None or end is not None:
+        if TIME_COLUMN not in names:
+            raise ValueError(f"Cannot filter by date: '{TIME_COLUMN}' not in {path}")
+        field_type = dataset.schema.field(TIME_COLUMN).type
+
+        if start is not None:
+            start = _as_column_tz(start, field_type)
+            expr = ds.field(TIME_COLUMN) >= start
+            if PARTITION_COLUMN in names:
+                expr &= ds.field(PARTITION_COLUMN) >= start.strftime("%Y-%m")
+        if end is not None:
+            end = _as_column_tz(end, field_type)
+            end_expr = ds.field(TIME_COLUMN) < end
+            if PARTITION_COLUMN in names:
+                end_expr &= ds.field(PARTITION_COLUMN) <= end.strftime("%Y-%m")
+            expr = end_expr if expr is None else expr & end_expr
+
+    if columns is None:
+        columns = [c for c in names if c != PARTITION_COLUMN]
+
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+
+def load_processed(
+    path,
+    columns: Optional[List[str]] = None,
+    start=None,
+    end=None
+) -> pd.DataFrame:
+    """
+    Read a table written by save_processed, in either format.
+
+    Parquet goes through ``load_parquet`` (pushdown); a ``.csv`` path is
+    parsed in full and then narrowed to the same ``columns`` and
+    [``start``, ``end``) range.
+    """
+    if not str(path).endswith(".csv"):
+        return load_parquet(path, columns, start, end)
+
+    header = pd.read_csv(path, nrows=0).columns
+    dates = [TIME_COLUMN] if TIME_COLUMN in header else []
+    usecols = None if columns is None else list(dict.fromkeys(list(columns) + dates))
+    df = pd.read_csv(path, usecols=usecols, parse_dates=dates)
+
+    if start is not None or end is not None:
+        if not dates:
+            raise ValueError(f"Cannot filter by date: '{TIME_COLUMN}' not in {path}")
+        ts = df[TIME_COLUMN]
+        keep = pd.Series(True, index=df.index)
+        if start is not None:
+            keep &= ts >= _as_column_tz(start, ts.dtype)
+        if end is not None:
+            keep &= ts < _as_column_tz(end, ts.dtype)
+        df = df[keep].reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
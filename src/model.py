@@ -1,6 +1,6 @@
 import os
 import joblib
-from typing import Tuple
+from typing import Optional, Tuple
 
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
@@ -9,13 +9,16 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import roc_auc_score
 
 from src.config import ModelConfig
+from src.explain import background_path, save_background
+from src.transform_cache import TransformCache, fit_pipeline
 
 
 def train_model(
     X: pd.DataFrame,
     y: pd.Series,
     preprocessor,
-    config: ModelConfig
+    config: ModelConfig,
+    transform_cache: Optional[TransformCache] = None
 ) -> Tuple[Pipeline, float]:
 
     # Safe stratification:
@@ -46,8 +49,8 @@ def train_model(
         ("classifier", model)
     ])
 
-    # Train
-    pipeline.fit(X_train, y_train)
+    # Train (the preprocessor comes from the cache when one is given)
+    fit_pipeline(pipeline, X_train, y_train, transform_cache)
 
     # Evaluate
     y_pred_proba = pipeline.predict_proba(X_test)[:, 1]
@@ -56,7 +59,8 @@ def train_model(
     # Ensure model directory exists before saving
     os.makedirs(os.path.dirname(config.model_path), exist_ok=True)
 
-    # Save trained pipeline
+    # Save trained pipeline, plus the training rows explanations are measured against
     joblib.dump(pipeline, config.model_path)
+    save_background(X_train, background_path(config.model_path), random_state=config.random_state)
 
     return pipeline, auc
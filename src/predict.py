@@ -0,0 +1,92 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BATCH_CHUNK_SIZE = 1000
+PORTFOLIO_CHUNK_SIZE = 100_000
+
+
+def probability_to_score(probability):
+    """Convert probability to a score out of 100."""
+    return int(probability * 100)
+
+
+def recommend_loan(score):
+    """Provide loan recommendation based on the credit score."""
+    return "Recommended" if score > 50 else "Not Recommended"
+
+
+def score_frame(model, df: pd.DataFrame) -> pd.DataFrame:
+    """Score a frame with a single predict_proba call."""
+    prob = model.predict_proba(df)[:, 1]
+    score = (prob * 100).astype(int)
+
+    return pd.DataFrame({
+        "risk_probability": prob,
+        "credit_score": score,
+        "loan_offer": np.where(score > 50, "Recommended", "Not Recommended"),
+    }, index=df.index)
+
+
+def _chunks(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_records(
+    model,
+    records: Iterable[Dict],
+    chunk_size: int = BATCH_CHUNK_SIZE
+) -> Iterator[Dict]:
+    """
+    Score feature records in chunks, one predict_proba call per chunk,
+    yielding the same fields as the single-row /predict endpoint.
+    """
+    for chunk in _chunks(records, chunk_size):
+        yield from score_frame(model, pd.DataFrame.from_records(chunk)).to_dict("records")
+
+
+def score_portfolio(
+    model,
+    df: pd.DataFrame,
+    chunk_size: int = PORTFOLIO_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> np.ndarray:
+    """
+    Default probabilities for a whole frame, one predict_proba call per chunk.
+
+    ``on_progress(rows_done, rows_total)`` is called after every chunk so
+    callers (the dashboard) can report progress on large uploads.
+    """
+    prob = np.empty(len(df))
+    for start in range(0, len(df), chunk_size):
+        stop = min(start + chunk_size, len(df))
+        prob[start:stop] = model.predict_proba(df.iloc[start:stop])[:, 1]
+        if on_progress is not None:
+            on_progress(stop, len(df))
+    return prob
+
+
+def portfolio_trend(timestamps: pd.Series, prob: np.ndarray, freq: str = "M") -> pd.DataFrame:
+    """Mean probability of default and row count per period (monthly by default)."""
+    ts = pd.to_datetime(pd.Series(np.asarray(timestamps)))
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    periods = ts.dt.to_period(freq)
+    trend = (
+        pd.DataFrame({"period": periods, "prob": prob})
+        .groupby("period", observed=True)["prob"]
+        .agg(Average_PD="mean", Accounts="count")
+    )
+    return pd.DataFrame({
+        "Month": trend.index.to_timestamp(how="end").normalize(),
+        "Average_PD": trend["Average_PD"].to_numpy(),
+        "Accounts": trend["Accounts"].to_numpy(),
+    })
@@ -1,14 +1,151 @@
+import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
 from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import KFold
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import OneHotEncoder
-from typing import List
+from typing import List, Optional, Tuple
+
+from src.woe import WoEEncoder, woe_iv
+
+# Categorical columns with more distinct values than this are routed to
+# the compact encoder instead of one-hot encoding.
+MAX_ONEHOT_CATEGORIES = 30
+
+COMPACT_METHODS = ("frequency", "target", "woe")
+
+
+class CompactEncoder(BaseEstimator, TransformerMixin):
+    """
+    Encode each categorical column as a single numeric column.
+
+    ``method`` is ``"frequency"`` (share of training rows), ``"target"``
+    (mean of y smoothed towards the prior by ``smoothing`` pseudo-rows) or
+    ``"woe"`` (weight of evidence of a binary y from ``src.woe.woe_iv``,
+    smoothed like ``WoEEncoder``'s bins). Categories seen fewer than
+    ``min_frequency`` times share one pooled "rare" value, which is also
+    used for missing and unseen values.
+
+    For the supervised methods ``fit_transform`` cross-fits: each of ``cv``
+    folds is encoded with statistics from the other folds, so training rows
+    never see their own target. ``transform`` uses the full-data fit.
+    """
+
+    def __init__(
+        self,
+        method: str = "frequency",
+        min_frequency: int = 20,
+        smoothing: float = 10.0,
+        cv: int = 5,
+        random_state: Optional[int] = 42
+    ):
+        self.method = method
+        self.min_frequency = min_frequency
+        self.smoothing = smoothing
+        self.cv = cv
+        self.random_state = random_state
+
+    def _column_stats(self, column: pd.Series, y: Optional[np.ndarray]):
+        counts = column.value_counts(dropna=True)
+        kept = pd.Index(counts.index[counts >= self.min_frequency].tolist())
+        bucket = column.where(column.isin(kept))
+
+        if self.method == "frequency":
+            share = bucket.value_counts(dropna=False) / len(column)
+            rare = float(share[share.index.isna()].sum())
+            return kept, share.reindex(kept).to_numpy(dtype=np.float64), rare
+
+        target = pd.Series(y, index=column.index, dtype=np.float64)
+        grouped = target.groupby(bucket, dropna=False)
+        sums, sizes = grouped.sum(), grouped.size()
+        rare_sum = float(sums[sums.index.isna()].sum())
+        rare_size = float(sizes[sizes.index.isna()].sum())
+        sums, sizes = sums.reindex(kept).to_numpy(), sizes.reindex(kept).to_numpy()
+
+        if self.method == "target":
+            prior = float(target.mean())
+            m = self.smoothing
+            values = (sums + m * prior) / (sizes + m)
+            rare = (rare_sum + m * prior) / (rare_size + m)
+            return kept, values, float(rare)
+
+        # The rare bucket (rare, missing and unseen values) is the last bin
+        woe, _ = woe_iv(np.append(sizes, rare_size), np.append(sums, rare_sum))
+        return kept, woe[:-1], float(woe[-1])
+
+    def _fit_columns(self, X: pd.DataFrame, y) -> list:
+        return [self._column_stats(X[col], y) for col in X.columns]
+
+    @staticmethod
+    def _encode(X: pd.DataFrame, stats: list) -> np.ndarray:
+        out = np.empty((len(X), len(stats)), dtype=np.float64)
+        for j, (categories, values, rare) in enumerate(stats):
+            # Unmatched values get code -1, which takes the trailing rare value
+            table = np.append(values, rare)
+            out[:, j] = table.take(categories.get_indexer(X.iloc[:, j]))
+        return out
+
+    def _validate(self, X, y):
+        if self.method not in COMPACT_METHODS:
+            raise ValueError(f"method must be one of {COMPACT_METHODS}, got {self.method!r}")
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        if self.method != "frequency":
+            if y is None:
+                raise ValueError(f"method={self.method!r} needs a target")
+            y = np.asarray(y, dtype=np.float64)
+        return X.reset_index(drop=True), y
+
+    def fit(self, X, y=None):
+        X, y = self._validate(X, y)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        self.stats_ = self._fit_columns(X, y)
+        return self
+
+    def fit_transform(self, X, y=None, **fit_params):
+        self.fit(X, y)
+        X, y = self._validate(X, y)
+        if self.method == "frequency" or self.cv < 2:
+            return self._encode(X, self.stats_)
+
+        out = np.empty((len(X), X.shape[1]), dtype=np.float64)
+        folds = KFold(self.cv, shuffle=True, random_state=self.random_state)
+        for fit_idx, enc_idx in folds.split(X):
+            stats = self._fit_columns(X.iloc[fit_idx], y[fit_idx])
+            out[enc_idx] = self._encode(X.iloc[enc_idx], stats)
+        return out
+
+    def transform(self, X):
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        return self._encode(X, self.stats_)
+
+    def get_feature_names_out(self, input_features=None):
+        names = self.feature_names_in_ if input_features is None else input_features
+        return np.asarray([f"{name}_{self.method}" for name in names], dtype=object)
+
+
+def split_by_cardinality(
+    X: pd.DataFrame,
+    categorical_features: List[str],
+    max_onehot_categories: int = MAX_ONEHOT_CATEGORIES
+) -> Tuple[List[str], List[str]]:
+    """Split categorical columns into (one-hot, compact) by distinct-value count."""
+    low, high = [], []
+    for col in categorical_features:
+        (low if X[col].nunique() <= max_onehot_categories else high).append(col)
+    return low, high
+
 
 def build_preprocessor(
     numeric_features: List[str],
-    categorical_features: List[str]
+    categorical_features: List[str],
+    high_cardinality_features: Optional[List[str]] = None,
+    encoding: str = "frequency",
+    min_frequency: int = 20,
+    woe_features: Optional[List[str]] = None
 ) -> ColumnTransformer:
     
     numeric_pipeline = Pipeline([
@@ -21,9 +158,20 @@ def build_preprocessor(
         ("encoder", OneHotEncoder(handle_unknown="ignore"))
     ])
 
-    preprocessor = ColumnTransformer([
+    transformers = [
         ("num", numeric_pipeline, numeric_features),
         ("cat", categorical_pipeline, categorical_features)
-    ])
+    ]
+    if high_cardinality_features:
+        transformers.append((
+            "compact",
+            CompactEncoder(method=encoding, min_frequency=min_frequency),
+            high_cardinality_features
+        ))
+    if woe_features:
+        # Binned weight of evidence against the target (numeric or categorical)
+        transformers.append(("woe", WoEEncoder(), woe_features))
+
+    preprocessor = ColumnTransformer(transformers)
 
     return preprocessor
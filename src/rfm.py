@@ -1,18 +1,72 @@
+from functools import reduce
+from typing import Iterable
+
 import pandas as pd
 
-def build_rfm(df: pd.DataFrame, snapshot_date=None) -> pd.DataFrame:
-    if snapshot_date is None:
-        snapshot_date = df["TransactionStartTime"].max()
+from src.data_loader import compact_dtypes
+
+
+def partial_rfm(df: pd.DataFrame, monetary_col: str = "Value") -> pd.DataFrame:
+    """
+    Per-customer RFM state: last transaction time, count and monetary sum.
 
-    rfm = (
-        df.groupby("CustomerId")
+    Only built-in group reductions are used, so pandas stays on its
+    Cython fast path. States from separate chunks combine with merge_rfm.
+    """
+    state = (
+        df.groupby("CustomerId", observed=True)
         .agg(
-            Recency=("TransactionStartTime",
-                     lambda x: (snapshot_date - x.max()).days),
-            Frequency=("TransactionId", "count"),
-            Monetary=("Value", "sum")
+            last_ts=("TransactionStartTime", "max"),
+            frequency=("TransactionId", "count"),
+            monetary=(monetary_col, "sum")
         )
-        .reset_index()
     )
+    state.index = pd.Index(state.index.to_numpy(), name="CustomerId")
+    return state
+
+
+def merge_rfm(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    """Combine two partial RFM states."""
+    return (
+        pd.concat([left, right])
+        .groupby(level="CustomerId")
+        .agg(last_ts=("last_ts", "max"), frequency=("frequency", "sum"),
+             monetary=("monetary", "sum"))
+    )
+
+
+def finalize_rfm(state: pd.DataFrame, snapshot_date) -> pd.DataFrame:
+    """Turn an RFM state into Recency/Frequency/Monetary columns."""
+    rfm = pd.DataFrame({
+        "CustomerId": state.index.to_numpy(),
+        "Recency": (snapshot_date - state["last_ts"]).dt.days.to_numpy(),
+        "Frequency": state["frequency"].to_numpy(),
+        "Monetary": state["monetary"].to_numpy(),
+    })
+    # Recency and Frequency fit in small ints; Monetary keeps full width
+    return compact_dtypes(rfm, keep_wide=["CustomerId", "Monetary"])
+
+
+def build_rfm(df: pd.DataFrame, snapshot_date=None) -> pd.DataFrame:
+    if snapshot_date is None:
+        snapshot_date = df["TransactionStartTime"].max()
+
+    return finalize_rfm(partial_rfm(df), snapshot_date)
+
+
+def build_rfm_chunked(
+    chunks: Iterable[pd.DataFrame],
+    snapshot_date=None,
+    monetary_col: str = "Value"
+) -> pd.DataFrame:
+    """Build RFM from an iterable of transaction chunks (at least one)."""
+    states = (partial_rfm(c, monetary_col) for c in chunks)
+    first = next(states, None)
+    if first is None:
+        raise ValueError("No transaction chunks to build RFM from")
+    state = reduce(merge_rfm, states, first)
+
+    if snapshot_date is None:
+        snapshot_date = state["last_ts"].max()
 
-    return rfm
+    return finalize_rfm(state, snapshot_date)
@@ -1,32 +1,159 @@
 ## 9. RFM Target Creation Script (`src/rfm_target.py`)
 #This script **creates the proxy default label** and persists it.
 
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import joblib
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score
 from sklearn.preprocessing import StandardScaler
 
+from src.rfm import finalize_rfm, partial_rfm
+
 
 def build_rfm(df: pd.DataFrame) -> pd.DataFrame:
     snapshot = df["TransactionStartTime"].max() + pd.Timedelta(days=1)
 
-    rfm = df.groupby("CustomerId").agg(
-        recency=("TransactionStartTime", lambda x: (snapshot - x.max()).days),
-        frequency=("TransactionId", "count"),
-        monetary=("Amount", "sum"),
-    ).reset_index()
+    state = partial_rfm(df, monetary_col="Amount")
+
+    rfm = finalize_rfm(state, snapshot).rename(columns={
+        "Recency": "recency",
+        "Frequency": "frequency",
+        "Monetary": "monetary",
+    })
 
     return rfm
 
 
+RFM_FEATURES = ["recency", "frequency", "monetary"]
+
+
 def label_high_risk(rfm: pd.DataFrame) -> pd.DataFrame:
     scaler = StandardScaler()
-    X = scaler.fit_transform(rfm[["recency", "frequency", "monetary"]])
+    X = scaler.fit_transform(rfm[RFM_FEATURES])
 
     kmeans = KMeans(n_clusters=3, random_state=42)
     rfm["cluster"] = kmeans.fit_predict(X)
 
-    summary = rfm.groupby("cluster").mean()
+    summary = rfm.groupby("cluster")[RFM_FEATURES].mean()
     high_risk_cluster = summary["frequency"].idxmin()
 
     rfm["is_high_risk"] = (rfm["cluster"] == high_risk_cluster).astype(int)
-    return rfm[["CustomerId", "is_high_risk"]]
\ No newline at end of file
+    return rfm[["CustomerId", "is_high_risk"]]
+
+
+@dataclass
+class ClusterState:
+    """Fitted scaler and centroids needed to label customers without refitting."""
+    scaler: StandardScaler
+    centroids: np.ndarray
+    high_risk_cluster: int
+
+
+RFMSource = Union[pd.DataFrame, Callable[[], Iterable[pd.DataFrame]]]
+
+
+def _batches(rfm: RFMSource, batch_size: int) -> Iterator[pd.DataFrame]:
+    chunks = [rfm] if isinstance(rfm, pd.DataFrame) else rfm()
+    for chunk in chunks:
+        for start in range(0, len(chunk), batch_size):
+            yield chunk.iloc[start:start + batch_size]
+
+
+def fit_risk_clusters(
+    rfm: RFMSource,
+    state: Optional[ClusterState] = None,
+    batch_size: int = 10_000,
+    n_clusters: int = 3,
+    random_state: int = 42
+) -> ClusterState:
+    """
+    Fit proxy-label clusters with mini-batch k-means.
+
+    ``rfm`` is either a frame or a function returning a fresh iterable of
+    RFM chunks on each call (e.g. a lambda reading per-partition files), so
+    each pass re-reads the chunks instead of holding every customer in
+    memory. Without a previous state the scaler is fit in one pass over the
+    batches and the centroids in a second. With a state, its scaler is
+    kept frozen (so centroids stay comparable across runs) and training
+    continues from its centroids.
+    """
+    if state is None:
+        scaler = StandardScaler()
+        for batch in _batches(rfm, batch_size):
+            scaler.partial_fit(batch[RFM_FEATURES])
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters, batch_size=batch_size, random_state=random_state
+        )
+    else:
+        scaler = state.scaler
+        kmeans = MiniBatchKMeans(
+            n_clusters=len(state.centroids), init=state.centroids, n_init=1,
+            batch_size=batch_size, random_state=random_state
+        )
+
+    for batch in _batches(rfm, batch_size):
+        kmeans.partial_fit(scaler.transform(batch[RFM_FEATURES]))
+
+    centroids = kmeans.cluster_centers_
+    frequency = scaler.inverse_transform(centroids)[:, RFM_FEATURES.index("frequency")]
+
+    return ClusterState(
+        scaler=scaler,
+        centroids=centroids,
+        high_risk_cluster=int(np.argmin(frequency))
+    )
+
+
+def assign_clusters(rfm: pd.DataFrame, state: ClusterState) -> np.ndarray:
+    """Nearest-centroid cluster for each customer."""
+    X = state.scaler.transform(rfm[RFM_FEATURES])
+    distances = ((X[:, None, :] - state.centroids[None, :, :]) ** 2).sum(axis=2)
+    return distances.argmin(axis=1)
+
+
+def assign_high_risk(rfm: pd.DataFrame, state: ClusterState) -> pd.DataFrame:
+    """Label customers from persisted centroids without refitting."""
+    clusters = assign_clusters(rfm, state)
+    return pd.DataFrame({
+        "CustomerId": rfm["CustomerId"].to_numpy(),
+        "is_high_risk": (clusters == state.high_risk_cluster).astype(int),
+    })
+
+
+def label_high_risk_streaming(
+    rfm: pd.DataFrame,
+    state: Optional[ClusterState] = None,
+    batch_size: int = 10_000
+) -> Tuple[pd.DataFrame, ClusterState]:
+    """Mini-batch alternative to label_high_risk that also returns the state."""
+    state = fit_risk_clusters(rfm, state=state, batch_size=batch_size)
+    return assign_high_risk(rfm, state), state
+
+
+def save_cluster_state(state: ClusterState, path: str) -> None:
+    joblib.dump(state, path)
+
+
+def load_cluster_state(path: str) -> ClusterState:
+    return joblib.load(path)
+
+
+def label_agreement(rfm: pd.DataFrame, state: ClusterState) -> Dict[str, float]:
+    """Compare mini-batch labels against a full-batch label_high_risk fit."""
+    full = rfm[["CustomerId"] + RFM_FEATURES].copy()
+    full_labels = label_high_risk(full)["is_high_risk"].to_numpy()
+
+    clusters = assign_clusters(rfm, state)
+    labels = (clusters == state.high_risk_cluster).astype(int)
+
+    return {
+        "n_customers": len(rfm),
+        "label_agreement": float((labels == full_labels).mean()),
+        "cluster_ari": float(adjusted_rand_score(full["cluster"], clusters)),
+        "high_risk_rate_full": float(full_labels.mean()),
+        "high_risk_rate_streaming": float(labels.mean()),
+    }
@@ -0,0 +1,167 @@
+"""Content-addressed cache for fitted preprocessors and their outputs.
+
+Entries are keyed by a fingerprint of the input frame (column names,
+dtypes and every value), the target when one is passed to ``fit``, and a
+hash of the transformer's configuration and the scikit-learn version. A
+training run over the same snapshot with the same preprocessor therefore
+loads the fitted transformer and the transformed matrix from disk instead
+of refitting. Sparse outputs are stored as ``.npz``, dense ones as ``.npy``.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("data/transform_cache")
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of a frame's columns, dtypes, index and values."""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def transformer_fingerprint(transformer) -> str:
+    """Hash of an estimator's parameters (fitted state is ignored)."""
+    return joblib.hash((sklearn.__version__, clone(transformer)))
+
+
+def _save_matrix(path: Path, matrix) -> None:
+    if sp.issparse(matrix):
+        sp.save_npz(path / "matrix.npz", sp.csr_matrix(matrix), compressed=False)
+    else:
+        np.save(path / "matrix.npy", np.asarray(matrix))
+
+
+def _load_matrix(path: Path):
+    if (path / "matrix.npz").exists():
+        return sp.load_npz(path / "matrix.npz")
+    return np.load(path / "matrix.npy")
+
+
+class TransformCache:
+    """
+    Disk cache of ``fit_transform`` / ``transform`` results.
+
+    ``hits`` and ``misses`` count lookups for this instance; each one is
+    also logged with its key.
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _publish(self, key: str, write) -> Path:
+        target = self.directory / key
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory))
+        try:
+            write(staging)
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # Another run published the same entry first; keep theirs.
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return target
+
+    def _lookup(self, kind: str, key: str) -> Optional[Path]:
+        path = self.directory / key
+        if path.exists():
+            self.hits += 1
+            logger.info("Transform cache hit (%s): %s", kind, key)
+            return path
+        self.misses += 1
+        logger.info("Transform cache miss (%s): %s", kind, key)
+        return None
+
+    def fit_transform(self, transformer, X: pd.DataFrame, y=None) -> Tuple[object, object]:
+        """Return ``(fitted transformer, transformed X)``, fitting only on a miss."""
+        data = frame_fingerprint(X)
+        if y is not None:
+            data += frame_fingerprint(pd.DataFrame({"y": np.asarray(y)}))
+        key = f"fit-{transformer_fingerprint(transformer)[:16]}-{joblib.hash(data)[:32]}"
+        path = self._lookup("fit", key)
+        if path is not None:
+            return joblib.load(path / "transformer.joblib"), _load_matrix(path)
+
+        fitted = clone(transformer)
+        Xt = fitted.fit_transform(X, y)
+
+        def write(staging):
+            joblib.dump(fitted, staging / "transformer.joblib")
+            _save_matrix(staging, Xt)
+        self._publish(key, write)
+        return fitted, Xt
+
+    def transform(self, fitted, X: pd.DataFrame):
+        """``fitted.transform(X)``, cached by the fitted state and the input."""
+        key = f"transform-{joblib.hash(fitted)[:16]}-{frame_fingerprint(X)[:32]}"
+        path = self._lookup("transform", key)
+        if path is not None:
+            return _load_matrix(path)
+
+        Xt = fitted.transform(X)
+        self._publish(key, lambda staging: _save_matrix(staging, Xt))
+        return Xt
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _adopt_fitted(own, fitted) -> None:
+    """Copy ``fitted``'s learned state onto ``own``, an unfitted twin, in place."""
+    if isinstance(own, Pipeline):
+        for (_, own_step), (_, fitted_step) in zip(own.steps, fitted.steps):
+            if own_step is not None and own_step != "passthrough":
+                _adopt_fitted(own_step, fitted_step)
+        return
+    params = own.get_params(deep=False)
+    for name, value in vars(fitted).items():
+        if name not in params:
+            setattr(own, name, value)
+
+
+def fit_pipeline(pipeline, X: pd.DataFrame, y, cache: Optional[TransformCache] = None):
+    """
+    Fit ``pipeline`` in place, taking everything before the final estimator from ``cache``.
+
+    Without a cache this is plain ``pipeline.fit(X, y)``. With one, the
+    cached fitted state is copied onto the pipeline's own step objects, so
+    a preprocessor the caller passed in is fitted too, and nothing is
+    shared with the cache or with other pipelines.
+    """
+    if cache is None:
+        return pipeline.fit(X, y)
+
+    fitted, Xt = cache.fit_transform(pipeline[:-1], X, y)
+    _adopt_fitted(pipeline[:-1], fitted)
+    pipeline.steps[-1][1].fit(Xt, y)
+    return pipeline
@@ -0,0 +1,235 @@
+"""Array-backed inference for fitted sklearn tree ensembles.
+
+``FlatTreeEnsemble`` concatenates every tree of a fitted forest or
+gradient-boosting model into one set of contiguous node arrays (feature,
+threshold, children, leaf value). A batch is scored by advancing all
+(tree, row) pairs one level at a time with NumPy; leaves point to
+themselves so finished rows simply stay put. Per-tree results are
+accumulated in the same order and with the same arithmetic as sklearn,
+so probabilities match ``predict_proba`` bit for bit.
+
+The arrays can be written to ``.npy`` files with ``save`` and mapped back
+read-only with ``load``, so several processes scoring with the same model
+share one copy of its pages. Scoring never touches scikit-learn; it is
+only imported when converting a fitted estimator.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+from scipy.special import expit
+
+ARRAY_FIELDS = ["feature", "threshold", "children", "is_leaf", "missing_left", "value", "roots"]
+
+# Finished (tree, row) pairs are dropped from the working set every few
+# levels; leaves point to themselves, so extra steps in between are no-ops.
+_COMPACT_EVERY = 4
+
+
+def _normalize_leaves() -> bool:
+    # Before 1.4, classifier trees stored weighted class counts and
+    # DecisionTreeClassifier.predict_proba normalized them per sample.
+    import sklearn
+    from sklearn.utils.fixes import parse_version
+
+    return parse_version(sklearn.__version__) < parse_version("1.4")
+
+
+def _leaf_values(tree, kind: str, n_classes: int, normalize: bool) -> np.ndarray:
+    value = tree.value
+    if kind == "gbdt":
+        return value[:, 0, 0:1].astype(np.float64)
+
+    proba = value[:, 0, :n_classes].astype(np.float64)
+    if normalize:
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        proba /= normalizer
+    return proba
+
+
+class FlatTreeEnsemble:
+    """Contiguous node arrays for a tree ensemble, scored level by level."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        self.arrays = arrays
+        self.meta = meta
+        for name in ARRAY_FIELDS:
+            setattr(self, name, arrays[name])
+        self.kind = meta["kind"]
+        self.n_classes = int(meta["n_classes"])
+        self.max_depth = int(meta["max_depth"])
+        self.n_features = int(meta["n_features"])
+
+    @classmethod
+    def from_estimator(cls, estimator) -> "FlatTreeEnsemble":
+        from sklearn.dummy import DummyClassifier
+        from sklearn.ensemble import (
+            ExtraTreesClassifier,
+            GradientBoostingClassifier,
+            RandomForestClassifier,
+        )
+        from sklearn.tree import DecisionTreeClassifier
+
+        meta = {"n_features": int(estimator.n_features_in_)}
+
+        if isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier)):
+            trees = [e.tree_ for e in estimator.estimators_]
+            meta.update(kind="forest", n_classes=int(estimator.n_classes_))
+        elif isinstance(estimator, DecisionTreeClassifier):
+            trees = [estimator.tree_]
+            meta.update(kind="forest", n_classes=int(estimator.n_classes_))
+        elif isinstance(estimator, GradientBoostingClassifier):
+            if estimator.n_trees_per_iteration_ != 1:
+                raise ValueError("Only binary GradientBoostingClassifier is supported")
+            if not (estimator.init_ == "zero" or isinstance(estimator.init_, DummyClassifier)):
+                raise ValueError("Only constant init estimators are supported")
+            trees = [e.tree_ for e in estimator.estimators_[:, 0]]
+            probe = np.zeros((1, estimator.n_features_in_), dtype=np.float32)
+            meta.update(
+                kind="gbdt",
+                n_classes=2,
+                learning_rate=float(estimator.learning_rate),
+                init_raw=float(estimator._raw_predict_init(probe)[0, 0]),
+            )
+        else:
+            raise ValueError(f"Unsupported estimator: {type(estimator).__name__}")
+
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        children = []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count, dtype=np.int64) + offset
+            is_leaf = tree.children_left == -1
+            children.append(np.column_stack([
+                np.where(is_leaf, nodes, tree.children_left + offset),
+                np.where(is_leaf, nodes, tree.children_right + offset),
+            ]).ravel())
+
+        normalize = _normalize_leaves()
+        missing = [
+            getattr(t, "missing_go_to_left", np.zeros(t.node_count, dtype=np.uint8))
+            for t in trees
+        ]
+        arrays = {
+            "feature": np.concatenate([np.maximum(t.feature, 0) for t in trees]).astype(np.int32),
+            "threshold": np.concatenate([t.threshold for t in trees]).astype(np.float64),
+            "children": np.concatenate(children).astype(np.intp),
+            "is_leaf": np.concatenate([t.children_left == -1 for t in trees]),
+            "missing_left": np.concatenate(missing).astype(bool),
+            "value": np.concatenate(
+                [_leaf_values(t, meta["kind"], meta["n_classes"], normalize) for t in trees]
+            ),
+            "roots": offsets[:-1].astype(np.int32),
+        }
+        meta["max_depth"] = max(t.max_depth for t in trees)
+        return cls(arrays, meta)
+
+    def save(self, directory: Union[str, Path], prefix: str = "trees_") -> None:
+        """Write every node array to ``<prefix><name>.npy`` plus a JSON meta file."""
+        directory = Path(directory)
+        for name in ARRAY_FIELDS:
+            np.save(directory / f"{prefix}{name}.npy", self.arrays[name])
+        (directory / f"{prefix}meta.json").write_text(json.dumps(self.meta))
+
+    @classmethod
+    def load(
+        cls,
+        directory: Union[str, Path],
+        prefix: str = "trees_",
+        mmap_mode: Optional[str] = "r"
+    ) -> "FlatTreeEnsemble":
+        """Map arrays written by ``save``; pages are shared between processes."""
+        directory = Path(directory)
+        arrays = {
+            name: np.load(directory / f"{prefix}{name}.npy", mmap_mode=mmap_mode)
+            for name in ARRAY_FIELDS
+        }
+        meta = json.loads((directory / f"{prefix}meta.json").read_text())
+        return cls(arrays, meta)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index of every (tree, row) pair, shape (n_trees, n_rows)."""
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_X = X.ravel()
+        has_nan = bool(np.isnan(flat_X).any())
+
+        nodes = np.repeat(self.roots.astype(np.intp), n_rows)
+        row_offset = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, n_trees)
+        pending = np.arange(n_trees * n_rows)
+        leaves = np.empty(n_trees * n_rows, dtype=np.intp)
+
+        level = 0
+        while pending.size:
+            x = flat_X.take(row_offset + self.feature.take(nodes))
+            go_right = x > self.threshold.take(nodes)
+            if has_nan:
+                nan = np.isnan(x)
+                go_right[nan] = ~self.missing_left.take(nodes[nan])
+            nodes = self.children.take(2 * nodes + go_right)
+
+            level += 1
+            if level % _COMPACT_EVERY == 0 or level >= self.max_depth:
+                done = self.is_leaf.take(nodes)
+                if done.all():
+                    leaves[pending] = nodes
+                    break
+                leaves[pending[done]] = nodes[done]
+                keep = ~done
+                pending, nodes, row_offset = pending[keep], nodes[keep], row_offset[keep]
+
+        return leaves.reshape(n_trees, n_rows)
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+
+        if self.kind == "forest":
+            proba = np.zeros((X.shape[0], self.n_classes), dtype=np.float64)
+            for tree_leaves in leaves:
+                proba += self.value[tree_leaves]
+            proba /= len(leaves)
+            return proba
+
+        raw = np.full(X.shape[0], self.meta["init_raw"], dtype=np.float64)
+        scale = self.meta["learning_rate"]
+        for tree_leaves in leaves:
+            raw += scale * self.value[tree_leaves, 0]
+        proba = np.empty((X.shape[0], 2), dtype=np.float64)
+        proba[:, 1] = expit(raw)
+        proba[:, 0] = 1 - proba[:, 1]
+        return proba
+
+    def predict_proba(
+        self,
+        X: np.ndarray,
+        block_size: int = 4096,
+        n_jobs: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Class probabilities for a dense batch.
+
+        Rows are scored in blocks of ``block_size`` to bound the
+        (trees x rows) working set; ``n_jobs > 1`` spreads blocks across
+        a thread pool (NumPy releases the GIL in the heavy operations).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        blocks = [X[i:i + block_size] for i in range(0, X.shape[0], block_size)]
+        if n_jobs is not None and n_jobs > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                parts = list(pool.map(self._predict_block, blocks))
+        else:
+            parts = [self._predict_block(b) for b in blocks]
+
+        if not parts:
+            return np.empty((0, self.n_classes))
+        return np.concatenate(parts)
@@ -0,0 +1,274 @@
+"""Cross-validated model search with successive halving.
+
+The preprocessor is fitted once per CV fold (or loaded from a
+``TransformCache``) and the resulting matrices are shared by every
+candidate, instead of refitting the ``ColumnTransformer`` inside each
+trial. Configurations are raced with successive halving: all of
+them are scored on a small slice of each fold's training rows, the best
+``1 / eta`` move on to ``eta`` times more rows, and only the survivors are
+fitted on the full folds. (config, fold) fits run in a process pool capped
+at ``n_jobs`` cores; large fold matrices are memory-mapped into the workers
+rather than copied.
+
+``log_search`` writes every trial to MLflow as nested runs; run the module
+with a training table to search and log in one go (mlflow is only imported
+there, so the search itself does not need it):
+
+    python -m src.tuning data/processed/training.parquet --start 2019-01-01 --jobs 4
+"""
+
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+
+from src.io import load_processed
+from src.preprocessing import build_preprocessor
+from src.transform_cache import TransformCache, fit_pipeline
+
+
+@dataclass
+class Candidate:
+    name: str
+    estimator: object
+    param_grid: Dict[str, list] = field(default_factory=dict)
+
+
+@dataclass
+class Trial:
+    candidate: str
+    params: Dict
+    rung: int
+    n_samples: int
+    fold_scores: List[float]
+    fit_seconds: float
+
+    @property
+    def score(self) -> float:
+        scores = [s for s in self.fold_scores if not np.isnan(s)]
+        return float(np.mean(scores)) if scores else float("nan")
+
+
+@dataclass
+class SearchResult:
+    trials: List[Trial]
+    best: Trial
+    model: Pipeline
+
+
+def default_candidates(random_state: int = 42) -> List[Candidate]:
+    return [
+        Candidate("LogisticRegression", LogisticRegression(max_iter=1000),
+                  {"C": [0.01, 0.1, 1.0, 10.0]}),
+        Candidate("GradientBoosting", GradientBoostingClassifier(random_state=random_state),
+                  {"n_estimators": [100, 300], "learning_rate": [0.05, 0.1],
+                   "max_depth": [2, 3]}),
+        Candidate("RandomForest",
+                  RandomForestClassifier(class_weight="balanced", random_state=random_state),
+                  {"n_estimators": [200], "max_depth": [None, 8],
+                   "min_samples_leaf": [1, 5]}),
+    ]
+
+
+def _auc(y_true, proba) -> float:
+    if len(np.unique(y_true)) < 2:
+        return float("nan")
+    return float(roc_auc_score(y_true, proba))
+
+
+def _fit_and_score(estimator, params, fold, order, n_samples):
+    X_train, y_train, X_valid, y_valid = fold
+    rows = np.sort(order[:n_samples])
+    y_sub = y_train[rows]
+    start = time.perf_counter()
+    if len(np.unique(y_sub)) < 2:
+        return float("nan"), 0.0
+
+    model = clone(estimator).set_params(**params)
+    model.fit(X_train[rows], y_sub)
+    score = _auc(y_valid, model.predict_proba(X_valid)[:, 1])
+    return score, time.perf_counter() - start
+
+
+def _rung_sizes(n_configs: int, max_samples: int, min_samples: int, eta: int) -> List[int]:
+    n_rungs = int(math.floor(math.log(max(n_configs, 1), eta))) + 1
+    if min_samples < max_samples:
+        n_rungs = min(n_rungs, int(math.floor(math.log(max_samples / min_samples, eta))) + 1)
+    else:
+        n_rungs = 1
+    return [
+        max_samples if rung == n_rungs - 1 else int(max_samples / eta ** (n_rungs - 1 - rung))
+        for rung in range(n_rungs)
+    ]
+
+
+def search_models(
+    X: pd.DataFrame,
+    y: pd.Series,
+    preprocessor,
+    candidates: Optional[List[Candidate]] = None,
+    cv: int = 3,
+    n_jobs: Optional[int] = None,
+    eta: int = 3,
+    min_samples: int = 500,
+    random_state: int = 42,
+    transform_cache: Optional[TransformCache] = None
+) -> SearchResult:
+    """
+    Race every candidate configuration and refit the winner as a pipeline.
+
+    ``n_jobs`` is the core budget (default: all cores); estimators that
+    can multithread are pinned to one core each so the pool is not
+    oversubscribed. Returns every trial, the best full-data trial and the
+    refitted ``preprocessor`` + ``classifier`` pipeline. With a
+    ``transform_cache``, fold matrices and the final preprocessor come from
+    disk when the same data and preprocessor were seen before.
+    """
+    candidates = candidates or default_candidates(random_state)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    y = np.asarray(y)
+
+    folds, orders = [], []
+    rng = np.random.default_rng(random_state)
+    splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    for train_idx, valid_idx in splitter.split(X, y):
+        if transform_cache is not None:
+            fitted, X_train = transform_cache.fit_transform(
+                preprocessor, X.iloc[train_idx], y[train_idx]
+            )
+            X_valid = transform_cache.transform(fitted, X.iloc[valid_idx])
+        else:
+            fitted = clone(preprocessor)
+            X_train = fitted.fit_transform(X.iloc[train_idx], y[train_idx])
+            X_valid = fitted.transform(X.iloc[valid_idx])
+        folds.append((X_train, y[train_idx], X_valid, y[valid_idx]))
+        orders.append(rng.permutation(len(train_idx)))
+
+    configs = []
+    for candidate in candidates:
+        estimator = clone(candidate.estimator)
+        if estimator.get_params().get("n_jobs") not in (None, 1):
+            estimator.set_params(n_jobs=1)
+        for params in ParameterGrid(candidate.param_grid):
+            configs.append((candidate.name, estimator, params))
+
+    max_samples = min(len(order) for order in orders)
+    sizes = _rung_sizes(len(configs), max_samples, min_samples, eta)
+
+    trials: List[Trial] = []
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, n_samples in enumerate(sizes):
+            results = parallel(
+                delayed(_fit_and_score)(estimator, params, fold, order, n_samples)
+                for _, estimator, params in configs
+                for fold, order in zip(folds, orders)
+            )
+            rung_trials = []
+            for i, (name, _, params) in enumerate(configs):
+                fold_results = results[i * cv:(i + 1) * cv]
+                rung_trials.append(Trial(
+                    candidate=name,
+                    params=params,
+                    rung=rung,
+                    n_samples=n_samples,
+                    fold_scores=[score for score, _ in fold_results],
+                    fit_seconds=sum(seconds for _, seconds in fold_results),
+                ))
+            trials.extend(rung_trials)
+
+            ranked = sorted(
+                range(len(configs)),
+                key=lambda i: -np.nan_to_num(rung_trials[i].score, nan=-np.inf),
+            )
+            keep = ranked if rung == len(sizes) - 1 else ranked[:max(1, len(configs) // eta)]
+            configs = [configs[i] for i in keep]
+            best = rung_trials[keep[0]]
+
+    name, _, params = configs[0]
+    estimator = next(c.estimator for c in candidates if c.name == name)
+    model = fit_pipeline(Pipeline([
+        ("preprocessor", clone(preprocessor)),
+        ("classifier", clone(estimator).set_params(**params)),
+    ]), X, y, transform_cache)
+    return SearchResult(trials=trials, best=best, model=model)
+
+
+def log_search(result: SearchResult, run_name: str = "model_search"):
+    """Log each trial as a nested MLflow run with one ``log_batch`` call, then the winning model."""
+    import mlflow
+    import mlflow.sklearn
+    from mlflow.entities import Metric, Param, RunTag
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    with mlflow.start_run(run_name=run_name) as parent:
+        timestamp = int(time.time() * 1000)
+        for i, trial in enumerate(result.trials):
+            run = client.create_run(parent.info.experiment_id, tags={
+                "mlflow.parentRunId": parent.info.run_id,
+                "mlflow.runName": f"{trial.candidate}-rung{trial.rung}-{i}",
+            })
+            metrics = [Metric("roc_auc", trial.score, timestamp, 0),
+                       Metric("fit_seconds", trial.fit_seconds, timestamp, 0)]
+            metrics += [Metric("fold_roc_auc", score, timestamp, fold)
+                        for fold, score in enumerate(trial.fold_scores)]
+            params = [Param(k, str(v)) for k, v in trial.params.items()]
+            params.append(Param("n_samples", str(trial.n_samples)))
+            tags = [RunTag("candidate", trial.candidate), RunTag("rung", str(trial.rung))]
+            client.log_batch(run.info.run_id, metrics=metrics, params=params, tags=tags)
+            client.set_terminated(run.info.run_id)
+
+        mlflow.set_tag("best_candidate", result.best.candidate)
+        mlflow.log_params(result.best.params)
+        mlflow.log_metric("cv_roc_auc", result.best.score)
+        mlflow.sklearn.log_model(result.model, "model")
+
+
+def tune_and_log(df: pd.DataFrame, n_jobs: Optional[int] = None, cv: int = 3):
+    """Search on 80% of the training table, report test AUC on the rest and log to MLflow."""
+    X = df.drop(columns=["CustomerId", "is_high_risk"], errors="ignore")
+    y = df["is_high_risk"]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    numeric = X.select_dtypes("number").columns.tolist()
+    categorical = [c for c in X.columns if c not in numeric]
+    result = search_models(X_train, y_train, build_preprocessor(numeric, categorical),
+                           cv=cv, n_jobs=n_jobs)
+
+    test_auc = _auc(y_test, result.model.predict_proba(X_test)[:, 1])
+    log_search(result)
+    print(f"Best: {result.best.candidate} {result.best.params} "
+          f"CV AUC {result.best.score:.4f}, test AUC {test_auc:.4f}")
+    return result, test_auc
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the model search and log it to MLflow.")
+    parser.add_argument("table", help="training table (CSV or Parquet) with is_high_risk")
+    parser.add_argument("--columns", nargs="+", default=None,
+                        help="features to load (plus is_high_risk)")
+    parser.add_argument("--start", default=None, help="first transaction date to train on")
+    parser.add_argument("--end", default=None, help="train on transactions before this date")
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--cv", type=int, default=3)
+    args = parser.parse_args()
+
+    columns = None if args.columns is None else args.columns + ["is_high_risk"]
+    table = load_processed(args.table, columns, args.start, args.end)
+    tune_and_log(table, n_jobs=args.jobs, cv=args.cv)
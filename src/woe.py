@@ -0,0 +1,418 @@
+"""Weight of evidence (WoE) binning for numeric and categorical features.
+
+Features are binned against a binary target (``is_high_risk``) and
+encoded as WoE = ln(%good / %bad), with ``SMOOTHING`` added to every
+bin's counts. Counts are kept as fine-grained histograms that add up
+across chunks, so bins can be fitted on streamed data; scoring is a
+``np.searchsorted`` lookup per feature. ``CompactEncoder(method="woe")``
+uses the same ``woe_iv`` formula.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from src.eda_metrics import DEFAULT_SKETCH_K, sketch_columns
+
+TARGET = "is_high_risk"
+MISSING = "__missing__"
+# Fine numeric histograms store missing values under this bin code
+MISSING_CODE = -1
+SMOOTHING = 0.5
+
+
+def fine_edges(df: pd.DataFrame, features: List[str], n_bins: int = 64) -> Dict[str, np.ndarray]:
+    """
+    Quantile cut points for the fine histograms.
+
+    Compute once (on the full data or a representative sample) and
+    reuse for every chunk: counts are only mergeable when they share
+    edges. ``sketch_edges`` gets them from streamed chunks.
+    """
+    edges = {}
+    for feature in features:
+        values = df[feature].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        cuts = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]) if values.size else []
+        edges[feature] = np.unique(cuts)
+    return edges
+
+
+def sketch_edges(
+    chunks: Iterable[pd.DataFrame],
+    features: List[str],
+    n_bins: int = 64,
+    k: int = DEFAULT_SKETCH_K
+) -> Dict[str, np.ndarray]:
+    """``fine_edges`` from one streaming pass, via quantile sketches of every chunk."""
+    sketches = sketch_columns(chunks, features, k)
+    probs = np.linspace(0, 1, n_bins + 1)[1:-1]
+    return {
+        feature: np.unique(sketches[feature].quantile(probs))
+        if feature in sketches and sketches[feature].n else np.array([])
+        for feature in features
+    }
+
+
+def woe_counts(
+    df: pd.DataFrame,
+    edges: Dict[str, np.ndarray],
+    categorical: List[str],
+    target: str = TARGET
+) -> Dict[str, pd.DataFrame]:
+    """Per-feature ``total`` / ``bad`` counts by fine bin (numeric) or category."""
+    y = df[target].to_numpy(dtype=np.float64)
+    counts = {}
+
+    for feature, cuts in edges.items():
+        x = df[feature].to_numpy(dtype=np.float64)
+        missing = np.isnan(x)
+        codes = np.searchsorted(cuts, x[~missing], side="right")
+        n = len(cuts) + 1
+        frame = pd.DataFrame({
+            "total": np.bincount(codes, minlength=n).astype(np.float64),
+            "bad": np.bincount(codes, weights=y[~missing], minlength=n),
+        })
+        frame.loc[MISSING_CODE] = [float(missing.sum()), float(y[missing].sum())]
+        counts[feature] = frame
+
+    for feature in categorical:
+        column = df[feature].astype(object)
+        keys = column.where(column.notna(), MISSING)
+        grouped = pd.Series(y, index=df.index).groupby(keys)
+        counts[feature] = pd.DataFrame({"total": grouped.size().astype(np.float64),
+                                        "bad": grouped.sum()})
+
+    return counts
+
+
+def merge_woe_counts(
+    a: Dict[str, pd.DataFrame],
+    b: Dict[str, pd.DataFrame]
+) -> Dict[str, pd.DataFrame]:
+    """Add two sets of counts built with the same edges."""
+    merged = dict(a)
+    for feature, frame in b.items():
+        merged[feature] = frame if feature not in a else a[feature].add(frame, fill_value=0.0)
+    return merged
+
+
+def woe_iv(total: np.ndarray, bad: np.ndarray, smoothing: float = SMOOTHING):
+    """WoE = ln(%good / %bad) per bin, and each bin's IV contribution."""
+    total = np.asarray(total, dtype=np.float64)
+    bad = np.asarray(bad, dtype=np.float64)
+    good = total - bad
+    k = len(total)
+    pct_good = (good + smoothing) / (good.sum() + smoothing * k)
+    pct_bad = (bad + smoothing) / (bad.sum() + smoothing * k)
+    woe = np.log(pct_good / pct_bad)
+    return woe, (pct_good - pct_bad) * woe
+
+
+def _merge_groups(groups: list, i: int) -> None:
+    """Merge groups[i] with groups[i + 1]; a group is [start, end, total, bad]."""
+    a, b = groups[i], groups.pop(i + 1)
+    groups[i] = [a[0], b[1], a[2] + b[2], a[3] + b[3]]
+
+
+def _rate(group) -> float:
+    return group[3] / group[2]
+
+
+def _group_fine_bins(
+    total: np.ndarray,
+    bad: np.ndarray,
+    method: str,
+    max_bins: int,
+    min_bin_share: float
+) -> list:
+    """Group fine bins into at most ``max_bins`` [start, end) runs."""
+    groups = []
+    for i, (t, b) in enumerate(zip(total, bad)):
+        if groups and (t == 0 or groups[-1][2] == 0):
+            groups[-1] = [groups[-1][0], i + 1, groups[-1][2] + t, groups[-1][3] + b]
+        else:
+            groups.append([i, i + 1, t, b])
+    if not groups or groups[-1][2] == 0 and len(groups) == 1:
+        return [[0, len(total), total.sum(), bad.sum()]]
+
+    if method == "quantile":
+        share = np.cumsum([g[2] for g in groups]) / sum(g[2] for g in groups)
+        labels = np.minimum((share * max_bins - 1e-9).astype(int), max_bins - 1)
+        merged = []
+        for label, group in zip(labels, groups):
+            if merged and merged[-1][0] == label:
+                merged[-1][1] = [merged[-1][1][0], group[1], merged[-1][1][2] + group[2],
+                                 merged[-1][1][3] + group[3]]
+            else:
+                merged.append([label, group])
+        return [group for _, group in merged]
+
+    if method != "monotonic":
+        raise ValueError(f"method must be 'monotonic' or 'quantile', got {method!r}")
+
+    # Trend direction from the total-weighted covariance of position and bad rate
+    rates = np.array([_rate(g) for g in groups])
+    weights = np.array([g[2] for g in groups])
+    position = np.arange(len(groups))
+    increasing = np.cov(position, rates, aweights=weights)[0, 1] >= 0 if len(groups) > 1 else True
+
+    # Pool adjacent violators until bad rates are monotone
+    pooled = []
+    for group in groups:
+        pooled.append(list(group))
+        while len(pooled) > 1 and (
+            _rate(pooled[-2]) > _rate(pooled[-1]) if increasing
+            else _rate(pooled[-2]) < _rate(pooled[-1])
+        ):
+            _merge_groups(pooled, len(pooled) - 2)
+    groups = pooled
+
+    # Merging neighbours keeps the rates monotone
+    n_rows = sum(g[2] for g in groups)
+    while len(groups) > 1:
+        shares = [g[2] / n_rows for g in groups]
+        smallest = int(np.argmin(shares))
+        if shares[smallest] >= min_bin_share and len(groups) <= max_bins:
+            break
+        if shares[smallest] < min_bin_share:
+            neighbours = [j for j in (smallest - 1, smallest + 1) if 0 <= j < len(groups)]
+            target = min(neighbours, key=lambda j: abs(_rate(groups[j]) - _rate(groups[smallest])))
+            _merge_groups(groups, min(smallest, target))
+        else:
+            gaps = [abs(_rate(groups[j + 1]) - _rate(groups[j])) for j in range(len(groups) - 1)]
+            _merge_groups(groups, int(np.argmin(gaps)))
+    return groups
+
+
+@dataclass
+class FeatureBins:
+    """Fitted WoE bins for one feature."""
+
+    feature: str
+    kind: str
+    woe: np.ndarray
+    edges: Optional[np.ndarray] = None
+    categories: Optional[list] = None
+    missing_woe: float = 0.0
+    default_woe: float = 0.0
+    iv: float = 0.0
+
+    def __post_init__(self):
+        self.woe = np.asarray(self.woe, dtype=np.float64)
+        if self.kind == "numeric":
+            self.edges = np.asarray(self.edges, dtype=np.float64)
+        else:
+            self._index = pd.Index(self.categories, dtype=object)
+            self._lookup = dict(zip(self.categories, self.woe.tolist()))
+            self._table = np.append(self.woe, self.default_woe)
+
+    def transform(self, values) -> np.ndarray:
+        if self.kind == "numeric":
+            x = np.asarray(values, dtype=np.float64)
+            out = self.woe.take(np.searchsorted(self.edges, x, side="right"))
+            out[np.isnan(x)] = self.missing_woe
+            return out
+
+        values = pd.Series(values).astype(object)
+        out = self._table.take(self._index.get_indexer(values))
+        out[values.isna().to_numpy()] = self.missing_woe
+        return out
+
+    def transform_one(self, value) -> float:
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return self.missing_woe
+        if self.kind == "numeric":
+            return float(self.woe[int(np.searchsorted(self.edges, value, side="right"))])
+        return self._lookup.get(value, self.default_woe)
+
+    def to_dict(self) -> Dict:
+        spec = {"feature": self.feature, "kind": self.kind, "woe": self.woe.tolist(),
+                "missing_woe": self.missing_woe, "default_woe": self.default_woe,
+                "iv": self.iv}
+        if self.kind == "numeric":
+            spec["edges"] = self.edges.tolist()
+        else:
+            spec["categories"] = list(self.categories)
+        return spec
+
+
+def _numeric_bins(feature, frame, cuts, method, max_bins, min_bin_share) -> FeatureBins:
+    binned = frame.drop(index=MISSING_CODE, errors="ignore").sort_index()
+    groups = _group_fine_bins(binned["total"].to_numpy(), binned["bad"].to_numpy(),
+                              method, max_bins, min_bin_share)
+    missing = frame.loc[MISSING_CODE] if MISSING_CODE in frame.index else None
+
+    total = np.array([g[2] for g in groups] + [0.0 if missing is None else missing["total"]])
+    bad = np.array([g[3] for g in groups] + [0.0 if missing is None else missing["bad"]])
+    woe, iv = woe_iv(total, bad)
+    has_missing = total[-1] > 0
+    return FeatureBins(
+        feature=feature,
+        kind="numeric",
+        woe=woe[:-1],
+        edges=np.asarray(cuts)[[g[1] - 1 for g in groups[:-1]]],
+        missing_woe=float(woe[-1]) if has_missing else 0.0,
+        iv=float(iv.sum() if has_missing else iv[:-1].sum()),
+    )
+
+
+def _categorical_bins(feature, frame, min_bin_share) -> FeatureBins:
+    missing = frame.loc[MISSING] if MISSING in frame.index else None
+    present = frame.drop(index=MISSING, errors="ignore")
+    n_rows = frame["total"].sum()
+    frequent = present[present["total"] >= min_bin_share * n_rows]
+    rare = present.drop(index=frequent.index)
+
+    total = np.concatenate([frequent["total"].to_numpy(), [rare["total"].sum()],
+                            [0.0 if missing is None else missing["total"]]])
+    bad = np.concatenate([frequent["bad"].to_numpy(), [rare["bad"].sum()],
+                          [0.0 if missing is None else missing["bad"]]])
+    # Empty pooled/missing bins get a neutral WoE of 0
+    keep = total > 0
+    kept_woe, iv = woe_iv(total[keep], bad[keep])
+    woe = np.zeros_like(total)
+    woe[keep] = kept_woe
+    return FeatureBins(
+        feature=feature,
+        kind="categorical",
+        woe=woe[:-2],
+        categories=frequent.index.tolist(),
+        default_woe=float(woe[-2]),
+        missing_woe=float(woe[-1]),
+        iv=float(iv.sum()),
+    )
+
+
+class WoEBinning:
+    """Fitted WoE bins for a set of features."""
+
+    def __init__(self, bins: Dict[str, FeatureBins]):
+        self.bins = bins
+
+    @property
+    def features(self) -> List[str]:
+        return list(self.bins)
+
+    def information_value(self) -> pd.Series:
+        iv = pd.Series({f: b.iv for f, b in self.bins.items()}, name="iv")
+        return iv.sort_values(ascending=False)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(
+            {f"{f}_woe": b.transform(df[f].to_numpy()) for f, b in self.bins.items()},
+            index=df.index,
+        )
+
+    def transform_one(self, record: Dict) -> Dict[str, float]:
+        return {f"{f}_woe": b.transform_one(record.get(f)) for f, b in self.bins.items()}
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps([b.to_dict() for b in self.bins.values()], indent=2))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "WoEBinning":
+        specs = json.loads(Path(path).read_text())
+        return cls({spec["feature"]: FeatureBins(**spec) for spec in specs})
+
+
+def fit_woe_bins(
+    counts: Dict[str, pd.DataFrame],
+    edges: Dict[str, np.ndarray],
+    method: str = "monotonic",
+    max_bins: int = 8,
+    min_bin_share: float = 0.05
+) -> WoEBinning:
+    """
+    Coarse-bin fine counts and compute WoE / IV.
+
+    Numeric features use ``method="monotonic"`` (adjacent fine bins are
+    pooled until the bad rate is monotone, then small or similar
+    neighbours are merged) or ``"quantile"`` (equal-count bins).
+    Categories below ``min_bin_share`` share a pooled bin that also
+    scores unseen values; missing values get their own WoE.
+    """
+    bins = {}
+    for feature, frame in counts.items():
+        if feature in edges:
+            bins[feature] = _numeric_bins(feature, frame, edges[feature], method,
+                                          max_bins, min_bin_share)
+        else:
+            bins[feature] = _categorical_bins(feature, frame, min_bin_share)
+    return WoEBinning(bins)
+
+
+def fit_woe(
+    df: pd.DataFrame,
+    numeric: List[str],
+    categorical: List[str],
+    target: str = TARGET,
+    n_fine: int = 64,
+    **kwargs
+) -> WoEBinning:
+    edges = fine_edges(df, numeric, n_fine)
+    return fit_woe_bins(woe_counts(df, edges, categorical, target), edges, **kwargs)
+
+
+def fit_woe_chunked(
+    chunks: Callable[[], Iterable[pd.DataFrame]],
+    numeric: List[str],
+    categorical: List[str],
+    target: str = TARGET,
+    n_fine: int = 64,
+    edges: Optional[Dict[str, np.ndarray]] = None,
+    **kwargs
+) -> WoEBinning:
+    """
+    Fit bins over streamed chunks.
+
+    ``chunks`` returns a fresh iterator on each call (e.g. a lambda around
+    ``load_data_chunks``). Unless ``edges`` are given, a first pass sketches
+    the numeric features, so the fine edges reflect the whole file rather
+    than whichever rows come first; a second pass counts.
+    """
+    if edges is None:
+        edges = sketch_edges(chunks(), numeric, n_fine)
+    counts = {}
+    for chunk in chunks():
+        counts = merge_woe_counts(counts, woe_counts(chunk, edges, categorical, target))
+    if not counts:
+        raise ValueError("No chunks to fit WoE bins on")
+    return fit_woe_bins(counts, edges, **kwargs)
+
+
+class WoEEncoder(BaseEstimator, TransformerMixin):
+    """Pipeline step replacing each column with its binned WoE."""
+
+    def __init__(self, method: str = "monotonic", max_bins: int = 8,
+                 min_bin_share: float = 0.05, n_fine: int = 64):
+        self.method = method
+        self.max_bins = max_bins
+        self.min_bin_share = min_bin_share
+        self.n_fine = n_fine
+
+    def fit(self, X, y):
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        numeric = X.select_dtypes("number").columns.tolist()
+        categorical = [c for c in X.columns if c not in numeric]
+        df = X.assign(**{TARGET: np.asarray(y)})
+        self.binning_ = fit_woe(df, numeric, categorical, n_fine=self.n_fine,
+                                method=self.method, max_bins=self.max_bins,
+                                min_bin_share=self.min_bin_share)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def transform(self, X):
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=self.feature_names_in_)
+        return self.binning_.transform(X).to_numpy()
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray([f"{f}_woe" for f in self.feature_names_in_], dtype=object)
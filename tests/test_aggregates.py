@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from src.aggregates import (
+    aggregate_chunks,
+    finalize_aggregates,
+    load_state,
+    partial_aggregates,
+    refresh_aggregates,
+    refresh_from_file,
+)
+from src.data_processing import create_aggregates
+
+
+def _transactions(n=200):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "CustomerId": rng.integers(0, 20, n),
+        "TransactionId": np.arange(n),
+        "Amount": rng.normal(1000, 500, n).round(2),
+        "TransactionStartTime": pd.Timestamp("2019-01-01", tz="Africa/Kampala")
+        + pd.to_timedelta(rng.integers(0, 90 * 86400, n), unit="s"),
+    })
+
+
+def test_chunked_aggregates_match_full_recompute():
+    df = _transactions()
+    expected = create_aggregates(df).sort_values("CustomerId").reset_index(drop=True)
+
+    state = aggregate_chunks([df.iloc[i:i + 37] for i in range(0, len(df), 37)])
+    result = finalize_aggregates(state).sort_values("CustomerId").reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_refresh_aggregates_persists_state(tmp_path):
+    df = _transactions()
+    state_path = tmp_path / "agg_state.pkl"
+
+    refresh_aggregates(df.iloc[:120], state_path)
+    result = refresh_aggregates(df.iloc[120:], state_path)
+
+    assert result["txn_count"].sum() == len(df)
+    expected = create_aggregates(df).sort_values("CustomerId").reset_index(drop=True)
+    result = result.sort_values("CustomerId").reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    state = load_state(state_path).sort_index()
+    full = partial_aggregates(df).sort_index()
+    np.testing.assert_allclose(state["amount_mean"], full["amount_mean"])
+    np.testing.assert_allclose(state["amount_m2"], full["amount_m2"])
+    pd.testing.assert_series_equal(state["last_ts"], full["last_ts"])
+    assert state["last_ts"].dtype == "datetime64[ns]"
+    assert state["last_ts"].max() == df["TransactionStartTime"].max().tz_convert(None)
+
+
+def test_refresh_from_file_folds_only_new_rows(tmp_path):
+    df = _transactions()
+    df["CustomerId"] = "C" + df["CustomerId"].astype(str)
+    df = df.assign(AccountId="A1", CountryCode=256, CurrencyCode="UGX")
+    state_path = tmp_path / "agg_state.pkl"
+    out_path = tmp_path / "customer_features.parquet"
+    df.iloc[:120].to_csv(tmp_path / "day1.csv", index=False)
+    df.iloc[120:].to_csv(tmp_path / "day2.csv", index=False)
+
+    refresh_from_file(tmp_path / "day1.csv", state_path, chunksize=50)
+    result = refresh_from_file(tmp_path / "day2.csv", state_path, out_path, chunksize=50)
+
+    expected = create_aggregates(df).sort_values("CustomerId").reset_index(drop=True)
+    result = result.sort_values("CustomerId").reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    written = pd.read_parquet(out_path).sort_values("CustomerId").reset_index(drop=True)
+    pd.testing.assert_frame_equal(written, expected, check_dtype=False)
@@ -0,0 +1,205 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.api import main  # noqa: E402
+from src.config import ServingConfig  # noqa: E402
+from src.explain import background_path, save_background  # noqa: E402
+from src.feature_store import FeatureStore  # noqa: E402
+from src.predict import BATCH_CHUNK_SIZE  # noqa: E402
+from src.preprocessing import build_preprocessor  # noqa: E402
+
+FEATURES = ["total_amount", "avg_amount", "txn_count", "amount_std"]
+RECORD = {"total_amount": 1500.0, "avg_amount": 300.0, "txn_count": 5, "amount_std": 40.0}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((50, 4)) * 1000, columns=FEATURES)
+    model = LogisticRegression().fit(X, rng.integers(0, 2, 50))
+    joblib.dump(model, tmp_path / "model.pkl")
+    FeatureStore(tmp_path / "features.db").bulk_load(
+        pd.DataFrame([{"CustomerId": "C1", **RECORD}])
+    )
+
+    monkeypatch.setattr(main, "config", ServingConfig(
+        tracking_uri=None,
+        cache_dir=str(tmp_path / "cache"),
+        fallback_path=str(tmp_path / "model.pkl"),
+        feature_store_path=str(tmp_path / "features.db"),
+        admin_token="secret",
+    ))
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_health_endpoints(client):
+    assert client.get("/health/live").status_code == 200
+
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200
+    assert ready.json()["model_source"] == "file"
+
+
+def test_batch_matches_single_predictions(client):
+    single = client.post("/predict", json=RECORD).json()
+    batch = client.post("/predict/batch", json=[RECORD, RECORD]).json()
+
+    assert len(batch) == 2
+    assert batch[0]["risk_probability"] == pytest.approx(single["risk_probability"])
+    assert batch[0]["loan_offer"] == single["loan_offer"]
+
+
+def test_repeated_predictions_hit_cache_until_reload(client):
+    client.post("/predict", json=RECORD)
+    client.post("/predict", json=RECORD)
+    assert client.get("/metrics").json()["prediction_cache"]["hits"] == 1
+
+    assert client.post("/admin/reload").status_code == 401
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "secret"}).status_code == 200
+    stats = client.get("/metrics").json()["prediction_cache"]
+    assert stats["size"] == 0
+    assert stats["invalidations"] == 1
+
+
+def test_predict_by_customer_uses_stored_features(client):
+    single = client.post("/predict", json=RECORD).json()
+    stored = client.get("/predict/by-customer/C1").json()
+
+    assert stored["features"] == pytest.approx(RECORD)
+    assert stored["risk_probability"] == pytest.approx(single["risk_probability"])
+    assert client.get("/predict/by-customer/C2").status_code == 404
+
+
+def test_predict_by_customer_rejects_customers_without_amounts(client):
+    main.app.state.feature_store.upsert_transactions(pd.DataFrame({
+        "CustomerId": ["C3"], "TransactionId": [1], "Amount": [np.nan],
+        "TransactionStartTime": [pd.Timestamp("2019-01-01", tz="UTC")],
+    }))
+
+    response = client.get("/predict/by-customer/C3")
+    assert response.status_code == 422
+    assert "avg_amount" in response.json()["detail"]
+
+
+def test_explain_needs_a_compilable_pipeline(client):
+    assert client.post("/explain", json=RECORD).status_code == 501
+
+
+def test_partial_record_fails_alone_in_a_concurrent_batch(client):
+    partial = {"total_amount": 0.5}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(
+            lambda record: client.post("/predict", json=record), [RECORD, partial] * 2
+        ))
+
+    assert [r.status_code for r in responses] == [200, 422, 200, 422]
+    assert client.post("/predict", json=partial).status_code == 422
+
+
+def test_ndjson_stops_scoring_after_the_client_disconnects(client):
+    body = "".join(json.dumps(RECORD) + "\n" for _ in range(BATCH_CHUNK_SIZE + 5)).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": "POST", "scheme": "http", "path": "/predict/batch/ndjson",
+             "raw_path": b"/predict/batch/ndjson", "root_path": "", "query_string": b"",
+             "headers": [(b"content-type", b"application/x-ndjson")],
+             "client": ("test", 1), "server": ("test", 80), "app": main.app}
+    asyncio.run(main.app(scope, receive, send))
+
+    lines = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    assert sent[0]["status"] == 200
+    assert lines.count(b"\n") == BATCH_CHUNK_SIZE
+
+
+def test_ndjson_reports_a_failed_chunk_line_by_line(client, monkeypatch):
+    calls = []
+    score_records = main.score_records
+
+    def flaky(model, records, chunk_size):
+        calls.append(len(records))
+        if len(calls) == 1:
+            raise RuntimeError("model exploded")
+        return score_records(model, records, chunk_size)
+
+    monkeypatch.setattr(main, "BATCH_CHUNK_SIZE", 2)
+    monkeypatch.setattr(main, "score_records", flaky)
+    lines = [json.dumps(RECORD), "{}", json.dumps(RECORD), json.dumps(RECORD),
+             json.dumps(RECORD)]
+    response = client.post("/predict/batch/ndjson", content="\n".join(lines))
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert rows[0] == {"line": 1, "error": "model exploded"}
+    assert rows[1]["line"] == 2 and isinstance(rows[1]["error"], list)
+    assert all("risk_probability" in row for row in rows[2:])
+    assert len(rows) == len(lines)
+
+
+def test_equivalent_payloads_share_a_cache_entry(client):
+    client.post("/predict", json=RECORD)
+    client.post("/predict", json={**RECORD, "txn_count": 5.0, "ignored": "x"})
+    assert client.get("/metrics").json()["prediction_cache"]["hits"] == 1
+
+
+def _serve_pipeline(tmp_path, monkeypatch, classifier):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((200, 4)) * 1000, columns=FEATURES)
+    y = (X["txn_count"] + rng.normal(0, 200, 200) > 500).astype(int)
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(FEATURES, [])),
+        ("classifier", classifier),
+    ]).fit(X, y)
+    joblib.dump(pipeline, tmp_path / "model.pkl")
+    save_background(X, background_path(tmp_path / "model.pkl"))
+
+    monkeypatch.setattr(main, "config", ServingConfig(
+        tracking_uri=None,
+        cache_dir=str(tmp_path / "cache"),
+        fallback_path=str(tmp_path / "model.pkl"),
+        mmap_dir=str(tmp_path / "mmap"),
+    ))
+    return TestClient(main.app)
+
+
+def test_explain_returns_reason_codes_from_a_mapped_export(tmp_path, monkeypatch):
+    with _serve_pipeline(tmp_path, monkeypatch, LogisticRegression()) as client:
+        assert client.get("/health/ready").json()["model_source"] == "mmap"
+
+        response = client.post("/explain", params={"top_k": 2}, json=RECORD)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["risk_probability"] == pytest.approx(
+            client.post("/predict", json=RECORD).json()["risk_probability"]
+        )
+        assert len(body["reasons"]) <= 2
+        assert client.post("/explain", params={"top_k": 0}, json=RECORD).status_code == 422
+
+
+def test_explain_tree_model_behind_a_mapped_export(tmp_path, monkeypatch):
+    pytest.importorskip("shap")
+    forest = RandomForestClassifier(n_estimators=5, random_state=0)
+    with _serve_pipeline(tmp_path, monkeypatch, forest) as client:
+        assert client.post("/explain", json=RECORD).status_code == 200
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.api.batcher import BatcherStopped, MicroBatcher
+
+
+def test_concurrent_requests_are_coalesced_and_errors_isolated():
+    batch_sizes = []
+
+    def score_batch(rows):
+        batch_sizes.append(len(rows))
+        if any(row["x"] < 0 for row in rows):
+            raise ValueError("negative x")
+        return [{"y": row["x"] * 2} for row in rows]
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit({"x": x}) for x in [1, 2, 3, -1]),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+
+    assert batch_sizes[0] == 4
+    assert results[:3] == [{"y": 2}, {"y": 4}, {"y": 6}]
+    with pytest.raises(ValueError):
+        raise results[3]
+
+
+def test_invalid_rows_fail_alone_without_joining_the_batch():
+    batches = []
+
+    def score_batch(rows):
+        batches.append(rows)
+        return [{"y": row["x"]} for row in rows]
+
+    def validate(row):
+        if "x" not in row:
+            raise ValueError("Missing features: ['x']")
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=8, max_wait_ms=50, validate=validate)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(row) for row in [{"x": 1}, {"z": 0}, {"x": 2}]),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+
+    assert results[0] == {"y": 1} and results[2] == {"y": 2}
+    assert isinstance(results[1], ValueError)
+    assert all("x" in row for rows in batches for row in rows)
+
+
+def test_stop_fails_rows_still_waiting():
+    release = threading.Event()
+
+    def score_batch(rows):
+        release.wait(5)
+        return [{"y": row["x"]} for row in rows]
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=1, max_concurrent_batches=1)
+        await batcher.start()
+        pending = [asyncio.ensure_future(batcher.submit({"x": x})) for x in range(3)]
+        await asyncio.sleep(0.05)
+        stopping = asyncio.ensure_future(batcher.stop())
+        await asyncio.sleep(0.05)
+        release.set()
+        await stopping
+        return await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), 5)
+
+    results = asyncio.run(run())
+
+    assert results[0] == {"y": 0}
+    assert all(isinstance(r, BatcherStopped) for r in results[1:])
+
+
+def test_short_results_fail_rows_instead_of_hanging():
+    def score_batch(rows):
+        # Drops the last row's result; a lone row gets nothing at all
+        return [{"y": row["x"] * 2} for row in rows][:-1]
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.wait_for(asyncio.gather(
+                *(batcher.submit({"x": x}) for x in [1, 2, 3]),
+                return_exceptions=True,
+            ), 5)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert "0 results for 1 records" in str(results[0])
@@ -0,0 +1,35 @@
+from src.cache import PredictionCache, feature_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_feature_key_is_canonical():
+    a = feature_key({"txn_count": 3, "total_amount": 10.0}, "v1")
+    b = feature_key({"total_amount": 10.0, "txn_count": 3}, "v1")
+
+    assert a == b
+    assert a != feature_key({"txn_count": 3, "total_amount": 10.0}, "v2")
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(maxsize=2, ttl=10, clock=clock)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+
+    clock.now = 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert (stats["evictions"], stats["expirations"]) == (1, 1)
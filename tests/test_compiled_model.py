@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.compiled_model import compile_pipeline, load_compiled, save_compiled
+from src.preprocessing import build_preprocessor
+
+
+def _data(n=300):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "amount": rng.normal(1000, 300, n),
+        "count": rng.integers(1, 50, n).astype(float),
+        "channel": rng.choice(["web", "android", "ios"], n),
+        "merchant": [f"m{i}" for i in rng.integers(0, 60, n)],
+    })
+    X.loc[::9, "amount"] = np.nan
+    y = (X["count"] + rng.normal(0, 10, n) > 25).astype(int)
+    return X, y
+
+
+def test_compiled_pipeline_matches_sklearn():
+    X, y = _data()
+    X_new = X.head(40).copy()
+    X_new.loc[:3, "channel"] = "ussd"
+    X_new.loc[:3, "merchant"] = "m_unseen"
+
+    for classifier in [RandomForestClassifier(n_estimators=10, random_state=0),
+                       LogisticRegression()]:
+        pipeline = Pipeline([
+            ("preprocessor", build_preprocessor(["amount", "count"], ["channel"], ["merchant"],
+                                                encoding="woe", min_frequency=5)),
+            ("classifier", classifier),
+        ]).fit(X, y)
+        compiled = compile_pipeline(pipeline)
+
+        expected = pipeline.predict_proba(X_new)
+        np.testing.assert_array_equal(compiled.predict_proba(X_new), expected)
+        for record in X_new.to_dict("records"):
+            single = pipeline.predict_proba(pd.DataFrame([record]))[0]
+            np.testing.assert_array_equal(compiled.predict_proba_one(record), single)
+
+
+def test_mapped_export_scores_like_the_pipeline(tmp_path):
+    X, y = _data()
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(["amount", "count"], ["channel"])),
+        ("classifier", RandomForestClassifier(n_estimators=10, random_state=0)),
+    ]).fit(X, y)
+    save_compiled(compile_pipeline(pipeline), tmp_path / "export", version="v1")
+
+    mapped = load_compiled(tmp_path / "export")
+
+    assert mapped.version == "v1"
+    assert isinstance(mapped.engine.value, np.memmap)
+    np.testing.assert_array_equal(mapped.predict_proba(X), pipeline.predict_proba(X))
+    record = X.iloc[0].to_dict()
+    np.testing.assert_array_equal(mapped.predict_proba_one(record),
+                                  pipeline.predict_proba(X.head(1))[0])
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from src.data_loader import compact_dtypes, load_data_chunks, memory_report
+
+
+def _write_transactions(path, n=10):
+    df = pd.DataFrame({
+        "TransactionId": [f"T{i}" for i in range(n)],
+        "AccountId": ["A1", "A2"] * (n // 2),
+        "CustomerId": ["C1", "C2"] * (n // 2),
+        "Amount": [100.0] * n,
+        "Value": [100] * n,
+        "TransactionStartTime": ["2018-11-15T02:18:49Z"] * n,
+        "CountryCode": [256] * n,
+        "CurrencyCode": ["UGX"] * n,
+    })
+    df.to_csv(path, index=False)
+
+
+def test_load_data_chunks(tmp_path):
+    path = tmp_path / "txns.csv"
+    _write_transactions(path)
+
+    chunks = list(load_data_chunks(path, chunksize=4))
+
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert isinstance(chunks[0]["CustomerId"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_string_dtype(chunks[0]["TransactionId"])
+    assert chunks[0]["CountryCode"].dtype == "int16"
+    assert pd.api.types.is_datetime64_any_dtype(chunks[0]["TransactionStartTime"])
+
+
+def test_load_data_chunks_missing_columns(tmp_path):
+    path = tmp_path / "txns.csv"
+    pd.DataFrame({"CustomerId": ["C1"]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError):
+        next(load_data_chunks(path))
+
+
+def test_compact_dtypes_is_lossless(tmp_path):
+    path = tmp_path / "txns.csv"
+    _write_transactions(path)
+    df = pd.read_csv(path)
+    df["FraudResult"] = 0
+
+    compacted = compact_dtypes(df)
+    report = memory_report(df, compacted)
+
+    pd.testing.assert_frame_equal(compacted, df, check_dtype=False, check_categorical=False)
+    assert compacted["CountryCode"].dtype == "int16"
+    assert compacted["FraudResult"].dtype == "int8"
+    assert isinstance(compacted["CustomerId"].dtype, pd.CategoricalDtype)
+    assert compacted["Amount"].dtype == "float64"
+    assert report.loc["TOTAL", "bytes_after"] < report.loc["TOTAL", "bytes_before"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from src.eda_metrics import OutlierCaps, QuantileSketch, fit_caps, sketch_columns, merge_sketches
+
+
+def test_merged_sketches_track_exact_ranks():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(5, 2, 400_000)
+    left = QuantileSketch(k=512, seed=1).update(values[:150_000])
+    right = QuantileSketch(k=512, seed=2)
+    for i in range(150_000, len(values), 50_000):
+        right.update(values[i:i + 50_000])
+    sketch = left.merge(right)
+
+    assert sketch.n == len(values)
+    assert sum(len(level) for level in sketch.levels) < 3 * 512
+    ordered = np.sort(values)
+    for q in (0.01, 0.5, 0.99):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.01
+
+
+def test_fitted_caps_round_trip_and_clip_many_columns(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "amount": rng.normal(0, 1, 20_000),
+        "count": rng.integers(0, 1_000, 20_000).astype("int16"),
+        "channel": rng.choice(["web", "ios"], 20_000),
+    })
+    chunks = [df.iloc[i:i + 3_000] for i in range(0, len(df), 3_000)]
+    sketches = merge_sketches(sketch_columns(chunks[:3]), sketch_columns(chunks[3:]))
+    assert set(sketches) == {"amount", "count"}
+
+    fit_caps(chunks, upper_q=0.99, lower_q=0.01).save(tmp_path / "caps.json")
+    caps = OutlierCaps.load(tmp_path / "caps.json")
+    channel = df["channel"]
+    capped = caps.apply(df)
+
+    assert capped is df
+    assert df["channel"].equals(channel)
+    assert df["count"].dtype == "int16"
+    lower, upper = caps.caps["amount"]
+    assert df["amount"].min() == lower and df["amount"].max() == upper
+    assert abs((df["amount"] >= upper).mean() - 0.01) < 0.005
+
+
+def test_all_nan_column_gets_no_cap(tmp_path):
+    train = pd.DataFrame({"a": [np.nan] * 10, "b": np.arange(10.0)})
+    caps = fit_caps([train])
+    assert "a" not in caps.caps
+
+    caps.caps["c"] = (float("-inf"), float("nan"))
+    caps.save(tmp_path / "caps.json")
+    assert "NaN" not in (tmp_path / "caps.json").read_text()
+
+    scored = caps.apply(pd.DataFrame({"a": [1.0, 2.0], "b": [0.0, 50.0], "c": [3.0, 4.0]}))
+    assert scored["a"].tolist() == [1.0, 2.0]
+    assert scored["c"].tolist() == [3.0, 4.0]
+    assert scored["b"].max() < 50
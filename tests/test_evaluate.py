@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.metrics import average_precision_score, roc_auc_score, roc_curve
+
+from src.evaluate import accumulate, bootstrap_ci
+
+
+def _scores(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.2
+    scores = np.clip(rng.normal(0.35 + 0.2 * y, 0.15), 0, 1)
+    return y, scores
+
+
+def test_merged_chunk_histograms_match_exact_metrics():
+    y, scores = _scores()
+    left = accumulate([(y[:20_000], scores[:20_000])])
+    right = accumulate([(y[i:i + 7_000], scores[i:i + 7_000])
+                        for i in range(20_000, len(y), 7_000)])
+    hist = left + right
+
+    fpr, tpr, _ = roc_curve(y, scores)
+    assert abs(hist.auc() - roc_auc_score(y, scores)) < 1e-4
+    assert abs(hist.ks() - (tpr - fpr).max()) < 1e-3
+    assert abs(hist.pr_auc() - average_precision_score(y, scores)) < 1e-3
+
+    confusion = hist.confusion([0.5]).iloc[0]
+    assert confusion["tp"] == (y & (scores >= 0.5)).sum()
+    assert confusion["fp"] == (~y & (scores >= 0.5)).sum()
+
+    calibration = hist.calibration(10)
+    assert calibration["count"].sum() == len(y)
+
+
+def test_bootstrap_interval_brackets_estimate_and_ignores_n_jobs():
+    y, scores = _scores(n=5_000)
+    hist = accumulate([(y, scores)], n_bins=1_000)
+
+    serial = bootstrap_ci(hist, n_boot=80, n_jobs=1)
+    parallel = bootstrap_ci(hist, n_boot=80, n_jobs=2)
+
+    assert (serial["lower"] <= serial["estimate"]).all()
+    assert (serial["estimate"] <= serial["upper"]).all()
+    np.testing.assert_allclose(serial[["lower", "upper"]], parallel[["lower", "upper"]])
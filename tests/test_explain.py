@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.compiled_model import compile_pipeline
+from src.explain import ExplanationService
+from src.preprocessing import build_preprocessor
+
+
+def _pipeline(classifier, n=400):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "amount": rng.normal(1000, 300, n),
+        "count": rng.integers(1, 50, n).astype(float),
+        "channel": rng.choice(["web", "android", "ios"], n),
+    })
+    y = (X["count"] + 10 * (X["channel"] == "web") + rng.normal(0, 10, n) > 30).astype(int)
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor(["amount", "count"], ["channel"])),
+        ("classifier", classifier),
+    ]).fit(X, y)
+    return pipeline, X
+
+
+def test_linear_contributions_add_up_to_log_odds_and_are_cached():
+    pipeline, X = _pipeline(LogisticRegression())
+    service = ExplanationService(compile_pipeline(pipeline), background=X)
+
+    contributions = service.explain_frame(X.head(20))
+    assert list(contributions.columns) == ["amount", "count", "channel"]
+    proba = pipeline.predict_proba(X.head(20))[:, 1]
+    np.testing.assert_allclose(
+        contributions.sum(axis=1) + service.explainer.expected_value,
+        np.log(proba / (1 - proba)),
+    )
+
+    records = X.head(3).to_dict("records")
+    first = service.explain_records(records)
+    assert service.explain_records(records) == first
+    assert service.cache.stats()["hits"] == 3
+
+    reasons = service.reasons(records[0], top_k=2)
+    assert len(reasons) <= 2
+    assert all(r["contribution"] > 0 for r in reasons)
+    assert [r["contribution"] for r in reasons] == sorted(
+        (r["contribution"] for r in reasons), reverse=True
+    )
+
+
+def test_tree_contributions_match_probabilities():
+    pytest.importorskip("shap")
+    pipeline, X = _pipeline(RandomForestClassifier(n_estimators=10, random_state=0))
+    service = ExplanationService(compile_pipeline(pipeline))
+
+    contributions = service.explain_frame(X.head(20))
+    np.testing.assert_allclose(
+        contributions.sum(axis=1) + service.explainer.expected_value,
+        pipeline.predict_proba(X.head(20))[:, 1],
+        atol=1e-6,
+    )
+
+
+def test_linear_model_with_categories_needs_a_background():
+    pipeline, X = _pipeline(LogisticRegression())
+    with pytest.raises(ValueError, match="background"):
+        ExplanationService(compile_pipeline(pipeline))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_processing import create_aggregates
+from src.feature_store import FeatureStore
+from src.rfm import build_rfm
+
+
+def _transactions(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "CustomerId": [f"CustomerId_{i}" for i in rng.integers(0, 25, n)],
+        "TransactionId": np.arange(n),
+        "TransactionStartTime": pd.Timestamp("2019-01-01", tz="UTC")
+        + pd.to_timedelta(rng.integers(0, 90 * 86400, n), unit="s"),
+        "Amount": rng.normal(1000, 500, n).round(2),
+        "Value": rng.integers(1, 5000, n),
+    })
+
+
+def test_bulk_load_then_upserts_match_full_recompute(tmp_path):
+    df = _transactions()
+    history, new = df.iloc[:200], df.iloc[200:]
+    snapshot = history["TransactionStartTime"].max()
+
+    store = FeatureStore(tmp_path / "features.db")
+    store.bulk_load(create_aggregates(history), build_rfm(history, snapshot), snapshot)
+    store.upsert_transactions(new.iloc[:50])
+    store.upsert_transactions(new.iloc[50:])
+
+    expected = create_aggregates(df).set_index("CustomerId")
+    monetary = df.groupby("CustomerId")["Value"].sum()
+    assert len(store) == len(expected)
+    for customer, row in expected.iterrows():
+        stored = store.get(customer)
+        assert stored["txn_count"] == row["txn_count"]
+        assert stored["total_amount"] == pytest.approx(row["total_amount"])
+        assert stored["avg_amount"] == pytest.approx(row["avg_amount"])
+        assert stored["amount_std"] == pytest.approx(row["amount_std"])
+        assert stored["monetary"] == pytest.approx(monetary[customer])
+
+    assert store.get("CustomerId_unknown") is None
+
+
+def test_unknown_monetary_totals_stay_unknown_after_upserts(tmp_path):
+    df = _transactions()
+    history, new = df.iloc[:200], df.iloc[200:]
+    store = FeatureStore(tmp_path / "features.db")
+    store.bulk_load(create_aggregates(history))
+    store.upsert_transactions(new)
+
+    seen = set(history["CustomerId"])
+    fresh = new[~new["CustomerId"].isin(seen)]
+    for customer in set(new["CustomerId"]) & seen:
+        assert store.get(customer)["monetary"] is None
+    for customer, total in fresh.groupby("CustomerId")["Value"].sum().items():
+        assert store.get(customer)["monetary"] == total
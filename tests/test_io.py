@@ -0,0 +1,49 @@
+import pandas as pd
+
+from src.io import load_parquet, load_processed, save_processed
+
+
+def _table():
+    return pd.DataFrame({
+        "CustomerId": ["C1", "C2", "C1", "C3"],
+        "Amount": [10.0, 20.0, 30.0, 40.0],
+        "TransactionStartTime": pd.to_datetime(
+            ["2018-11-20", "2018-12-02", "2018-12-28", "2019-01-03"], utc=True
+        ),
+    })
+
+
+def test_parquet_roundtrip_with_pushdown(tmp_path):
+    df = _table()
+    path = tmp_path / "processed.parquet"
+
+    save_processed(df, path)
+    full = load_parquet(path)
+    december = load_parquet(path, columns=["Amount"], start="2018-12-01", end="2019-01-01")
+
+    assert sorted(full["Amount"]) == [10.0, 20.0, 30.0, 40.0]
+    assert list(full.columns) == list(df.columns)
+    assert sorted(december["Amount"]) == [20.0, 30.0]
+    assert list(december.columns) == ["Amount"]
+
+
+def test_rewrite_drops_months_missing_from_the_new_table(tmp_path):
+    df = _table()
+    path = tmp_path / "processed.parquet"
+
+    save_processed(df, path)
+    save_processed(df.iloc[2:], path)
+
+    assert sorted(load_parquet(path)["Amount"]) == [30.0, 40.0]
+    assert [p.name for p in tmp_path.iterdir()] == ["processed.parquet"]
+
+
+def test_load_processed_reads_csv_and_parquet_alike(tmp_path):
+    df = _table()
+    save_processed(df, tmp_path / "processed.csv")
+    save_processed(df, tmp_path / "processed.parquet")
+
+    for name in ("processed.csv", "processed.parquet"):
+        december = load_processed(tmp_path / name, columns=["CustomerId", "Amount"],
+                                  start="2018-12-01", end="2019-01-01")
+        assert december.to_dict("list") == {"CustomerId": ["C2", "C1"], "Amount": [20.0, 30.0]}
@@ -0,0 +1,68 @@
+import os
+import sys
+import types
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.api.model_loader import _load_from_registry, load_model
+from src.config import ServingConfig
+from src.preprocessing import build_preprocessor
+
+FEATURES = ["total_amount", "avg_amount", "txn_count", "amount_std"]
+
+
+def _pipeline(seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((100, 4)), columns=FEATURES)
+    return Pipeline([
+        ("preprocessor", build_preprocessor(FEATURES, [])),
+        ("classifier", LogisticRegression()),
+    ]).fit(X, rng.integers(0, 2, 100)), X
+
+
+def test_mapped_export_is_rebuilt_when_the_model_changes(tmp_path):
+    config = ServingConfig(tracking_uri=None, cache_dir=str(tmp_path / "cache"),
+                           fallback_path=str(tmp_path / "model.pkl"),
+                           mmap_dir=str(tmp_path / "mmap"))
+    old, _ = _pipeline(0)
+    joblib.dump(old, config.fallback_path)
+    first = load_model(config)
+    assert load_model(config).version == first.version
+
+    new, X = _pipeline(1)
+    joblib.dump(new, config.fallback_path)
+    second = load_model(config)
+
+    assert second.source == "mmap"
+    assert second.version != first.version
+    np.testing.assert_allclose(second.scorer.predict_proba(X), new.predict_proba(X))
+
+
+def test_registry_limits_apply_only_during_the_download(tmp_path, monkeypatch):
+    names = ("MLFLOW_HTTP_REQUEST_TIMEOUT", "MLFLOW_HTTP_REQUEST_MAX_RETRIES")
+    seen = {}
+
+    def load(uri):
+        seen.update({name: os.environ.get(name) for name in names})
+        return _pipeline(0)[0]
+
+    mlflow = types.ModuleType("mlflow")
+    mlflow.set_tracking_uri = lambda uri: None
+    mlflow.sklearn = types.SimpleNamespace(load_model=load)
+    monkeypatch.setitem(sys.modules, "mlflow", mlflow)
+    monkeypatch.setitem(sys.modules, "mlflow.sklearn", mlflow.sklearn)
+    monkeypatch.setenv("MLFLOW_HTTP_REQUEST_TIMEOUT", "120")
+    monkeypatch.delenv("MLFLOW_HTTP_REQUEST_MAX_RETRIES", raising=False)
+
+    config = ServingConfig(tracking_uri="http://registry", registry_timeout=3,
+                           registry_max_retries=1)
+    _load_from_registry(config, tmp_path / "model.joblib")
+
+    assert seen == {"MLFLOW_HTTP_REQUEST_TIMEOUT": "3", "MLFLOW_HTTP_REQUEST_MAX_RETRIES": "1"}
+    assert os.environ["MLFLOW_HTTP_REQUEST_TIMEOUT"] == "120"
+    assert "MLFLOW_HTTP_REQUEST_MAX_RETRIES" not in os.environ
+    assert (tmp_path / "model.joblib").exists()
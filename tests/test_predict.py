@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.predict import (
+    portfolio_trend,
+    probability_to_score,
+    recommend_loan,
+    score_portfolio,
+    score_records,
+)
+
+FEATURES = ["total_amount", "avg_amount", "txn_count", "amount_std"]
+
+
+def test_score_records_matches_single_row_scoring():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((40, 4)), columns=FEATURES)
+    model = LogisticRegression().fit(X, rng.integers(0, 2, 40))
+    records = X.to_dict("records")
+
+    results = list(score_records(model, records, chunk_size=7))
+
+    assert len(results) == len(records)
+    for record, result in zip(records, results):
+        prob = model.predict_proba(pd.DataFrame([record]))[0, 1]
+        assert np.isclose(result["risk_probability"], prob)
+        assert result["credit_score"] == probability_to_score(prob)
+        assert result["loan_offer"] == recommend_loan(probability_to_score(prob))
+
+
+def test_score_portfolio_reports_progress_and_trend():
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.random((250, 4)), columns=FEATURES)
+    model = LogisticRegression().fit(X, rng.integers(0, 2, 250))
+    progress = []
+
+    prob = score_portfolio(model, X, chunk_size=100,
+                           on_progress=lambda done, total: progress.append(done))
+
+    np.testing.assert_allclose(prob, model.predict_proba(X)[:, 1])
+    assert progress == [100, 200, 250]
+
+    months = pd.Series(pd.to_datetime(["2019-01-15", "2019-02-15"] * 125, utc=True))
+    trend = portfolio_trend(months, prob)
+    assert trend["Accounts"].tolist() == [125, 125]
+    assert np.isclose(trend["Average_PD"].iloc[0], prob[::2].mean())
@@ -1,6 +1,30 @@
+import numpy as np
 import pandas as pd
-from src.preprocessing import build_preprocessor
+from src.preprocessing import CompactEncoder, build_preprocessor, split_by_cardinality
 
 def test_preprocessor_build():
     preprocessor = build_preprocessor(["age"], ["gender"])
     assert preprocessor is not None
+
+
+def test_high_cardinality_columns_get_one_compact_column():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    X = pd.DataFrame({
+        "amount": rng.normal(size=n),
+        "channel": rng.choice(["web", "ios"], n),
+        "account": [f"acc{i}" for i in rng.integers(0, 400, n)],
+        "txn": [f"txn{i}" for i in range(n)],
+    })
+    y = rng.integers(0, 2, n)
+
+    low, high = split_by_cardinality(X, ["channel", "account", "txn"])
+    assert low == ["channel"] and high == ["account", "txn"]
+
+    for method in ["frequency", "target", "woe"]:
+        preprocessor = build_preprocessor(["amount"], low, high, encoding=method)
+        assert preprocessor.fit_transform(X, y).shape == (n, 1 + 2 + 2)
+
+    # Every txn value is rare, so it collapses to the pooled rare value
+    encoder = CompactEncoder(method="frequency", min_frequency=2).fit(X[["txn"]])
+    assert np.all(encoder.transform(pd.DataFrame({"txn": ["txn1", "unseen"]})) == 1.0)
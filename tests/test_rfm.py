@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rfm import build_rfm, build_rfm_chunked
+from src import rfm_target
+
+
+def _transactions():
+    return pd.DataFrame({
+        "TransactionId": [1, 2, 3, 4, 5],
+        "CustomerId": ["C1", "C1", "C2", "C3", "C2"],
+        "TransactionStartTime": pd.to_datetime([
+            "2019-01-01", "2019-01-10", "2019-01-05", "2019-01-20", "2019-01-15"
+        ]),
+        "Value": [100, 200, 50, 10, 25],
+        "Amount": [100.0, -200.0, 50.0, 10.0, 25.0],
+    })
+
+
+def test_build_rfm():
+    rfm = build_rfm(_transactions()).set_index("CustomerId")
+
+    assert rfm.loc["C1", "Recency"] == 10
+    assert rfm.loc["C2", "Frequency"] == 2
+    assert rfm.loc["C2", "Monetary"] == 75
+
+
+def test_build_rfm_chunked_matches_single_pass():
+    df = _transactions()
+
+    chunked = build_rfm_chunked([df.iloc[:2], df.iloc[2:4], df.iloc[4:]])
+
+    pd.testing.assert_frame_equal(chunked, build_rfm(df))
+
+
+def test_build_rfm_chunked_rejects_no_chunks():
+    with pytest.raises(ValueError, match="No transaction chunks"):
+        build_rfm_chunked(iter([]))
+
+
+def test_rfm_target_recency_uses_next_day_snapshot():
+    rfm = rfm_target.build_rfm(_transactions()).set_index("CustomerId")
+
+    assert rfm.loc["C3", "recency"] == 1
+    assert rfm.loc["C1", "monetary"] == -100.0
+
+
+def _rfm_groups():
+    rng = np.random.default_rng(0)
+    groups = [(5, 40, 9000.0), (60, 2, 150.0), (30, 12, 2500.0)]
+    rfm = pd.DataFrame(
+        np.vstack([rng.normal(g, [1, 1, 50], size=(100, 3)) for g in groups]),
+        columns=rfm_target.RFM_FEATURES,
+    ).sample(frac=1, random_state=0)
+    rfm.insert(0, "CustomerId", [f"C{i}" for i in range(len(rfm))])
+    return rfm
+
+
+def test_streaming_labels_agree_with_full_batch(tmp_path):
+    rfm = _rfm_groups()
+
+    labels, state = rfm_target.label_high_risk_streaming(rfm, batch_size=64)
+    rfm_target.save_cluster_state(state, tmp_path / "clusters.joblib")
+    restored = rfm_target.load_cluster_state(tmp_path / "clusters.joblib")
+
+    assert labels["is_high_risk"].sum() == 100
+    assert rfm_target.label_agreement(rfm, restored)["label_agreement"] == 1.0
+
+
+def test_fit_risk_clusters_rereads_chunks_from_disk(tmp_path):
+    rfm = _rfm_groups()
+    paths = []
+    for i, start in enumerate(range(0, len(rfm), 128)):
+        paths.append(tmp_path / f"rfm-{i}.parquet")
+        rfm.iloc[start:start + 128].to_parquet(paths[-1])
+    reads = []
+
+    def chunks():
+        reads.append(1)
+        return (pd.read_parquet(path) for path in paths)
+
+    streamed = rfm_target.fit_risk_clusters(chunks, batch_size=64)
+    in_memory = rfm_target.fit_risk_clusters(rfm, batch_size=64)
+
+    assert len(reads) == 2
+    np.testing.assert_allclose(streamed.centroids, in_memory.centroids)
+    assert streamed.high_risk_cluster == in_memory.high_risk_cluster
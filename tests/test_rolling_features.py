@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from src.data_processing import create_aggregates
+from src.rolling_features import asof_join, rolling_features, transaction_rolling_features
+
+
+def _transactions(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2019-01-01", tz="UTC")
+    return pd.DataFrame({
+        "CustomerId": rng.choice(["C1", "C2", "C3", "C4"], n),
+        # Whole days so several transactions share an instant
+        "TransactionStartTime": start + pd.to_timedelta(rng.integers(0, 120, n), unit="D"),
+        "TransactionId": np.arange(n),
+        "Amount": rng.integers(-500, 5000, n).astype(float),
+    }, index=rng.permutation(n) + 1000)
+
+
+def _brute_force(df, customer, as_of, days):
+    history = df[(df["CustomerId"] == customer) & (df["TransactionStartTime"] < as_of)]
+    window = history[history["TransactionStartTime"] >= as_of - pd.Timedelta(days=days)]
+    gaps = window["TransactionStartTime"].sort_values().diff().dt.total_seconds() / 86400
+    return len(window), window["Amount"].sum(), gaps.mean()
+
+
+def test_snapshot_features_only_use_history_before_snapshot():
+    df = _transactions()
+    snapshot = pd.Timestamp("2019-03-01", tz="UTC")
+    features = rolling_features(df, snapshot).set_index("CustomerId")
+
+    for customer in features.index:
+        for days in (7, 30, 90):
+            count, total, gap = _brute_force(df, customer, snapshot, days)
+            row = features.loc[customer]
+            assert row[f"txn_count_{days}d"] == count
+            assert np.isclose(row[f"amount_sum_{days}d"], total)
+            assert np.isclose(row[f"mean_gap_days_{days}d"], gap, equal_nan=True)
+
+
+def test_transaction_features_exclude_current_instant():
+    df = _transactions(seed=1)
+    features = transaction_rolling_features(df)
+    assert features.index.equals(df.index)
+
+    for idx in df.index[::17]:
+        row = df.loc[idx]
+        count, total, _ = _brute_force(df, row["CustomerId"], row["TransactionStartTime"], 30)
+        assert features.loc[idx, "txn_count_30d"] == count
+        assert np.isclose(features.loc[idx, "amount_sum_30d"], total)
+
+
+def test_window_mean_skips_missing_amounts_like_pandas_rolling():
+    df = _transactions(n=300, seed=4)
+    df.loc[df.sample(frac=0.2, random_state=0).index, "Amount"] = np.nan
+    features = transaction_rolling_features(df)
+
+    ordered = df.sort_values(["CustomerId", "TransactionStartTime"])
+    expected = ordered.groupby("CustomerId", group_keys=False)[
+        ["TransactionStartTime", "Amount"]
+    ].apply(
+        # closed="left" keeps [t - 30d, t); same-instant rows take the earliest row's view
+        lambda g: g.rolling("30D", on="TransactionStartTime", closed="left")["Amount"]
+        .mean().groupby(g["TransactionStartTime"]).transform("first")
+    )
+
+    assert features["amount_mean_30d"].isna().sum() > 0
+    np.testing.assert_allclose(features["amount_mean_30d"], expected.reindex(df.index))
+
+
+def test_asof_join_matches_aggregates_of_earlier_transactions():
+    df = _transactions(seed=2)
+    labels = _transactions(n=60, seed=3).drop(columns="Amount")
+    labels.loc[labels.index[0], "CustomerId"] = "C_new"
+
+    joined = asof_join(labels, df)
+    assert joined.index.equals(labels.index)
+
+    for idx, row in joined.iterrows():
+        history = df[(df["CustomerId"] == row["CustomerId"])
+                     & (df["TransactionStartTime"] < row["TransactionStartTime"])]
+        if history.empty:
+            assert row["txn_count"] == 0 and row["total_amount"] == 0.0
+            assert np.isnan(row["avg_amount"]) and np.isnan(row["amount_std"])
+            continue
+        expected = create_aggregates(history).iloc[0]
+        for col in ["total_amount", "avg_amount", "txn_count", "amount_std"]:
+            assert np.isclose(row[col], expected[col]), col
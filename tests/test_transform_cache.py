@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.preprocessing import build_preprocessor
+from src.transform_cache import TransformCache, fit_pipeline
+
+
+def _frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "amount": rng.normal(100, 20, n),
+        "channel": rng.choice(["web", "ios", "android", "ussd", "pos", "agent"], n),
+    })
+
+
+def test_second_run_loads_fitted_preprocessor_from_disk(tmp_path):
+    X, X_new = _frame(), _frame(seed=1)
+    preprocessor = build_preprocessor(["amount"], ["channel"])
+
+    first = TransformCache(tmp_path)
+    fitted, Xt = first.fit_transform(preprocessor, X)
+    first.transform(fitted, X_new)
+    assert first.stats()["misses"] == 2
+
+    second = TransformCache(tmp_path)
+    cached, cached_Xt = second.fit_transform(preprocessor, X)
+    cached_new = second.transform(cached, X_new)
+
+    assert second.stats() == {"hits": 2, "misses": 0, "hit_rate": 1.0}
+    assert sp.issparse(cached_Xt)
+    np.testing.assert_array_equal(cached_Xt.toarray(), sp.csr_matrix(Xt).toarray())
+    np.testing.assert_array_equal(cached_new.toarray(), fitted.transform(X_new).toarray())
+
+    second.fit_transform(preprocessor, X.assign(amount=X["amount"] + 1))
+    assert second.misses == 1
+
+
+def test_fit_pipeline_fits_the_callers_preprocessor(tmp_path):
+    X, X_new = _frame(), _frame(seed=1)
+    y = (X["amount"] > 100).astype(int)
+
+    for _ in range(2):  # cache miss, then hit
+        preprocessor = build_preprocessor(["amount"], ["channel"])
+        pipeline = Pipeline([("preprocessor", preprocessor), ("classifier", LogisticRegression())])
+        fit_pipeline(pipeline, X, y, TransformCache(tmp_path))
+
+        assert pipeline.named_steps["preprocessor"] is preprocessor
+        np.testing.assert_array_equal(preprocessor.transform(X_new).toarray(),
+                                      pipeline[:-1].transform(X_new).toarray())
+        expected = Pipeline([
+            ("preprocessor", build_preprocessor(["amount"], ["channel"])),
+            ("classifier", LogisticRegression()),
+        ]).fit(X, y)
+        np.testing.assert_allclose(pipeline.predict_proba(X_new), expected.predict_proba(X_new))
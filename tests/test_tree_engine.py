@@ -0,0 +1,20 @@
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+from src.tree_engine import FlatTreeEnsemble
+
+
+def test_flat_engine_is_bit_compatible():
+    X, y = make_classification(500, 8, random_state=0)
+    X_new, _ = make_classification(300, 8, random_state=1)
+
+    for model in [RandomForestClassifier(n_estimators=15, random_state=0),
+                  GradientBoostingClassifier(n_estimators=20, random_state=0)]:
+        engine = FlatTreeEnsemble.from_estimator(model.fit(X, y))
+        expected = model.predict_proba(X_new)
+
+        np.testing.assert_array_equal(engine.predict_proba(X_new), expected)
+        np.testing.assert_array_equal(
+            engine.predict_proba(X_new, block_size=64, n_jobs=2), expected
+        )
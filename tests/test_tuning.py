@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from src.preprocessing import build_preprocessor
+from src.tuning import Candidate, search_models
+
+
+def test_successive_halving_keeps_the_best_configs():
+    rng = np.random.default_rng(0)
+    n = 1_800
+    X = pd.DataFrame({
+        "amount": rng.normal(0, 1, n),
+        "count": rng.normal(0, 1, n),
+        "channel": rng.choice(["web", "ios"], n),
+    })
+    y = (X["amount"] + 0.5 * rng.normal(0, 1, n) > 0).astype(int)
+    candidates = [
+        Candidate("LogisticRegression", LogisticRegression(), {"C": [0.001, 0.1, 1.0]}),
+        Candidate("DecisionTree", DecisionTreeClassifier(random_state=0),
+                  {"max_depth": [1, 3, 6]}),
+    ]
+
+    result = search_models(X, y, build_preprocessor(["amount", "count"], ["channel"]),
+                           candidates=candidates, n_jobs=2, min_samples=200)
+
+    rungs = [t.rung for t in result.trials]
+    assert rungs.count(0) == 6 and rungs.count(1) == 2
+    assert result.best.rung == 1 and result.best.n_samples == 1_200
+    assert result.best.score > 0.8
+    assert result.model.predict_proba(X).shape == (n, 2)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.compiled_model import compile_pipeline
+from src.preprocessing import build_preprocessor
+from src.woe import (
+    WoEBinning,
+    fine_edges,
+    fit_woe,
+    fit_woe_bins,
+    fit_woe_chunked,
+    merge_woe_counts,
+    woe_counts,
+)
+
+
+def _data(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "amount": rng.lognormal(7, 1, n),
+        "channel": rng.choice(["web", "ios", "android", "ussd"], n, p=[0.5, 0.3, 0.18, 0.02]),
+    })
+    df.loc[::40, "amount"] = np.nan
+    logit = -1 + 0.6 * (np.log(df["amount"].fillna(1000)) - 7) + (df["channel"] == "ios")
+    df["is_high_risk"] = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df
+
+
+def test_chunked_counts_merge_to_full_counts_and_bins_are_monotone():
+    df = _data()
+    edges = fine_edges(df, ["amount"])
+    full = woe_counts(df, edges, ["channel"])
+    chunked = {}
+    for start in range(0, len(df), 3_000):
+        chunked = merge_woe_counts(chunked, woe_counts(df.iloc[start:start + 3_000], edges,
+                                                       ["channel"]))
+
+    for feature in full:
+        pd.testing.assert_frame_equal(chunked[feature].sort_index(), full[feature].sort_index(),
+                                      check_dtype=False)
+
+    bins = fit_woe_bins(full, edges).bins
+    assert 2 <= len(bins["amount"].woe) <= 8
+    assert np.all(np.diff(bins["amount"].woe) < 0)
+    assert bins["channel"].categories == ["android", "ios", "web"]
+    assert bins["amount"].iv > 0.1
+
+
+def test_persisted_bins_score_like_the_fitted_pipeline(tmp_path):
+    df = _data()
+    X, y = df.drop(columns="is_high_risk"), df["is_high_risk"]
+    pipeline = Pipeline([
+        ("preprocessor", build_preprocessor([], [], woe_features=["amount", "channel"])),
+        ("classifier", LogisticRegression()),
+    ]).fit(X, y)
+
+    binning = pipeline.named_steps["preprocessor"].named_transformers_["woe"].binning_
+    binning.save(tmp_path / "woe.json")
+    loaded = WoEBinning.load(tmp_path / "woe.json")
+    pd.testing.assert_frame_equal(loaded.transform(X), binning.transform(X))
+
+    compiled = compile_pipeline(pipeline)
+    X_new = _data(200, seed=1).drop(columns="is_high_risk")
+    X_new.loc[:2, "channel"] = "pos"
+    np.testing.assert_allclose(compiled.predict_proba(X_new), pipeline.predict_proba(X_new))
+    for record in X_new.head(20).to_dict("records"):
+        np.testing.assert_allclose(compiled.predict_proba_one(record),
+                                   pipeline.predict_proba(pd.DataFrame([record]))[0])
+
+
+def test_chunked_fit_on_sorted_chunks_matches_the_full_fit():
+    df = _data().sort_values("amount", na_position="first").reset_index(drop=True)
+
+    def chunks():
+        return (df.iloc[i:i + 2_000] for i in range(0, len(df), 2_000))
+
+    chunked = fit_woe_chunked(chunks, ["amount"], ["channel"])
+    full = fit_woe(df, ["amount"], ["channel"])
+
+    # Edges from the first (smallest-amount) chunk alone would all sit below its maximum
+    assert chunked.bins["amount"].edges.max() > df["amount"].iloc[:2_000].max()
+    assert abs(chunked.bins["amount"].iv - full.bins["amount"].iv) < 0.02
+    np.testing.assert_allclose(chunked.bins["channel"].woe, full.bins["channel"].woe)